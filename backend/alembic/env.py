@@ -15,6 +15,10 @@ from backend.core.config import get_db_url
 from backend.models.users_model import User
 from backend.models.report_model import Report
 from backend.models.tasks_model import Task
+from backend.models.geocode_cache_model import GeocodeCacheEntry
+from backend.models.road_agency_contact_model import RoadAgencyContact
+from backend.models.complaint_job_model import ComplaintJob
+from backend.models.outbound_email_model import OutboundEmail
 # При необходимости импортируйте другие модели в том же стиле
 
 config = context.config
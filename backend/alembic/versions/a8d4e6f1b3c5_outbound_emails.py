@@ -0,0 +1,62 @@
+"""outbound emails spool
+
+Revision ID: a8d4e6f1b3c5
+Revises: f3c8a5e2d7b9
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d4e6f1b3c5'
+down_revision: Union[str, Sequence[str], None] = 'f3c8a5e2d7b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('reports', sa.Column('email_status', sa.String(length=50), nullable=True))
+    op.add_column('reports', sa.Column('email_sent_at', sa.DateTime(timezone=True), nullable=True))
+
+    op.create_table('outbound_emails',
+    sa.Column('uuid', sa.UUID(), nullable=False),
+    sa.Column('report_uuid', sa.UUID(), nullable=True),
+    sa.Column('to_email', sa.String(length=320), nullable=False),
+    sa.Column('recipient_domain', sa.String(length=255), nullable=False),
+    sa.Column('subject', sa.Text(), nullable=False),
+    sa.Column('spool_key', sa.String(length=255), nullable=False),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'SENDING', 'SENT', 'FAILED', name='outboundemailstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('run_after', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('locked_by', sa.String(length=200), nullable=True),
+    sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['report_uuid'], ['reports.uuid'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('uuid')
+    )
+    op.create_index(op.f('ix_outbound_emails_report_uuid'), 'outbound_emails', ['report_uuid'], unique=False)
+    op.create_index(
+        'ix_outbound_emails_pending', 'outbound_emails', ['run_after'], unique=False,
+        postgresql_where=sa.text("status = 'PENDING'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbound_emails_pending', table_name='outbound_emails')
+    op.drop_index(op.f('ix_outbound_emails_report_uuid'), table_name='outbound_emails')
+    op.drop_table('outbound_emails')
+    sa.Enum(name='outboundemailstatus').drop(op.get_bind(), checkfirst=True)
+
+    op.drop_column('reports', 'email_sent_at')
+    op.drop_column('reports', 'email_status')
@@ -0,0 +1,43 @@
+"""road agency contacts directory
+
+Revision ID: b7e2d9a1c4f3
+Revises: a3f1c2d4e5b6
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d9a1c4f3'
+down_revision: Union[str, Sequence[str], None] = 'a3f1c2d4e5b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('road_agency_contacts',
+    sa.Column('city_key', sa.String(length=300), nullable=False),
+    sa.Column('city', sa.String(length=200), nullable=False),
+    sa.Column('region', sa.String(length=200), nullable=True),
+    sa.Column('organization', sa.String(length=500), nullable=True),
+    sa.Column('email', sa.String(length=255), nullable=True),
+    sa.Column('phone', sa.String(length=50), nullable=True),
+    sa.Column('website', sa.String(length=500), nullable=True),
+    sa.Column('confidence', sa.Float(), nullable=False),
+    sa.Column('source', sa.String(length=50), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('city_key')
+    )
+    op.create_index(op.f('ix_road_agency_contacts_expires_at'), 'road_agency_contacts', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_road_agency_contacts_expires_at'), table_name='road_agency_contacts')
+    op.drop_table('road_agency_contacts')
@@ -0,0 +1,60 @@
+"""report list composite indexes
+
+Revision ID: b9e3f7a2c6d4
+Revises: a8d4e6f1b3c5
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9e3f7a2c6d4'
+down_revision: Union[str, Sequence[str], None] = 'a8d4e6f1b3c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+NEW_INDEXES = (
+    ('ix_reports_created_at_uuid', [sa.text('created_at DESC'), sa.text('uuid DESC')], None),
+    ('ix_reports_user_created_at', ['user_id', sa.text('created_at DESC'), sa.text('uuid DESC')], None),
+    ('ix_reports_status_created_at', ['status', sa.text('created_at DESC'), sa.text('uuid DESC')], None),
+    ('ix_reports_priority_created_at', ['priority', sa.text('created_at DESC'), sa.text('uuid DESC')], None),
+    ('ix_reports_user_submitted', ['user_id'], sa.text("status <> 'DRAFT'")),
+)
+
+# Одноколоночные индексы, которые покрываются новыми составными (ix_reports_uuid дублирует первичный ключ)
+OLD_INDEXES = (
+    ('ix_reports_uuid', ['uuid']),
+    ('ix_reports_user_id', ['user_id']),
+    ('ix_reports_status', ['status']),
+    ('ix_reports_priority', ['priority']),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в reports, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        for name, columns, where in NEW_INDEXES:
+            op.create_index(
+                name, 'reports', columns, unique=False,
+                postgresql_where=where, postgresql_concurrently=True, if_not_exists=True
+            )
+        for name, _ in OLD_INDEXES:
+            op.drop_index(name, table_name='reports', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, columns in OLD_INDEXES:
+            op.create_index(
+                name, 'reports', columns, unique=False,
+                postgresql_concurrently=True, if_not_exists=True
+            )
+        for name, _, _ in NEW_INDEXES:
+            op.drop_index(name, table_name='reports', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,60 @@
+"""complaint jobs queue and report agent columns
+
+Revision ID: c5d8e1f2a9b7
+Revises: b7e2d9a1c4f3
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d8e1f2a9b7'
+down_revision: Union[str, Sequence[str], None] = 'b7e2d9a1c4f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('reports', sa.Column('submitted_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('reports', sa.Column('ai_agent_task_id', sa.String(length=100), nullable=True))
+    op.add_column('reports', sa.Column('ai_agent_status', sa.String(length=50), nullable=True))
+    op.add_column('reports', sa.Column('organization_name', sa.String(length=500), nullable=True))
+
+    op.create_table('complaint_jobs',
+    sa.Column('uuid', sa.UUID(), nullable=False),
+    sa.Column('report_uuid', sa.UUID(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'DONE', 'FAILED', name='complaintjobstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('run_after', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('locked_by', sa.String(length=200), nullable=True),
+    sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['report_uuid'], ['reports.uuid'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('uuid')
+    )
+    op.create_index(op.f('ix_complaint_jobs_report_uuid'), 'complaint_jobs', ['report_uuid'], unique=False)
+    op.create_index(
+        'ix_complaint_jobs_pending', 'complaint_jobs', ['run_after'], unique=False,
+        postgresql_where=sa.text("status = 'PENDING'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_complaint_jobs_pending', table_name='complaint_jobs')
+    op.drop_index(op.f('ix_complaint_jobs_report_uuid'), table_name='complaint_jobs')
+    op.drop_table('complaint_jobs')
+    sa.Enum(name='complaintjobstatus').drop(op.get_bind(), checkfirst=True)
+
+    op.drop_column('reports', 'organization_name')
+    op.drop_column('reports', 'ai_agent_status')
+    op.drop_column('reports', 'ai_agent_task_id')
+    op.drop_column('reports', 'submitted_at')
@@ -0,0 +1,28 @@
+"""report complaint text
+
+Revision ID: e4b9c7d1f6a2
+Revises: d2a6f3b8c1e4
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b9c7d1f6a2'
+down_revision: Union[str, Sequence[str], None] = 'd2a6f3b8c1e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('reports', sa.Column('complaint_text', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('reports', 'complaint_text')
@@ -0,0 +1,71 @@
+"""
+Бенчмарк рендеринга DOCX-заявления: renders/sec.
+
+Сравнивает разбор шаблона на каждый вызов (DocxTemplate), заранее
+разобранный шаблон в текущем процессе и пул процессов рендеринга.
+
+Запуск из корня репозитория:
+    python -m backend.benchmarks.bench_docx_render --renders 200 --processes 4
+"""
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from docxtpl import DocxTemplate
+
+from backend.services.document_service import (
+    CompiledDocxTemplate, _init_render_worker, _render_in_worker
+)
+
+TEMPLATE_PATH = Path(__file__).resolve().parent.parent.parent / "Шаблон заявления.docx"
+
+CONTEXT = {
+    "administration_name": "Управление дорожной деятельности и благоустройства г. Владивостока",
+    "person": "Иван Иванов",
+    "city": "Владивосток",
+    "street": "ул Светланская, 1",
+    "yeer": "26",
+    "count_photos": 3,
+    "day_report": "19",
+    "month_report": "октября",
+}
+
+
+def bench_docxtpl(renders: int) -> float:
+    import io
+    started = time.perf_counter()
+    for _ in range(renders):
+        doc = DocxTemplate(str(TEMPLATE_PATH))
+        doc.render(CONTEXT)
+        doc.save(io.BytesIO())
+    return renders / (time.perf_counter() - started)
+
+
+def bench_compiled(renders: int) -> float:
+    template = CompiledDocxTemplate(TEMPLATE_PATH)
+    started = time.perf_counter()
+    for _ in range(renders):
+        template.render(CONTEXT)
+    return renders / (time.perf_counter() - started)
+
+
+def bench_pool(renders: int, processes: int) -> float:
+    with ProcessPoolExecutor(processes, initializer=_init_render_worker, initargs=(TEMPLATE_PATH,)) as pool:
+        # Прогрев: шаблон разбирается в каждом процессе
+        list(pool.map(_render_in_worker, [CONTEXT] * processes))
+        started = time.perf_counter()
+        list(pool.map(_render_in_worker, [CONTEXT] * renders))
+        return renders / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк рендеринга DOCX")
+    parser.add_argument("--renders", type=int, default=200)
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"docxtpl per call:        {bench_docxtpl(args.renders):8.1f} renders/sec")
+    print(f"compiled, in-process:    {bench_compiled(args.renders):8.1f} renders/sec")
+    print(f"compiled, {args.processes} processes:   {bench_pool(args.renders, args.processes):8.1f} renders/sec")
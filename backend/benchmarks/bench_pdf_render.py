@@ -0,0 +1,48 @@
+"""
+Бенчмарк прямой генерации PDF-заявления (fpdf2): миллисекунды на документ.
+
+Сравнивает загрузку шрифтов на каждый документ и копию заготовки
+с уже разобранными шрифтами, отдельно замеряет документ с фотографиями.
+
+Запуск из корня репозитория:
+    python -m backend.benchmarks.bench_pdf_render --renders 100 --photo path/to/photo.jpg
+"""
+
+import argparse
+import time
+
+from backend.benchmarks.bench_docx_render import CONTEXT
+from backend.core.config import configs
+from backend.services.pdf_renderer import ComplaintPdfRenderer
+
+
+def new_renderer() -> ComplaintPdfRenderer:
+    return ComplaintPdfRenderer(configs.PDF_FONT_REGULAR, configs.PDF_FONT_BOLD)
+
+
+def bench_fonts_per_document(renders: int) -> float:
+    started = time.perf_counter()
+    for _ in range(renders):
+        new_renderer().render(CONTEXT)
+    return (time.perf_counter() - started) / renders * 1000
+
+
+def bench_cached(renders: int, photos=()) -> float:
+    renderer = new_renderer()
+    started = time.perf_counter()
+    for _ in range(renders):
+        renderer.render(CONTEXT, photos)
+    return (time.perf_counter() - started) / renders * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк генерации PDF")
+    parser.add_argument("--renders", type=int, default=100)
+    parser.add_argument("--photo", action="append", default=[], help="Фото для вставки (можно несколько)")
+    args = parser.parse_args()
+
+    photos = [open(path, "rb").read() for path in args.photo]
+    print(f"fonts loaded per document: {bench_fonts_per_document(args.renders):8.1f} ms")
+    print(f"cached fonts:              {bench_cached(args.renders):8.1f} ms")
+    if photos:
+        print(f"cached fonts, {len(photos)} photo(s):  {bench_cached(args.renders, photos):8.1f} ms")
@@ -0,0 +1,140 @@
+"""
+Бенчмарк страницы списка заявок: строк/сек и пик памяти на страницу.
+
+Сравнивает загрузку ORM-объектов Report с валидируемой сборкой
+ReportListItem и повторной валидацией ответа (как делает FastAPI по
+response_model) с выборкой только нужных колонок (ReportRepository.get_page)
+и сборкой ответа без валидации.
+
+Заявки для замера вставляются в транзакции, которая в конце откатывается.
+Нужна база с применёнными миграциями.
+
+Запуск из корня репозитория:
+    python -m backend.benchmarks.bench_report_list --page 100 --pages 200
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from backend.core.config import get_db_url
+from backend.models.report_model import Report, ReportPriority, ReportStatus
+from backend.models.tasks_model import Task  # noqa: F401 - связь User.tasks при настройке мапперов
+from backend.repositories.ReportRepository import ReportRepository
+from backend.schemas.report_schema import ReportListItem, ReportListResponse
+from backend.services.report_service import ReportService
+
+RESPONSE_ADAPTER = TypeAdapter(ReportListResponse)
+
+
+def seed_reports(count: int) -> list:
+    """Заявки с заполненными текстами, как после обработки заявления"""
+    return [
+        Report(
+            address=f"г Владивосток, ул Светланская, д {n}",
+            latitude="43.115",
+            longitude="131.885",
+            image_url=f"https://storage.example/processed/images/{n:064x}.jpg",
+            image_urls={"urls": [f"https://storage.example/processed/images/{n + 1:064x}.jpg"]},
+            status=ReportStatus.SUBMITTED,
+            priority=ReportPriority.HIGH,
+            total_potholes=3,
+            max_risk=64.5,
+            description="Яма на проезжей части. " * 20,
+            comment="Заявление отправлено в администрацию",
+            complaint_text="Прошу принять меры по устранению повреждений дорожного покрытия. " * 60,
+            stage_timings={"geocode": 0.12, "llm": 8.4, "document": 0.3, "email": 1.1},
+        )
+        for n in range(count)
+    ]
+
+
+async def orm_page(session: AsyncSession, service: ReportService, limit: int) -> bytes:
+    """Прежний путь: ORM-объекты, валидируемые модели, повторная валидация ответа"""
+    session.expunge_all()  # каждая страница - как в новой сессии запроса
+    result = await session.execute(
+        select(Report).order_by(Report.created_at.desc(), Report.uuid.desc()).limit(limit)
+    )
+    items = [
+        ReportListItem(
+            uuid=r.uuid,
+            user_id=r.user_id,
+            latitude=r.latitude,
+            longitude=r.longitude,
+            address=r.address,
+            status=r.status.value,
+            priority=r.priority.value,
+            total_potholes=r.total_potholes,
+            max_risk=r.max_risk,
+            created_at=r.created_at,
+            image_url=r.image_url,
+            image_urls=r.image_urls,
+            video_url=r.video_url,
+            renditions=service._build_renditions(r)
+        )
+        for r in result.scalars().all()
+    ]
+    page = ReportListResponse(total=None, items=items)
+    validated = RESPONSE_ADAPTER.validate_python(page.model_dump())
+    return RESPONSE_ADAPTER.dump_json(validated)
+
+
+async def projection_page(session: AsyncSession, service: ReportService, limit: int) -> bytes:
+    """Текущий путь: только колонки списка и сборка ответа без валидации"""
+    rows = await ReportRepository(session).get_page(limit=limit)
+    page = ReportListResponse.model_construct(
+        total=None,
+        total_estimated=False,
+        items=[service._to_list_item(row) for row in rows],
+        next_cursor=None
+    )
+    return page.model_dump_json().encode()
+
+
+async def measure(name: str, page_fn, session: AsyncSession, service: ReportService, limit: int, pages: int):
+    await page_fn(session, service, limit)  # прогрев
+
+    started = time.perf_counter()
+    for _ in range(pages):
+        await page_fn(session, service, limit)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    await page_fn(session, service, limit)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<12} {limit * pages / elapsed:>10.0f} rows/s {elapsed / pages * 1000:>8.2f} ms/page "
+          f"{peak / 1024:>8.0f} KiB peak")
+
+
+async def main(url: str, page: int, pages: int):
+    engine = create_async_engine(url)
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        session = AsyncSession(bind=conn, expire_on_commit=False, autoflush=False)
+        session.add_all(seed_reports(page))
+        await session.flush()
+        service = ReportService(session)
+
+        await measure("orm", orm_page, session, service, page, pages)
+        await measure("projection", projection_page, session, service, page, pages)
+
+        await session.close()
+        await transaction.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк страницы списка заявок")
+    parser.add_argument("--page", type=int, default=100, help="Заявок на странице")
+    parser.add_argument("--pages", type=int, default=200, help="Число замеряемых страниц")
+    parser.add_argument("--url", default=None, help="URL базы (по умолчанию из конфигурации)")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.url or get_db_url(), args.page, args.pages))
@@ -0,0 +1,172 @@
+"""
+Бенчмарк запросов списка заявок: время выполнения по EXPLAIN ANALYZE
+со старыми одноколоночными индексами и с составными из модели Report.
+
+Заполняет отдельную таблицу (по умолчанию bench_reports, структура как
+у reports) синтетическими заявками и удаляет её в конце, если не указан
+--keep. Нужна база с применёнными миграциями.
+
+Запуск из корня репозитория:
+    python -m backend.benchmarks.bench_report_queries --rows 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlalchemy.schema import CreateIndex
+
+from backend.core.config import get_db_url
+from backend.models.report_model import Report
+
+OLD_INDEXES = (
+    "CREATE INDEX {table}_user_id ON {table} (user_id)",
+    "CREATE INDEX {table}_status ON {table} (status)",
+    "CREATE INDEX {table}_priority ON {table} (priority)",
+)
+
+SEED = """
+INSERT INTO {table} (
+    uuid, user_id, address, status, priority, total_potholes, average_risk, max_risk,
+    critical_count, high_count, medium_count, low_count, description, created_at
+)
+SELECT
+    gen_random_uuid(),
+    1 + (random() * {users})::int,
+    'ул Светланская, ' || n,
+    CASE
+        WHEN r < 0.2 THEN 'DRAFT'
+        WHEN r < 0.6 THEN 'SUBMITTED'
+        WHEN r < 0.75 THEN 'IN_REVIEW'
+        WHEN r < 0.9 THEN 'IN_PROGRESS'
+        ELSE 'COMPLETED'
+    END::reportstatus,
+    (ARRAY['LOW', 'MEDIUM', 'HIGH', 'CRITICAL'])[1 + (random() * 3)::int]::reportpriority,
+    (random() * 10)::int,
+    random() * 50,
+    random() * 100,
+    0, 0, 0, 0,
+    repeat('описание ', 20),
+    now() - random() * interval '365 days'
+FROM (SELECT n, random() AS r FROM generate_series(1, {rows}) AS n) AS s
+"""
+
+# Запросы повторяют ReportRepository.get_page/count/count_submitted_reports_by_user
+QUERIES = {
+    "list, no filters": "SELECT * FROM {table} ORDER BY created_at DESC, uuid DESC LIMIT 50",
+    "list, user": "SELECT * FROM {table} WHERE user_id = 42 ORDER BY created_at DESC, uuid DESC LIMIT 50",
+    "list, status": (
+        "SELECT * FROM {table} WHERE status = 'SUBMITTED' ORDER BY created_at DESC, uuid DESC LIMIT 50"
+    ),
+    "list, status+priority": (
+        "SELECT * FROM {table} WHERE status = 'SUBMITTED' AND priority = 'CRITICAL' "
+        "ORDER BY created_at DESC, uuid DESC LIMIT 50"
+    ),
+    "list, status, deep cursor": (
+        "SELECT * FROM {table} WHERE status = 'SUBMITTED' AND (created_at, uuid) < ({cursor}) "
+        "ORDER BY created_at DESC, uuid DESC LIMIT 50"
+    ),
+    "list, status, offset 10000": (
+        "SELECT * FROM {table} WHERE status = 'SUBMITTED' ORDER BY created_at DESC, uuid DESC "
+        "LIMIT 50 OFFSET 10000"
+    ),
+    "count, status": "SELECT count(*) FROM {table} WHERE status = 'SUBMITTED'",
+    "count, user submitted": "SELECT count(*) FROM {table} WHERE user_id = 42 AND status <> 'DRAFT'",
+}
+
+
+def model_indexes(table: str) -> list:
+    """DDL составных индексов модели Report, перенесённых на таблицу бенчмарка"""
+    statements = []
+    for index in Report.__table__.indexes:
+        ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+        statements.append(ddl.replace(" ix_reports_", f" {table}_").replace(" ON reports ", f" ON {table} "))
+    return statements
+
+
+async def explain(conn: AsyncConnection, sql: str, repeat: int) -> tuple:
+    """Медиана Execution Time (мс) и узлы плана верхнего уровня"""
+    timings = []
+    plan = None
+    for _ in range(repeat):
+        result = await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"))
+        raw = result.scalar()
+        plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+        timings.append(plan["Execution Time"])
+
+    nodes = []
+    node = plan["Plan"]
+    while node is not None:
+        nodes.append(node["Node Type"] + (f" {node['Index Name']}" if "Index Name" in node else ""))
+        node = node["Plans"][0] if node.get("Plans") else None
+    return statistics.median(timings), " > ".join(nodes)
+
+
+async def run_queries(conn: AsyncConnection, table: str, cursor: str, repeat: int) -> dict:
+    results = {}
+    for name, sql in QUERIES.items():
+        results[name] = await explain(conn, sql.format(table=table, cursor=cursor), repeat)
+    return results
+
+
+async def main(rows: int, users: int, repeat: int, table: str, keep: bool):
+    engine = create_async_engine(get_db_url())
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+
+        await conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        await conn.execute(text(f"CREATE TABLE {table} (LIKE reports INCLUDING DEFAULTS)"))
+        await conn.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (uuid)"))
+
+        started = time.perf_counter()
+        await conn.execute(text(SEED.format(table=table, rows=rows, users=users)))
+        print(f"seeded {rows} rows in {time.perf_counter() - started:.1f} s")
+
+        # Ключ записи примерно на 10000-й позиции списка SUBMITTED - как курсор глубокой страницы
+        key = (await conn.execute(text(
+            f"SELECT created_at, uuid FROM {table} WHERE status = 'SUBMITTED' "
+            f"ORDER BY created_at DESC, uuid DESC OFFSET 10000 LIMIT 1"
+        ))).one()
+        cursor = f"'{key.created_at.isoformat()}'::timestamptz, '{key.uuid}'::uuid"
+
+        for ddl in OLD_INDEXES:
+            await conn.execute(text(ddl.format(table=table)))
+        await conn.execute(text(f"VACUUM ANALYZE {table}"))
+        before = await run_queries(conn, table, cursor, repeat)
+
+        for ddl in OLD_INDEXES:
+            await conn.execute(text(f"DROP INDEX {ddl.split()[2].format(table=table)}"))
+        started = time.perf_counter()
+        for ddl in model_indexes(table):
+            await conn.execute(text(ddl))
+        print(f"built model indexes in {time.perf_counter() - started:.1f} s")
+        await conn.execute(text(f"VACUUM ANALYZE {table}"))
+        after = await run_queries(conn, table, cursor, repeat)
+
+        if not keep:
+            await conn.execute(text(f"DROP TABLE {table}"))
+    await engine.dispose()
+
+    print(f"\n{'query':<28} {'before, ms':>11} {'after, ms':>10}")
+    for name in QUERIES:
+        print(f"{name:<28} {before[name][0]:>11.2f} {after[name][0]:>10.2f}")
+    print("\nplans (before -> after):")
+    for name in QUERIES:
+        print(f"  {name}:\n    {before[name][1]}\n    {after[name][1]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк индексов списка заявок")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000, help="Число различных user_id")
+    parser.add_argument("--repeat", type=int, default=5, help="Повторов каждого EXPLAIN ANALYZE")
+    parser.add_argument("--table", default="bench_reports")
+    parser.add_argument("--keep", action="store_true", help="Не удалять таблицу после замера")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows, args.users, args.repeat, args.table, args.keep))
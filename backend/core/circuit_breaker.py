@@ -0,0 +1,97 @@
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+class CircuitOpenError(Exception):
+    """Вызов отклонён: внешний сервис считается недоступным"""
+
+
+class CircuitBreaker:
+    """
+    Простой предохранитель для внешних API.
+    После failure_threshold ошибок подряд цепь размыкается на reset_timeout секунд,
+    затем пропускается один пробный вызов (half-open). Пробный вызов, не сообщивший
+    результат за trial_timeout секунд, считается потерянным, и пропускается следующий.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+            self,
+            name: str,
+            failure_threshold: int = 5,
+            reset_timeout: float = 30.0,
+            trial_timeout: Optional[float] = None
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.trial_timeout = trial_timeout if trial_timeout is not None else reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_started: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.failures < self.failure_threshold:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_call(self) -> None:
+        """Проверка перед вызовом; выбрасывает CircuitOpenError, если вызов запрещён"""
+        state = self.state
+        if state == self.OPEN:
+            raise CircuitOpenError(f"{self.name}: circuit is open")
+        if state == self.HALF_OPEN:
+            now = time.monotonic()
+            if self._trial_started is not None and now - self._trial_started < self.trial_timeout:
+                raise CircuitOpenError(f"{self.name}: trial call in progress")
+            self._trial_started = now
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._trial_started = None
+
+    def record_failure(self) -> None:
+        self._trial_started = None
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    def release_trial(self) -> None:
+        """Вызов прерван без результата (например, отменён): пробный вызов снова разрешён"""
+        self._trial_started = None
+
+
+@dataclass
+class CallStats:
+    """Счётчики вызовов внешнего API"""
+    requests: int = 0
+    errors: int = 0
+    rejected: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    last_error: str = field(default="")
+
+    def record(self, latency: float, error: Exception = None) -> None:
+        self.requests += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        if error is not None:
+            self.errors += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "avg_latency_ms": round(self.total_latency / self.requests * 1000, 1) if self.requests else 0.0,
+            "max_latency_ms": round(self.max_latency * 1000, 1),
+            "last_error": self.last_error or None,
+        }
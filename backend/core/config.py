@@ -35,6 +35,24 @@ class Configs(BaseSettings):
     MAILRU_SMTP_PORT: Optional[int] = Field(default=465, env="MAILRU_SMTP_PORT")
     MAILRU_SMTP_USER: Optional[str] = Field(default="MAILRU_SMTP_USER", env="MAILRU_SMTP_USER")
     MAILRU_SMTP_PASSWORD: Optional[str] = Field(default="MAILRU_SMTP_PASSWORD", env="MAILRU_SMTP_PASSWORD")
+    MAILRU_SMTP_USE_TLS: bool = Field(default=True, env="MAILRU_SMTP_USE_TLS")
+    EMAIL_SMTP_POOL_SIZE: int = Field(default=2, env="EMAIL_SMTP_POOL_SIZE")
+    EMAIL_SMTP_TIMEOUT_SECONDS: float = Field(default=30.0, env="EMAIL_SMTP_TIMEOUT_SECONDS")
+    EMAIL_SMTP_IDLE_SECONDS: float = Field(default=60.0, env="EMAIL_SMTP_IDLE_SECONDS")
+    EMAIL_SEND_MAX_ATTEMPTS: int = Field(default=5, env="EMAIL_SEND_MAX_ATTEMPTS")
+    EMAIL_RETRY_BASE_SECONDS: float = Field(default=60.0, env="EMAIL_RETRY_BASE_SECONDS")
+    EMAIL_RETRY_MAX_SECONDS: float = Field(default=3600.0, env="EMAIL_RETRY_MAX_SECONDS")
+    # Исходящая очередь: maildir с письмами (общий каталог, если воркеры на нескольких хостах)
+    EMAIL_SPOOL_DIR: str = Field(default="cache/mail_spool", env="EMAIL_SPOOL_DIR")
+    EMAIL_BATCH_SIZE: int = Field(default=10, env="EMAIL_BATCH_SIZE")
+    EMAIL_POLL_SECONDS: float = Field(default=2.0, env="EMAIL_POLL_SECONDS")
+    EMAIL_LOCK_TIMEOUT_SECONDS: int = Field(default=600, env="EMAIL_LOCK_TIMEOUT_SECONDS")
+    # Не больше N писем в минуту на один домен получателя
+    EMAIL_DOMAIN_RATE_PER_MINUTE: float = Field(default=20.0, env="EMAIL_DOMAIN_RATE_PER_MINUTE")
+    EMAIL_DOMAIN_BURST: int = Field(default=5, env="EMAIL_DOMAIN_BURST")
+    # Фото во вложениях уменьшаются до этого размера по большей стороне (0 - не уменьшать)
+    EMAIL_PHOTO_MAX_PX: int = Field(default=1600, env="EMAIL_PHOTO_MAX_PX")
+    EMAIL_PHOTO_QUALITY: int = Field(default=80, env="EMAIL_PHOTO_QUALITY")
 
 
 
@@ -51,6 +69,99 @@ class Configs(BaseSettings):
         default="https://hb.ru-msk.S3_ENDPOINT_URL-storage.ru/", env="S3_ENDPOINT_URL"
     )
     S3_REGION_NAME: Optional[str] = Field(default="ru-msk", env="S3_REGION_NAME")
+    S3_INDEX_CACHE_SIZE: int = Field(default=10000, env="S3_INDEX_CACHE_SIZE")
+    # Сколько запись локального индекса ключей считается достоверной; должно быть меньше MEDIA_GC_GRACE_HOURS
+    S3_INDEX_TTL_SECONDS: int = Field(default=3600, env="S3_INDEX_TTL_SECONDS")
+
+    # ------------ Геокодирование ------------
+    GEOCODER_BACKEND: str = Field(default="dadata", env="GEOCODER_BACKEND")  # dadata | offline
+    OFFLINE_GEOCODER_INDEX_DIR: Optional[str] = Field(default=None, env="OFFLINE_GEOCODER_INDEX_DIR")
+    OFFLINE_GEOCODER_MAX_DISTANCE_M: float = Field(default=300.0, env="OFFLINE_GEOCODER_MAX_DISTANCE_M")
+    GEOCODE_CACHE_CELL_METERS: float = Field(default=10.0, env="GEOCODE_CACHE_CELL_METERS")
+    GEOCODE_CACHE_TTL_SECONDS: int = Field(default=30 * 24 * 3600, env="GEOCODE_CACHE_TTL_SECONDS")
+    GEOCODE_CACHE_MAX_ENTRIES: int = Field(default=10000, env="GEOCODE_CACHE_MAX_ENTRIES")
+    GEOCODER_TIMEOUT_SECONDS: float = Field(default=3.0, env="GEOCODER_TIMEOUT_SECONDS")
+    GEOCODER_MAX_CONNECTIONS: int = Field(default=10, env="GEOCODER_MAX_CONNECTIONS")
+    GEOCODER_BREAKER_FAILURES: int = Field(default=5, env="GEOCODER_BREAKER_FAILURES")
+    GEOCODER_BREAKER_RESET_SECONDS: float = Field(default=30.0, env="GEOCODER_BREAKER_RESET_SECONDS")
+
+    # ------------ Справочник контактов дорожных служб ------------
+    CONTACTS_TTL_DAYS: int = Field(default=30, env="CONTACTS_TTL_DAYS")
+    CONTACTS_NEGATIVE_TTL_HOURS: int = Field(default=24, env="CONTACTS_NEGATIVE_TTL_HOURS")
+    CONTACTS_PREWARM_ON_STARTUP: bool = Field(default=False, env="CONTACTS_PREWARM_ON_STARTUP")
+
+    # ------------ Пул браузеров AI-агента ------------
+    ALISA_SEARCH_URL: str = Field(default="https://ya.ru/search/?text={query}", env="ALISA_SEARCH_URL")
+    BROWSER_POOL_SIZE: int = Field(default=2, env="BROWSER_POOL_SIZE")
+    BROWSER_POOL_MAX_USES: int = Field(default=50, env="BROWSER_POOL_MAX_USES")
+    BROWSER_POOL_CHECKOUT_TIMEOUT: float = Field(default=120.0, env="BROWSER_POOL_CHECKOUT_TIMEOUT")
+    BROWSER_POOL_WARM_ON_STARTUP: bool = Field(default=False, env="BROWSER_POOL_WARM_ON_STARTUP")
+
+    # ------------ Пулы потоков этапов обработки заявлений ------------
+    STAGE_DOCUMENT_WORKERS: int = Field(default=2, env="STAGE_DOCUMENT_WORKERS")
+    STAGE_EMAIL_WORKERS: int = Field(default=2, env="STAGE_EMAIL_WORKERS")
+
+    # ------------ GigaChat ------------
+    GIGACHAT_BASE_URL: Optional[str] = Field(default=None, env="GIGACHAT_BASE_URL")
+    GIGACHAT_TIMEOUT_SECONDS: float = Field(default=20.0, env="GIGACHAT_TIMEOUT_SECONDS")
+    GIGACHAT_MAX_CONCURRENCY: int = Field(default=4, env="GIGACHAT_MAX_CONCURRENCY")
+    GIGACHAT_CACHE_SIZE: int = Field(default=256, env="GIGACHAT_CACHE_SIZE")
+    GIGACHAT_STREAM_FLUSH_SECONDS: float = Field(default=0.5, env="GIGACHAT_STREAM_FLUSH_SECONDS")
+
+    # ------------ Документы заявлений ------------
+    # 0 - рендер в текущем процессе; >0 - размер пула процессов рендеринга
+    DOCUMENT_RENDER_PROCESSES: int = Field(default=0, env="DOCUMENT_RENDER_PROCESSES")
+    DOCUMENT_RENDER_TIMEOUT_SECONDS: float = Field(default=30.0, env="DOCUMENT_RENDER_TIMEOUT_SECONDS")
+    PDF_UNOSERVER_INSTANCES: int = Field(default=2, env="PDF_UNOSERVER_INSTANCES")
+    PDF_UNOSERVER_BASE_PORT: int = Field(default=2003, env="PDF_UNOSERVER_BASE_PORT")
+    PDF_UNOSERVER_COMMAND: str = Field(default="unoserver", env="PDF_UNOSERVER_COMMAND")
+    PDF_UNOSERVER_START_TIMEOUT_SECONDS: float = Field(default=30.0, env="PDF_UNOSERVER_START_TIMEOUT_SECONDS")
+    # После неудачного запуска пула новые попытки не раньше чем через столько секунд
+    PDF_UNOSERVER_RETRY_SECONDS: float = Field(default=300.0, env="PDF_UNOSERVER_RETRY_SECONDS")
+    PDF_CONVERT_TIMEOUT_SECONDS: float = Field(default=20.0, env="PDF_CONVERT_TIMEOUT_SECONDS")
+    # unoserver - DOCX из шаблона через LibreOffice, direct - PDF сразу через fpdf2 с фото внутри
+    PDF_BACKEND: str = Field(default="unoserver", env="PDF_BACKEND")
+    PDF_FONT_REGULAR: str = Field(
+        default="/usr/share/fonts/truetype/liberation/LiberationSerif-Regular.ttf",
+        env="PDF_FONT_REGULAR"
+    )
+    PDF_FONT_BOLD: str = Field(
+        default="/usr/share/fonts/truetype/liberation/LiberationSerif-Bold.ttf",
+        env="PDF_FONT_BOLD"
+    )
+    PDF_PHOTO_MAX_PX: int = Field(default=1280, env="PDF_PHOTO_MAX_PX")
+    PDF_PHOTO_QUALITY: int = Field(default=75, env="PDF_PHOTO_QUALITY")
+
+    # ------------ Очередь заявлений ------------
+    COMPLAINT_WORKER_CONCURRENCY: int = Field(default=2, env="COMPLAINT_WORKER_CONCURRENCY")
+    COMPLAINT_JOB_MAX_ATTEMPTS: int = Field(default=5, env="COMPLAINT_JOB_MAX_ATTEMPTS")
+    COMPLAINT_JOB_BACKOFF_BASE_SECONDS: float = Field(default=30.0, env="COMPLAINT_JOB_BACKOFF_BASE_SECONDS")
+    COMPLAINT_JOB_BACKOFF_MAX_SECONDS: float = Field(default=3600.0, env="COMPLAINT_JOB_BACKOFF_MAX_SECONDS")
+    COMPLAINT_JOB_POLL_SECONDS: float = Field(default=2.0, env="COMPLAINT_JOB_POLL_SECONDS")
+    COMPLAINT_JOB_LOCK_TIMEOUT_SECONDS: int = Field(default=900, env="COMPLAINT_JOB_LOCK_TIMEOUT_SECONDS")
+    COMPLAINT_JOB_HEARTBEAT_SECONDS: float = Field(default=60.0, env="COMPLAINT_JOB_HEARTBEAT_SECONDS")
+
+    # ------------ Обработка изображений ------------
+    IMAGE_OUTPUT_MAX_SIDE: int = Field(default=1920, env="IMAGE_OUTPUT_MAX_SIDE")
+    IMAGE_MEDIUM_MAX_SIDE: int = Field(default=960, env="IMAGE_MEDIUM_MAX_SIDE")
+    IMAGE_THUMBNAIL_MAX_SIDE: int = Field(default=320, env="IMAGE_THUMBNAIL_MAX_SIDE")
+
+    # ------------ Очистка медиа в S3 ------------
+    MEDIA_GC_ENABLED: bool = Field(default=True, env="MEDIA_GC_ENABLED")
+    MEDIA_GC_INTERVAL_SECONDS: int = Field(default=6 * 3600, env="MEDIA_GC_INTERVAL_SECONDS")
+    MEDIA_GC_GRACE_HOURS: int = Field(default=24, env="MEDIA_GC_GRACE_HOURS")
+    MEDIA_GC_PREFIX: str = Field(default="processed/", env="MEDIA_GC_PREFIX")
+
+    # ------------ Вложения к заявлениям ------------
+    ATTACHMENT_DOWNLOAD_CONCURRENCY: int = Field(default=4, env="ATTACHMENT_DOWNLOAD_CONCURRENCY")
+    ATTACHMENT_MAX_FILE_BYTES: int = Field(default=10 * 1024 * 1024, env="ATTACHMENT_MAX_FILE_BYTES")
+    ATTACHMENT_MAX_TOTAL_BYTES: int = Field(default=20 * 1024 * 1024, env="ATTACHMENT_MAX_TOTAL_BYTES")
+    ATTACHMENT_CACHE_DIR: str = Field(default="cache/attachments", env="ATTACHMENT_CACHE_DIR")
+    ATTACHMENT_CACHE_MAX_BYTES: int = Field(default=512 * 1024 * 1024, env="ATTACHMENT_CACHE_MAX_BYTES")
+
+    # ------------ Список заявок ------------
+    REPORTS_COUNT_CACHE_SECONDS: float = Field(default=30.0, env="REPORTS_COUNT_CACHE_SECONDS")
+    REPORTS_COUNT_CACHE_SIZE: int = Field(default=1024, env="REPORTS_COUNT_CACHE_SIZE")
 
 
     model_config = SettingsConfigDict(
@@ -9,6 +9,12 @@ import os
 import sys
 
 from max_bot.main import dp, bot
+from backend.services.media_gc_service import MediaGarbageCollector
+from backend.services.contacts_directory_service import ContactsDirectoryService
+from backend.services.ai_agent_service import get_agent_service
+from backend.core.executors import shutdown_stage_executors
+from backend.services.external_services.geo_service import GeocodingService
+from backend.services.external_services.gigachat_service import GigaChatService
 
 logger.remove()
 logger.add(
@@ -51,17 +57,54 @@ def create_base_app(configs):
         else:
             logger.error("Модель не найдена, скачайте с облака: https://disk.yandex.ru/d/BQkOm1xGN9l6hQ")
 
+        await GeocodingService.open_client()
+
         bot_task = asyncio.create_task(dp.start_polling(bot))
         logger.info("Бот запущен в фоновом режиме")
 
+        media_gc_task = None
+        if configs.MEDIA_GC_ENABLED:
+            media_gc_task = asyncio.create_task(MediaGarbageCollector().run_periodically())
+            logger.info("Очистка медиа в S3 запущена в фоновом режиме")
+
+        if configs.BROWSER_POOL_WARM_ON_STARTUP:
+            # Запуск Chrome блокирующий, поэтому прогрев идёт в отдельном потоке
+            asyncio.get_running_loop().run_in_executor(None, get_agent_service().browser_pool.start)
+            logger.info("Прогрев пула браузеров запущен")
+
+        contacts_prewarm_task = None
+        if configs.CONTACTS_PREWARM_ON_STARTUP:
+            contacts_prewarm_task = asyncio.create_task(ContactsDirectoryService().prewarm())
+            logger.info("Прогрев справочника контактов запущен в фоновом режиме")
+
         yield
 
+        if contacts_prewarm_task is not None and not contacts_prewarm_task.done():
+            contacts_prewarm_task.cancel()
+            try:
+                await contacts_prewarm_task
+            except asyncio.CancelledError:
+                logger.info("Прогрев справочника контактов остановлен")
+
+        await asyncio.get_running_loop().run_in_executor(None, get_agent_service().browser_pool.close)
+
+        if media_gc_task is not None:
+            media_gc_task.cancel()
+            try:
+                await media_gc_task
+            except asyncio.CancelledError:
+                logger.info("Очистка медиа остановлена")
+
         bot_task.cancel()
         try:
             await bot_task
         except asyncio.CancelledError:
             logger.info("Бот остановлен")
 
+        await GeocodingService.close_client()
+        await GigaChatService.close_client()
+        shutdown_stage_executors()
+
         logger.info("Завершение работы приложения...")
 
     app = FastAPI(
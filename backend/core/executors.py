@@ -0,0 +1,50 @@
+"""
+Отдельные пулы потоков для блокирующих этапов обработки заявлений.
+
+У каждого этапа свой ограниченный пул: долгий поиск контактов через браузер
+не занимает потоки генерации документов и отправки почты, а event loop
+FastAPI и бота не блокируется ни одним из них.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, TypeVar
+
+from backend.core.config import configs
+
+T = TypeVar("T")
+
+STAGE_CONTACTS = "contacts"
+STAGE_DOCUMENT = "document"
+STAGE_EMAIL = "email"
+
+_STAGE_SIZES = {
+    STAGE_CONTACTS: configs.BROWSER_POOL_SIZE,
+    STAGE_DOCUMENT: configs.STAGE_DOCUMENT_WORKERS,
+    STAGE_EMAIL: configs.STAGE_EMAIL_WORKERS,
+}
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+
+
+def get_stage_executor(stage: str) -> ThreadPoolExecutor:
+    """Пул потоков этапа (создаётся при первом обращении)"""
+    executor = _executors.get(stage)
+    if executor is None:
+        executor = ThreadPoolExecutor(max_workers=_STAGE_SIZES[stage], thread_name_prefix=f"stage-{stage}")
+        _executors[stage] = executor
+    return executor
+
+
+async def run_in_stage(stage: str, func: Callable[..., T], *args, **kwargs) -> T:
+    """Выполняет блокирующую функцию в пуле этапа"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_stage_executor(stage), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_stage_executors() -> None:
+    """Останавливает пулы этапов (вызывается из lifespan)"""
+    for executor in _executors.values():
+        executor.shutdown(wait=False, cancel_futures=True)
+    _executors.clear()
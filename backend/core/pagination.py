@@ -0,0 +1,31 @@
+"""
+Курсор keyset-пагинации по (created_at, uuid).
+
+Курсор непрозрачен для клиента: это base64 от JSON с ключом последней
+записи страницы. Следующая страница выбирается условием
+(created_at, uuid) < (курсор), поэтому её стоимость не зависит от глубины.
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Tuple
+
+
+class InvalidCursorError(ValueError):
+    """Курсор повреждён или получен не от этого API"""
+
+
+def encode_cursor(created_at: datetime, item_uuid: uuid.UUID) -> str:
+    payload = json.dumps({"c": created_at.isoformat(), "u": str(item_uuid)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["c"]), uuid.UUID(payload["u"])
+    except (ValueError, KeyError, TypeError, UnicodeError) as e:
+        raise InvalidCursorError(str(e)) from e
@@ -3,7 +3,7 @@ from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.core.database import get_async_session
-from backend.services.ai_agent_service import AIAgentService
+from backend.services.ai_agent_service import AIAgentService, get_agent_service
 from backend.services.document_service import DocumentService
 from backend.services.external_services.email_service import EmailService
 from backend.services.external_services.gigachat_service import GigaChatService
@@ -36,7 +36,6 @@ ReportServiceDep = Annotated[ReportService, Depends(get_report_service)]
 _email_service = None
 _document_service = None
 _gigachat_service = None
-_ai_agent_service = None
 
 
 def get_email_service() -> EmailService:
@@ -65,10 +64,7 @@ def get_gigachat_service() -> GigaChatService:
 
 def get_ai_agent_service() -> AIAgentService:
     """Singleton: Получение AI Agent сервиса"""
-    global _ai_agent_service
-    if _ai_agent_service is None:
-        _ai_agent_service = AIAgentService()
-    return _ai_agent_service
+    return get_agent_service()
 
 
 EmailServiceDep = Annotated[EmailService, Depends(get_email_service)]
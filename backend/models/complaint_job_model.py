@@ -0,0 +1,71 @@
+from sqlalchemy import String, Text, DateTime, Enum, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from datetime import datetime
+from typing import Optional
+import enum
+import uuid as uuid_lib
+
+from backend.core.database import Base
+
+
+class ComplaintJobStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+
+class ComplaintJob(Base):
+    """
+    Задание на обработку и отправку заявления (очередь в PostgreSQL)
+    """
+    __tablename__ = "complaint_jobs"
+
+    # Совпадает с reports.ai_agent_task_id
+    uuid: Mapped[uuid_lib.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid_lib.uuid4
+    )
+
+    report_uuid: Mapped[uuid_lib.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("reports.uuid", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+
+    status: Mapped[ComplaintJobStatus] = mapped_column(
+        Enum(ComplaintJobStatus),
+        default=ComplaintJobStatus.PENDING,
+        nullable=False
+    )
+
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=5, nullable=False)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    run_after: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+    locked_by: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+    locked_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False
+    )
+
+    def __repr__(self):
+        return f"<ComplaintJob(uuid={self.uuid}, report={self.report_uuid}, status={self.status})>"
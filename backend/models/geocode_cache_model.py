@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from backend.core.database import Base
+
+
+class GeocodeCacheEntry(Base):
+    """
+    Кэш обратного геокодирования по ячейкам квантованной сетки координат
+    """
+    __tablename__ = "geocode_cache"
+
+    cell: Mapped[str] = mapped_column(String(64), primary_key=True)
+    address: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
@@ -0,0 +1,80 @@
+from sqlalchemy import String, Text, DateTime, Enum, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from datetime import datetime
+from typing import Optional
+import enum
+import uuid as uuid_lib
+
+from backend.core.database import Base
+
+
+class OutboundEmailStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    SENDING = "SENDING"
+    SENT = "SENT"
+    FAILED = "FAILED"
+
+
+class OutboundEmail(Base):
+    """
+    Письмо в исходящей очереди. Готовое MIME-сообщение лежит в спуле (maildir),
+    в таблице только адресат и состояние доставки.
+    """
+    __tablename__ = "outbound_emails"
+
+    uuid: Mapped[uuid_lib.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid_lib.uuid4
+    )
+
+    report_uuid: Mapped[Optional[uuid_lib.UUID]] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("reports.uuid", ondelete="CASCADE"),
+        nullable=True,
+        index=True
+    )
+
+    to_email: Mapped[str] = mapped_column(String(320), nullable=False)
+    # Домен получателя, по нему ограничивается частота отправки
+    recipient_domain: Mapped[str] = mapped_column(String(255), nullable=False)
+    subject: Mapped[str] = mapped_column(Text, nullable=False)
+    # Имя файла сообщения в спуле
+    spool_key: Mapped[str] = mapped_column(String(255), nullable=False)
+    size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    status: Mapped[OutboundEmailStatus] = mapped_column(
+        Enum(OutboundEmailStatus),
+        default=OutboundEmailStatus.PENDING,
+        nullable=False
+    )
+
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3, nullable=False)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    run_after: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+    locked_by: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+    locked_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False
+    )
+
+    def __repr__(self):
+        return f"<OutboundEmail(uuid={self.uuid}, to={self.to_email}, status={self.status})>"
@@ -1,5 +1,5 @@
 # report_model.py
-from sqlalchemy import String, Text, DateTime, Enum, ForeignKey, Float, Integer, JSON
+from sqlalchemy import String, Text, DateTime, Enum, ForeignKey, Float, Integer, JSON, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
@@ -28,19 +28,28 @@ class ReportPriority(str, enum.Enum):
 
 class Report(Base):
     __tablename__ = "reports"
+    # Индексы повторяют фильтры списка заявок и его сортировку (created_at, uuid) DESC,
+    # чтобы страница читалась из индекса без сортировки всей выборки
+    __table_args__ = (
+        Index("ix_reports_created_at_uuid", text("created_at DESC"), text("uuid DESC")),
+        Index("ix_reports_user_created_at", "user_id", text("created_at DESC"), text("uuid DESC")),
+        Index("ix_reports_status_created_at", "status", text("created_at DESC"), text("uuid DESC")),
+        Index("ix_reports_priority_created_at", "priority", text("created_at DESC"), text("uuid DESC")),
+        # Отправленные заявки пользователя (всё, кроме черновиков)
+        Index("ix_reports_user_submitted", "user_id", postgresql_where=text("status <> 'DRAFT'")),
+        {"extend_existing": True},
+    )
 
     uuid: Mapped[uuid_lib.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid_lib.uuid4,
-        index=True
+        default=uuid_lib.uuid4
     )
 
     user_id: Mapped[Optional[int]] = mapped_column(
         Integer,
         ForeignKey("users.max_user_id", ondelete="SET NULL"),
-        nullable=True,
-        index=True
+        nullable=True
     )
 
     latitude: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
@@ -63,14 +72,12 @@ class Report(Base):
     status: Mapped[ReportStatus] = mapped_column(
         Enum(ReportStatus),
         default=ReportStatus.DRAFT,
-        nullable=False,
-        index=True
+        nullable=False
     )
     priority: Mapped[ReportPriority] = mapped_column(
         Enum(ReportPriority),
         default=ReportPriority.MEDIUM,
-        nullable=False,
-        index=True
+        nullable=False
     )
 
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -81,6 +88,21 @@ class Report(Base):
         server_default=func.now(),
         nullable=False
     )
+    submitted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # Обработка заявления воркером очереди complaint_jobs
+    ai_agent_task_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    ai_agent_status: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    organization_name: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    # Текст заявления; пока идёт генерация, обновляется по мере поступления токенов
+    complaint_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Длительность этапов обработки заявления, секунды
+    stage_timings: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    # Доставка письма из исходящей очереди: queued | retrying | sent | failed
+    email_status: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    email_sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Причина последней неудачной отправки письма (reason, smtp_code, message, attempts)
+    email_error: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
 
     def __repr__(self):
         return f"<Report(uuid={self.uuid}, status={self.status}, address={self.address})>"
@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, DateTime, Float
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from backend.core.database import Base
+
+
+class RoadAgencyContact(Base):
+    """
+    Справочник контактов управлений дорожной деятельности по городам
+    """
+    __tablename__ = "road_agency_contacts"
+
+    # Нормализованные "регион|город"
+    city_key: Mapped[str] = mapped_column(String(300), primary_key=True)
+    city: Mapped[str] = mapped_column(String(200), nullable=False)
+    region: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+
+    organization: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    email: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    phone: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    website: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+
+    confidence: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    source: Mapped[str] = mapped_column(String(50), default="alisa", nullable=False)
+
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
@@ -1,10 +1,30 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, delete
+from sqlalchemy import select, func, delete, update, text, tuple_, Row
+from datetime import datetime
 from typing import Optional, List, Tuple
 import uuid as uuid_lib
 
 from backend.models.report_model import Report, ReportStatus, ReportPriority
 
+# Колонки, нужные списку заявок: без текстов (description, comment, complaint_text) и служебных JSON
+LIST_COLUMNS = (
+    Report.uuid,
+    Report.user_id,
+    Report.latitude,
+    Report.longitude,
+    Report.address,
+    Report.status,
+    Report.priority,
+    Report.total_potholes,
+    Report.max_risk,
+    Report.created_at,
+    Report.submitted_at,
+    Report.image_url,
+    Report.image_urls,
+    Report.video_url,
+)
+
+
 class ReportRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -29,6 +49,11 @@ class ReportRepository:
         await self.db.refresh(report)
         return report
 
+    async def update_fields(self, report_uuid: uuid_lib.UUID, **values) -> None:
+        """Точечно обновить поля отчета без загрузки объекта"""
+        await self.db.execute(update(Report).where(Report.uuid == report_uuid).values(**values))
+        await self.db.commit()
+
     async def delete(self, report: Report) -> None:
         """Удалить отчет"""
         await self.db.delete(report)
@@ -48,14 +73,7 @@ class ReportRepository:
         Возвращает (список отчетов, общее количество).
         """
         stmt = select(Report)
-        where_conditions = []
-
-        if user_id is not None:
-            where_conditions.append(Report.user_id == user_id)
-        if status is not None:
-            where_conditions.append(Report.status == status)
-        if priority is not None:
-            where_conditions.append(Report.priority == priority)
+        where_conditions = self._list_filters(user_id, status, priority)
 
         if where_conditions:
             stmt = stmt.where(*where_conditions)
@@ -76,16 +94,76 @@ class ReportRepository:
 
         return reports, total
 
+    @staticmethod
+    def _list_filters(
+        user_id: Optional[int],
+        status: Optional[ReportStatus],
+        priority: Optional[ReportPriority]
+    ) -> list:
+        conditions = []
+        if user_id is not None:
+            conditions.append(Report.user_id == user_id)
+        if status is not None:
+            conditions.append(Report.status == status)
+        if priority is not None:
+            conditions.append(Report.priority == priority)
+        return conditions
+
+    async def get_page(
+        self,
+        user_id: Optional[int] = None,
+        status: Optional[ReportStatus] = None,
+        priority: Optional[ReportPriority] = None,
+        limit: int = 50,
+        after: Optional[Tuple[datetime, uuid_lib.UUID]] = None,
+        skip: int = 0
+    ) -> List[Row]:
+        """
+        Страница отчетов от новых к старым, без подсчета общего количества.
+        Возвращает строки с колонками LIST_COLUMNS, а не ORM-объекты.
+        after - ключ (created_at, uuid) последней записи предыдущей страницы:
+        выборка продолжается по индексу, а не через OFFSET.
+        """
+        stmt = select(*LIST_COLUMNS).where(*self._list_filters(user_id, status, priority))
+        if after is not None:
+            stmt = stmt.where(tuple_(Report.created_at, Report.uuid) < tuple_(*after))
+        elif skip:
+            stmt = stmt.offset(skip)
+        stmt = stmt.order_by(Report.created_at.desc(), Report.uuid.desc()).limit(limit)
+
+        result = await self.db.execute(stmt)
+        return list(result.all())
+
+    async def count(
+        self,
+        user_id: Optional[int] = None,
+        status: Optional[ReportStatus] = None,
+        priority: Optional[ReportPriority] = None
+    ) -> int:
+        """Точное количество отчетов по фильтрам"""
+        stmt = select(func.count(Report.uuid)).where(*self._list_filters(user_id, status, priority))
+        result = await self.db.execute(stmt)
+        return result.scalar() or 0
+
+    async def estimate_total(self) -> Optional[int]:
+        """
+        Приблизительное число строк таблицы из статистики PostgreSQL (pg_class.reltuples).
+        None, если таблица еще не анализировалась.
+        """
+        result = await self.db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'reports'::regclass")
+        )
+        estimate = result.scalar()
+        if estimate is None or estimate < 0:
+            return None
+        return int(estimate)
+
     async def count_submitted_reports_by_user(self, user_id: int) -> int:
         """Подсчет отправленных заявок пользователя"""
-        stmt = select(func.count(Report.uuid)).where(
+        # Условие совпадает с предикатом частичного индекса ix_reports_user_submitted
+        stmt = select(func.count()).select_from(Report).where(
             Report.user_id == user_id,
-            Report.status.in_([
-                ReportStatus.SUBMITTED,
-                ReportStatus.IN_REVIEW,
-                ReportStatus.IN_PROGRESS,
-                ReportStatus.COMPLETED
-            ])
+            Report.status != ReportStatus.DRAFT
         )
         result = await self.db.execute(stmt)
         return result.scalar() or 0
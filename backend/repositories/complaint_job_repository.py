@@ -0,0 +1,93 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import uuid as uuid_lib
+
+from backend.models.complaint_job_model import ComplaintJob, ComplaintJobStatus
+
+
+class ComplaintJobRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def claim(self, worker_id: str) -> Optional[ComplaintJob]:
+        """
+        Забрать одно готовое к выполнению задание.
+        FOR UPDATE SKIP LOCKED: параллельные воркеры не получают одно и то же задание.
+        """
+        stmt = (
+            select(ComplaintJob)
+            .where(
+                ComplaintJob.status == ComplaintJobStatus.PENDING,
+                ComplaintJob.run_after <= datetime.now(timezone.utc)
+            )
+            .order_by(ComplaintJob.run_after)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job = (await self.session.execute(stmt)).scalar_one_or_none()
+        if job is None:
+            await self.session.rollback()
+            return None
+
+        job.status = ComplaintJobStatus.RUNNING
+        job.attempts += 1
+        job.locked_by = worker_id
+        job.locked_at = datetime.now(timezone.utc)
+        await self.session.commit()
+        return job
+
+    async def mark_done(self, job_uuid: uuid_lib.UUID) -> None:
+        await self._set(job_uuid, status=ComplaintJobStatus.DONE, locked_by=None, locked_at=None)
+
+    async def mark_failed(self, job_uuid: uuid_lib.UUID, error: str) -> None:
+        await self._set(job_uuid, status=ComplaintJobStatus.FAILED, last_error=error, locked_by=None, locked_at=None)
+
+    async def reschedule(self, job_uuid: uuid_lib.UUID, delay: float, error: Optional[str] = None) -> None:
+        """Вернуть задание в очередь с задержкой"""
+        await self._set(
+            job_uuid,
+            status=ComplaintJobStatus.PENDING,
+            run_after=datetime.now(timezone.utc) + timedelta(seconds=delay),
+            last_error=error,
+            locked_by=None,
+            locked_at=None
+        )
+
+    async def heartbeat(self, job_uuid: uuid_lib.UUID, worker_id: str) -> bool:
+        """
+        Продлить блокировку выполняемого задания.
+        False - задание уже не принадлежит воркеру (вернули в очередь как зависшее)
+        """
+        result = await self.session.execute(
+            update(ComplaintJob)
+            .where(
+                ComplaintJob.uuid == job_uuid,
+                ComplaintJob.status == ComplaintJobStatus.RUNNING,
+                ComplaintJob.locked_by == worker_id
+            )
+            .values(locked_at=datetime.now(timezone.utc))
+        )
+        await self.session.commit()
+        return result.rowcount > 0
+
+    async def release_stale(self, lock_timeout: float) -> int:
+        """Вернуть в очередь задания, зависшие у упавших воркеров"""
+        threshold = datetime.now(timezone.utc) - timedelta(seconds=lock_timeout)
+        result = await self.session.execute(
+            update(ComplaintJob)
+            .where(
+                ComplaintJob.status == ComplaintJobStatus.RUNNING,
+                ComplaintJob.locked_at < threshold
+            )
+            .values(status=ComplaintJobStatus.PENDING, locked_by=None, locked_at=None)
+        )
+        await self.session.commit()
+        return result.rowcount
+
+    async def _set(self, job_uuid: uuid_lib.UUID, **values) -> None:
+        await self.session.execute(
+            update(ComplaintJob).where(ComplaintJob.uuid == job_uuid).values(**values)
+        )
+        await self.session.commit()
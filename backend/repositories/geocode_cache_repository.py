@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.models.geocode_cache_model import GeocodeCacheEntry
+
+
+class GeocodeCacheRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_fresh(self, cell: str, not_before: datetime) -> Optional[GeocodeCacheEntry]:
+        """Получить запись кэша, обновлённую не раньше not_before"""
+        query = select(GeocodeCacheEntry).where(
+            GeocodeCacheEntry.cell == cell,
+            GeocodeCacheEntry.updated_at >= not_before
+        )
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def upsert(self, cell: str, address: Optional[str]) -> None:
+        """Сохранить адрес для ячейки (перезаписывает существующую запись)"""
+        stmt = insert(GeocodeCacheEntry).values(cell=cell, address=address, updated_at=datetime.now().astimezone())
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[GeocodeCacheEntry.cell],
+            set_={"address": stmt.excluded.address, "updated_at": stmt.excluded.updated_at}
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
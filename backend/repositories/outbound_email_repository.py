@@ -0,0 +1,121 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+import uuid as uuid_lib
+
+from backend.models.outbound_email_model import OutboundEmail, OutboundEmailStatus
+
+
+class OutboundEmailRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def claim_batch(self, worker_id: str, limit: int) -> List[OutboundEmail]:
+        """
+        Забрать до limit писем, готовых к отправке.
+        FOR UPDATE SKIP LOCKED: параллельные воркеры не получают одно и то же письмо.
+        """
+        stmt = (
+            select(OutboundEmail)
+            .where(
+                OutboundEmail.status == OutboundEmailStatus.PENDING,
+                OutboundEmail.run_after <= datetime.now(timezone.utc)
+            )
+            .order_by(OutboundEmail.run_after)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        emails = list((await self.session.execute(stmt)).scalars().all())
+        if not emails:
+            await self.session.rollback()
+            return []
+
+        now = datetime.now(timezone.utc)
+        for email in emails:
+            email.status = OutboundEmailStatus.SENDING
+            email.attempts += 1
+            email.locked_by = worker_id
+            email.locked_at = now
+        await self.session.commit()
+        return emails
+
+    async def mark_sent(self, email_uuid: uuid_lib.UUID) -> None:
+        await self._set(
+            email_uuid,
+            status=OutboundEmailStatus.SENT,
+            sent_at=datetime.now(timezone.utc),
+            last_error=None,
+            locked_by=None,
+            locked_at=None
+        )
+
+    async def mark_failed(self, email_uuid: uuid_lib.UUID, error: str) -> None:
+        await self._set(email_uuid, status=OutboundEmailStatus.FAILED, last_error=error, locked_by=None, locked_at=None)
+
+    async def reschedule(
+            self,
+            email_uuid: uuid_lib.UUID,
+            delay: float,
+            error: Optional[str] = None,
+            count_attempt: bool = True
+    ) -> None:
+        """
+        Вернуть письмо в очередь с задержкой.
+        count_attempt=False - письмо не отправлялось (например, отложено лимитом домена).
+        """
+        values = dict(
+            status=OutboundEmailStatus.PENDING,
+            run_after=datetime.now(timezone.utc) + timedelta(seconds=delay),
+            locked_by=None,
+            locked_at=None
+        )
+        if error is not None:
+            values["last_error"] = error
+        if not count_attempt:
+            values["attempts"] = OutboundEmail.attempts - 1
+        await self._set(email_uuid, **values)
+
+    async def release_stale(self, lock_timeout: float) -> int:
+        """Вернуть в очередь письма, зависшие у упавших воркеров"""
+        threshold = datetime.now(timezone.utc) - timedelta(seconds=lock_timeout)
+        result = await self.session.execute(
+            update(OutboundEmail)
+            .where(
+                OutboundEmail.status == OutboundEmailStatus.SENDING,
+                OutboundEmail.locked_at < threshold
+            )
+            .values(status=OutboundEmailStatus.PENDING, locked_by=None, locked_at=None)
+        )
+        await self.session.commit()
+        return result.rowcount
+
+    async def release_locked(self, worker_id: str, delay: float = 0.0, count_attempt: bool = False) -> int:
+        """
+        Вернуть в очередь письма, ещё удерживаемые воркером.
+        count_attempt=False - остановка воркера, письма не отправлялись.
+        """
+        values = dict(
+            status=OutboundEmailStatus.PENDING,
+            run_after=datetime.now(timezone.utc) + timedelta(seconds=delay),
+            locked_by=None,
+            locked_at=None
+        )
+        if not count_attempt:
+            values["attempts"] = OutboundEmail.attempts - 1
+        result = await self.session.execute(
+            update(OutboundEmail)
+            .where(
+                OutboundEmail.status == OutboundEmailStatus.SENDING,
+                OutboundEmail.locked_by == worker_id
+            )
+            .values(**values)
+        )
+        await self.session.commit()
+        return result.rowcount
+
+    async def _set(self, email_uuid: uuid_lib.UUID, **values) -> None:
+        await self.session.execute(
+            update(OutboundEmail).where(OutboundEmail.uuid == email_uuid).values(**values)
+        )
+        await self.session.commit()
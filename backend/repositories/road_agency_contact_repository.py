@@ -0,0 +1,27 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.models.road_agency_contact_model import RoadAgencyContact
+
+
+class RoadAgencyContactRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_by_key(self, city_key: str) -> Optional[RoadAgencyContact]:
+        """Получить запись справочника по нормализованному ключу"""
+        query = select(RoadAgencyContact).where(RoadAgencyContact.city_key == city_key)
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def upsert(self, **values) -> None:
+        """Создать или обновить запись справочника"""
+        stmt = insert(RoadAgencyContact).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[RoadAgencyContact.city_key],
+            set_={key: stmt.excluded[key] for key in values if key != "city_key"}
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
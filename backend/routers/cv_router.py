@@ -13,6 +13,7 @@ from backend.schemas.cv_schema import (
     DetectionResponse, MultipleDetectionResponse, VideoDetectionResponse
 )
 from backend.services.pothole_detection_service import PotholeDetectionService
+from backend.services.external_services.geo_service import GeocodingService
 
 cv_router = APIRouter(prefix="/api/detect", tags=["Анализ дорожного покрытия"])
 
@@ -172,3 +173,8 @@ async def detect_video(
         raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ошибка: {str(e)}")
+
+
+@cv_router.get("/geocoder/metrics", summary="Состояние и счётчики геокодера")
+async def geocoder_metrics():
+    return GeocodingService.get_metrics()
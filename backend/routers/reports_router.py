@@ -1,14 +1,14 @@
 # backend/routers/reports_router.py
 
-from fastapi import APIRouter, Depends, Query, BackgroundTasks
-from typing import Optional, Annotated
+from fastapi import APIRouter, Depends, Query, Response
+from typing import Optional
 import uuid
 
 from backend.depends import ReportServiceDep
 from backend.schemas.report_schema import (
     ReportCreateDraft, ReportUpdate,
     ReportDraftCreatedResponse, ReportResponse, ReportListResponse,
-    ReportSubmitResponse, ReportStatusEnum, ReportPriorityEnum
+    ReportSubmitResponse, ReportStatusEnum, ReportPriorityEnum, ReportCountModeEnum
 )
 
 report_router = APIRouter(prefix="/api/reports", tags=["Заявки"])
@@ -34,17 +34,17 @@ async def create_draft(
 )
 async def submit_report(
     report_uuid: uuid.UUID,
-    background_tasks: BackgroundTasks,
     report_service: ReportServiceDep = None
 ):
     """
     Отправить заявку на обработку.
+    Заявка ставится в очередь, которую разбирают воркеры (backend.workers.complaint_worker).
     Поисковый агент будет:
     1. Искать подходящий канал взаимодействия (email, форма, API)
     2. Формировать и отправлять заявку
     3. Отслеживать статус
     """
-    return await report_service.submit_report(report_uuid, background_tasks)
+    return await report_service.submit_report(report_uuid)
 
 
 @report_router.get(
@@ -83,18 +83,24 @@ async def list_reports(
     user_id: Optional[int] = Query(None, description="Фильтр по пользователю"),
     status: Optional[ReportStatusEnum] = Query(None, description="Фильтр по статусу"),
     priority: Optional[ReportPriorityEnum] = Query(None, description="Фильтр по приоритету"),
-    skip: int = Query(0, ge=0, description="Пропустить записей"),
+    skip: int = Query(0, ge=0, description="Пропустить записей (без курсора)"),
     limit: int = Query(50, ge=1, le=100, description="Лимит записей"),
+    cursor: Optional[str] = Query(None, description="next_cursor из предыдущего ответа"),
+    count: ReportCountModeEnum = Query(ReportCountModeEnum.EXACT, description="Подсчет общего количества"),
     report_service: ReportServiceDep = None
 ):
-    """Получение списка заявок с фильтрацией и пагинацией"""
-    return await report_service.get_list(
+    """Получение списка заявок с фильтрацией и пагинацией (по курсору или skip)"""
+    page = await report_service.get_list(
         user_id=user_id,
         status=status,
         priority=priority,
         skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
+        count=count
     )
+    # Страница уже собрана по схеме: сериализуем сразу, без повторной валидации по response_model
+    return Response(content=page.model_dump_json(), media_type="application/json")
 
 
 @report_router.delete(
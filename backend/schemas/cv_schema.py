@@ -62,6 +62,13 @@ class SeverityStats(BaseModel):
     LOW: int = 0
 
 
+class ImageRenditions(BaseModel):
+    """URL вариантов размеченного изображения"""
+    full: Optional[str] = Field(None, description="Полное изображение (progressive JPEG)")
+    medium: Optional[str] = Field(None, description="Средний размер (WebP)")
+    thumbnail: Optional[str] = Field(None, description="Превью (WebP)")
+
+
 class DetectionResponse(BaseModel):
     """Ответ при обработке одного изображения"""
     user_id: str
@@ -71,6 +78,8 @@ class DetectionResponse(BaseModel):
     max_risk: float
     total_potholes: int
     image_url: str
+    thumbnail_url: Optional[str] = Field(None, description="Уменьшенная копия для превью")
+    renditions: Optional[ImageRenditions] = None
     address: Optional[str] = Field(None, description="Адрес (если удалось определить)")
     latitude: str
     longitude: str
@@ -86,6 +95,8 @@ class SingleImageResult(BaseModel):
     max_risk: float
     total_potholes: int
     image_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    renditions: Optional[ImageRenditions] = None
     error: Optional[str] = None
 
 
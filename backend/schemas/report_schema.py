@@ -4,6 +4,8 @@ from datetime import datetime
 from enum import Enum
 import uuid
 
+from backend.schemas.cv_schema import ImageRenditions
+
 
 class ReportStatusEnum(str, Enum):
     DRAFT = "draft"
@@ -20,6 +22,13 @@ class ReportPriorityEnum(str, Enum):
     CRITICAL = "critical"
 
 
+class ReportCountModeEnum(str, Enum):
+    EXACT = "exact"          # точное значение, без кэша
+    CACHED = "cached"        # точное значение, кэшируется на REPORTS_COUNT_CACHE_SECONDS
+    ESTIMATED = "estimated"  # по статистике PostgreSQL, если фильтров нет (иначе как cached)
+    NONE = "none"            # не считать
+
+
 class SeverityStats(BaseModel):
     CRITICAL: int = 0
     HIGH: int = 0
@@ -81,6 +90,16 @@ class ReportResponse(BaseModel):
     description: Optional[str]
     comment: Optional[str]
     created_at: datetime
+    submitted_at: Optional[datetime] = None
+    ai_agent_task_id: Optional[str] = None
+    ai_agent_status: Optional[str] = None
+    organization_name: Optional[str] = None
+    complaint_text: Optional[str] = None
+    stage_timings: Optional[Dict] = None
+    email_status: Optional[str] = None
+    email_sent_at: Optional[datetime] = None
+    email_error: Optional[Dict] = None
+    renditions: List[ImageRenditions] = []
 
     class Config:
         from_attributes = True
@@ -101,14 +120,18 @@ class ReportListItem(BaseModel):
     image_urls: Optional[Dict] = None
     video_url: Optional[str] = None
     submitted_at: Optional[datetime] = None
+    renditions: List[ImageRenditions] = []
 
     class Config:
         from_attributes = True
 
 
 class ReportListResponse(BaseModel):
-    total: int
+    total: Optional[int] = None
+    total_estimated: bool = False
     items: List[ReportListItem]
+    # Курсор следующей страницы; None - страниц больше нет
+    next_cursor: Optional[str] = None
 
 
 class ReportSubmitResponse(BaseModel):
@@ -8,14 +8,19 @@ import time
 import json
 import random
 from typing import Optional, Dict
+from urllib.parse import quote_plus
 from dotenv import load_dotenv
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from loguru import logger
 
+from backend.core.config import configs
+from backend.services.browser_pool import BrowserPool, PooledBrowser
+from backend.services.external_services.offline_geocoder import OfflineGeocoder
+
 load_dotenv()
 
 SELENIUM_TIMEOUT = int(os.getenv('SELENIUM_TIMEOUT', '20'))
@@ -24,6 +29,10 @@ REQUEST_DELAY_MIN = int(os.getenv('REQUEST_DELAY_MIN', '5'))
 REQUEST_DELAY_MAX = int(os.getenv('REQUEST_DELAY_MAX', '15'))
 
 
+class ContactsScrapeError(Exception):
+    """Поиск не состоялся (ошибка браузера, капча, Алиса не ответила) - это не отсутствие контактов"""
+
+
 class ContentLoadedCondition:
     """Кастомное условие: ждёт загрузки контента с email или достаточным количеством текста."""
 
@@ -53,11 +62,11 @@ class ContentLoadedCondition:
 class AIAgentService:
     """Сервис для поиска контактов управлений дорожной деятельности через Алису."""
 
-    def __init__(self):
+    def __init__(self, browser_pool: Optional[BrowserPool] = None):
         self.email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
         self.phone_pattern = r'\+7\s?\(?\d{3}\)?\s?\d{3}[-\s]?\d{2}[-\s]?\d{2}'
         self.cache = {}
-        self.last_request_time = 0
+        self.browser_pool = browser_pool or BrowserPool.get_shared(self._setup_driver)
 
     def _setup_driver(self) -> uc.Chrome:
         """Настройка undetected Chrome WebDriver для обхода капчи."""
@@ -80,8 +89,20 @@ class AIAgentService:
             logger.error(f"Chrome WebDriver initialization error: {e}")
             raise
 
-    def _extract_city(self, address: str) -> Optional[str]:
-        """Извлекает название города из адреса."""
+    def _extract_city(self, address: str, coordinates: Optional[dict] = None) -> Optional[str]:
+        """
+        Определяет город: по структурированному полю офлайн-индекса,
+        если он доступен и переданы координаты, иначе - разбором строки адреса.
+        """
+        geocoder = OfflineGeocoder.get_shared()
+        if geocoder is not None and coordinates:
+            try:
+                result = geocoder.reverse(float(coordinates["lat"]), float(coordinates["lon"]))
+                if result and result.city:
+                    return result.city
+            except (KeyError, TypeError, ValueError) as e:
+                logger.debug(f"Offline city lookup skipped: {e}")
+
         match = re.search(r'г\s+([А-Яа-яЁё\s\-]+?)(?=\s*,|\s+край|\s+область|$)', address, re.IGNORECASE)
         return match.group(1).strip() if match else None
 
@@ -95,9 +116,9 @@ class AIAgentService:
         ]
         return queries[0]
 
-    def _wait_before_request(self):
-        """Добавляет случайную задержку между запросами для обхода блокировок."""
-        elapsed = time.time() - self.last_request_time
+    def _wait_before_request(self, browser: PooledBrowser):
+        """Добавляет случайную задержку между запросами одного браузера для обхода блокировок."""
+        elapsed = time.time() - browser.last_request_time
         min_delay = REQUEST_DELAY_MIN
 
         if elapsed < min_delay:
@@ -105,7 +126,7 @@ class AIAgentService:
             logger.debug(f"Waiting {delay:.1f}s before request")
             time.sleep(delay)
 
-        self.last_request_time = time.time()
+        browser.last_request_time = time.time()
 
     def _simulate_human_behavior(self, driver):
         """Имитирует человеческое поведение для обхода антибот-систем."""
@@ -121,8 +142,11 @@ class AIAgentService:
         """)
 
     def _parse_alisa_answer(self, query: str) -> Dict[str, Optional[str]]:
-        """Парсит ответ Алисы и извлекает email и телефон."""
-        driver = None
+        """
+        Парсит ответ Алисы и извлекает email и телефон.
+        Raises:
+            ContactsScrapeError: ответ Алисы получить не удалось
+        """
         result = {
             'email': None,
             'phone': None,
@@ -130,131 +154,188 @@ class AIAgentService:
         }
 
         try:
-            self._wait_before_request()
+            with self.browser_pool.session() as browser:
+                self._search_with_driver(browser, query, result)
+        except ContactsScrapeError:
+            raise
+        except Exception as e:
+            logger.error(f"Browser error: {e}")
+            raise ContactsScrapeError(f"Browser error: {e}") from e
 
-            logger.info(f"Starting browser for query: '{query}'")
-            driver = self._setup_driver()
+        return result
 
-            search_url = f"https://ya.ru/search/?text={query}"
-            driver.get(search_url)
+    def _search_with_driver(self, browser: PooledBrowser, query: str, result: Dict[str, Optional[str]]):
+        """Поиск в выданном из пула браузере; результат дописывается в result."""
+        driver = browser.driver
+        self._wait_before_request(browser)
 
-            self._simulate_human_behavior(driver)
+        logger.info(f"Searching with pooled browser (use {browser.uses + 1}): '{query}'")
+        search_url = configs.ALISA_SEARCH_URL.format(query=quote_plus(query))
+        driver.get(search_url)
 
-            wait = WebDriverWait(driver, SELENIUM_TIMEOUT)
+        self._simulate_human_behavior(driver)
 
-            try:
-                close_button = wait.until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, 'button[aria-label="Нет, спасибо"]'))
-                )
-                time.sleep(random.uniform(0.5, 1.5))
-                close_button.click()
-            except (TimeoutException, NoSuchElementException):
-                pass
+        wait = WebDriverWait(driver, SELENIUM_TIMEOUT)
 
-            try:
-                wait.until(EC.invisibility_of_element_located((By.CLASS_NAME, "Distribution-SplashScreenModalScene")))
-            except TimeoutException:
-                pass
+        try:
+            close_button = wait.until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, 'button[aria-label="Нет, спасибо"]'))
+            )
+            time.sleep(random.uniform(0.5, 1.5))
+            close_button.click()
+        except (TimeoutException, NoSuchElementException):
+            pass
 
-            if "captcha" in driver.current_url.lower() or "showcaptcha" in driver.current_url.lower():
-                logger.warning("Captcha detected")
-                return result
+        try:
+            wait.until(EC.invisibility_of_element_located((By.CLASS_NAME, "Distribution-SplashScreenModalScene")))
+        except TimeoutException:
+            pass
 
-            try:
-                alisa_links = driver.find_elements(By.PARTIAL_LINK_TEXT, "алиса")
-                if not alisa_links:
-                    alisa_links = driver.find_elements(By.PARTIAL_LINK_TEXT, "Алиса")
-
-                if alisa_links:
-                    logger.info("Clicking on Alisa tab")
-                    time.sleep(random.uniform(1, 2))
-                    driver.execute_script("arguments[0].click();", alisa_links[0])
-
-                    extended_wait = WebDriverWait(driver, ALISA_RESPONSE_TIMEOUT)
-
-                    logger.info(f"Waiting up to {ALISA_RESPONSE_TIMEOUT}s for Alisa response")
-
-                    try:
-                        all_text = extended_wait.until(
-                            ContentLoadedCondition("FuturisMarkdown", self.email_pattern, 100)
-                        )
-
-                        if not all_text:
-                            logger.debug("Initial wait completed, checking content")
-                            max_retries = 10
-                            retry_count = 0
-
-                            while retry_count < max_retries:
-                                answer_blocks = driver.find_elements(By.CLASS_NAME, "FuturisMarkdown")
-                                all_text = "\n".join([block.text for block in answer_blocks if block.text])
-
-                                if re.search(self.email_pattern, all_text) or len(all_text) > 100:
-                                    logger.info(f"Content loaded successfully ({len(all_text)} chars)")
-                                    break
-
-                                logger.debug(f"Waiting for content, retry {retry_count + 1}/{max_retries}")
-                                time.sleep(2)
-                                retry_count += 1
-
-                            if retry_count >= max_retries:
-                                logger.warning("Max retries reached, content may be incomplete")
-                        else:
-                            logger.info(f"Content loaded successfully ({len(all_text)} chars)")
-
-                        answer_blocks = driver.find_elements(By.CLASS_NAME, "FuturisMarkdown")
-                        all_text = "\n".join([block.text for block in answer_blocks if block.text])
-
-                        if len(all_text) == 0:
-                            logger.warning("No text content found in answer blocks")
-                            return result
-
-                        logger.debug(f"Total text length: {len(all_text)}")
-
-                        emails = re.findall(self.email_pattern, all_text)
-                        unique_emails = list(set(emails))
-
-                        phones = re.findall(self.phone_pattern, all_text)
-                        unique_phones = list(set(phones))
-
-                        org_patterns = [
-                            r'(Управление дорожной деятельности[^.]*)',
-                            r'(УДД[^.]*)',
-                            r'(Администрация[^.]*)',
-                        ]
-                        for pattern in org_patterns:
-                            org_match = re.search(pattern, all_text)
-                            if org_match:
-                                result['organization'] = org_match.group(1).strip()
+        if "captcha" in driver.current_url.lower() or "showcaptcha" in driver.current_url.lower():
+            logger.warning("Captcha detected, browser will be recycled")
+            browser.recycle = True
+            raise ContactsScrapeError("Captcha detected")
+
+        try:
+            alisa_links = driver.find_elements(By.PARTIAL_LINK_TEXT, "алиса")
+            if not alisa_links:
+                alisa_links = driver.find_elements(By.PARTIAL_LINK_TEXT, "Алиса")
+
+            if alisa_links:
+                logger.info("Clicking on Alisa tab")
+                time.sleep(random.uniform(1, 2))
+                driver.execute_script("arguments[0].click();", alisa_links[0])
+
+                extended_wait = WebDriverWait(driver, ALISA_RESPONSE_TIMEOUT)
+
+                logger.info(f"Waiting up to {ALISA_RESPONSE_TIMEOUT}s for Alisa response")
+
+                try:
+                    all_text = extended_wait.until(
+                        ContentLoadedCondition("FuturisMarkdown", self.email_pattern, 100)
+                    )
+
+                    if not all_text:
+                        logger.debug("Initial wait completed, checking content")
+                        max_retries = 10
+                        retry_count = 0
+
+                        while retry_count < max_retries:
+                            answer_blocks = driver.find_elements(By.CLASS_NAME, "FuturisMarkdown")
+                            all_text = "\n".join([block.text for block in answer_blocks if block.text])
+
+                            if re.search(self.email_pattern, all_text) or len(all_text) > 100:
+                                logger.info(f"Content loaded successfully ({len(all_text)} chars)")
                                 break
 
-                        if unique_emails:
-                            result['email'] = unique_emails[0]
-                            logger.info(f"Found email: {result['email']}")
+                            logger.debug(f"Waiting for content, retry {retry_count + 1}/{max_retries}")
+                            time.sleep(2)
+                            retry_count += 1
+
+                        if retry_count >= max_retries:
+                            logger.warning("Max retries reached, content may be incomplete")
+                    else:
+                        logger.info(f"Content loaded successfully ({len(all_text)} chars)")
+
+                    answer_blocks = driver.find_elements(By.CLASS_NAME, "FuturisMarkdown")
+                    all_text = "\n".join([block.text for block in answer_blocks if block.text])
+
+                    if len(all_text) == 0:
+                        logger.warning("No text content found in answer blocks")
+                        raise ContactsScrapeError("Alisa answer is empty")
+
+                    logger.debug(f"Total text length: {len(all_text)}")
+
+                    emails = re.findall(self.email_pattern, all_text)
+                    unique_emails = list(set(emails))
+
+                    phones = re.findall(self.phone_pattern, all_text)
+                    unique_phones = list(set(phones))
 
-                        if unique_phones:
-                            result['phone'] = unique_phones[0]
-                            logger.info(f"Found phone: {result['phone']}")
+                    org_patterns = [
+                        r'(Управление дорожной деятельности[^.]*)',
+                        r'(УДД[^.]*)',
+                        r'(Администрация[^.]*)',
+                    ]
+                    for pattern in org_patterns:
+                        org_match = re.search(pattern, all_text)
+                        if org_match:
+                            result['organization'] = org_match.group(1).strip()
+                            break
 
-                        if not unique_emails and not unique_phones:
-                            logger.warning("No contacts found in response")
+                    if unique_emails:
+                        result['email'] = unique_emails[0]
+                        logger.info(f"Found email: {result['email']}")
 
-                    except TimeoutException:
-                        logger.error(f"Timeout: Alisa took longer than {ALISA_RESPONSE_TIMEOUT}s to respond")
+                    if unique_phones:
+                        result['phone'] = unique_phones[0]
+                        logger.info(f"Found phone: {result['phone']}")
 
-                else:
-                    logger.warning("Alisa tab not found")
+                    if not unique_emails and not unique_phones:
+                        logger.warning("No contacts found in response")
 
-            except Exception as e:
-                logger.error(f"Error parsing Alisa: {e}")
+                except TimeoutException:
+                    logger.error(f"Timeout: Alisa took longer than {ALISA_RESPONSE_TIMEOUT}s to respond")
+                    raise ContactsScrapeError(f"Alisa did not respond in {ALISA_RESPONSE_TIMEOUT}s")
 
+            else:
+                logger.warning("Alisa tab not found")
+                raise ContactsScrapeError("Alisa tab not found")
+
+        except ContactsScrapeError:
+            raise
         except Exception as e:
-            logger.error(f"Browser error: {e}")
+            logger.error(f"Error parsing Alisa: {e}")
+            raise ContactsScrapeError(f"Error parsing Alisa: {e}") from e
+
+    def _extract_region(self, address: str) -> Optional[str]:
+        """Регион (край, область, республика) из строки адреса"""
+        for part in address.split(","):
+            part = part.strip()
+            if re.search(r'\b(край|обл|область|респ|республика|АО|автономный округ)\b', part, re.IGNORECASE):
+                return part
+        return None
+
+    def city_not_found_result(self) -> dict:
+        """Контакты по умолчанию, если город определить не удалось."""
+        return {
+            "success": False,
+            "city": None,
+            "organization": "Росавтодор",
+            "email": "rad@rosavtodor.gov.ru",
+            "website": "https://rosavtodor.gov.ru",
+            "phone": None,
+            "status": "city_not_found"
+        }
 
-        finally:
-            if driver:
-                driver.quit()
+    def build_result(self, city: str, contacts: dict, status: str) -> dict:
+        """Ответ поиска контактов по найденным данным."""
+        if contacts.get('email'):
+            return {
+                "success": True,
+                "city": city,
+                "organization": contacts.get('organization') or f"Управление дорожной деятельности {city}",
+                "email": contacts['email'],
+                "website": contacts.get('website'),
+                "phone": contacts.get('phone'),
+                "status": status
+            }
+        return {
+            "success": False,
+            "city": city,
+            "organization": f"Администрация {city}",
+            "email": None,
+            "website": contacts.get('website'),
+            "phone": contacts.get('phone'),
+            "status": "email_not_found"
+        }
 
-        return result
+    def scrape_city_contacts(self, city: str) -> Dict[str, Optional[str]]:
+        """
+        Поиск контактов для города через Алису (блокирующий вызов браузера).
+        Пустой результат - Алиса ответила без контактов; сбой поиска - ContactsScrapeError.
+        """
+        return self._parse_alisa_answer(self._build_search_query(city))
 
     def find_road_agency_contacts(self, address: str, coordinates: Optional[dict] = None) -> dict:
         """
@@ -262,68 +343,39 @@ class AIAgentService:
         С кешированием для избежания повторных запросов.
         """
 
-        city = self._extract_city(address)
+        city = self._extract_city(address, coordinates)
 
         if not city:
-            return {
-                "success": False,
-                "city": None,
-                "organization": "Росавтодор",
-                "email": "rad@rosavtodor.gov.ru",
-                "website": "https://rosavtodor.gov.ru",
-                "phone": None,
-                "status": "city_not_found"
-            }
+            return self.city_not_found_result()
 
         if city in self.cache:
             logger.info(f"Using cached data for {city}")
-            cached = self.cache[city]
-            return {
-                "success": cached['email'] is not None,
-                "city": city,
-                "organization": cached.get('organization') or f"Управление дорожной деятельности {city}",
-                "email": cached['email'],
-                "website": None,
-                "phone": cached.get('phone'),
-                "status": "cached"
-            }
+            return self.build_result(city, self.cache[city], "cached")
 
-        query = self._build_search_query(city)
-
-        alisa_result = self._parse_alisa_answer(query)
+        try:
+            alisa_result = self.scrape_city_contacts(city)
+        except ContactsScrapeError as e:
+            # Сбой не кэшируется: следующий запрос повторит поиск
+            logger.warning(f"Contacts search failed for {city}: {e}")
+            return self.build_result(city, {}, "found")
         self.cache[city] = alisa_result
-
-        if alisa_result['email']:
-            return {
-                "success": True,
-                "city": city,
-                "organization": alisa_result.get('organization') or f"Управление дорожной деятельности {city}",
-                "email": alisa_result['email'],
-                "website": None,
-                "phone": alisa_result.get('phone'),
-                "status": "found"
-            }
-        else:
-            return {
-                "success": False,
-                "city": city,
-                "organization": f"Администрация {city}",
-                "email": None,
-                "website": None,
-                "phone": alisa_result.get('phone'),
-                "status": "email_not_found"
-            }
+        return self.build_result(city, alisa_result, "found")
 
 
 _service_instance = None
 
 
-def find_road_agency_contacts(address: str, coordinates: Optional[dict] = None) -> dict:
-    """Публичная функция для использования в других модулях."""
+def get_agent_service() -> AIAgentService:
+    """Общий для процесса экземпляр AIAgentService."""
     global _service_instance
     if _service_instance is None:
         _service_instance = AIAgentService()
-    return _service_instance.find_road_agency_contacts(address, coordinates)
+    return _service_instance
+
+
+def find_road_agency_contacts(address: str, coordinates: Optional[dict] = None) -> dict:
+    """Публичная функция для использования в других модулях."""
+    return get_agent_service().find_road_agency_contacts(address, coordinates)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,195 @@
+"""
+Attachment Service - загрузка фотографий для вложений в заявления.
+Объекты из нашего bucket читаются напрямую через S3 API, остальные URL - по HTTP.
+"""
+
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiofiles
+import aiohttp
+from loguru import logger
+
+from backend.core.config import configs
+from backend.services.external_services.s3_service import S3Service
+
+
+class AttachmentDiskCache:
+    """LRU-кэш вложений на локальном диске с ограничением общего размера."""
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = asyncio.Lock()
+        self._load_index()
+
+    def _load_index(self):
+        """Восстанавливает индекс из файлов на диске (порядок - по времени доступа)."""
+        files = sorted(
+            (f for f in self.cache_dir.iterdir() if f.is_file() and not f.name.endswith(".tmp")),
+            key=lambda f: f.stat().st_mtime
+        )
+        for f in files:
+            size = f.stat().st_size
+            self._entries[f.name] = size
+            self._total_bytes += size
+
+    @staticmethod
+    def _entry_name(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        name = self._entry_name(key)
+        if name not in self._entries:
+            return None
+
+        path = self.cache_dir / name
+        try:
+            async with aiofiles.open(path, "rb") as f:
+                data = await f.read()
+        except FileNotFoundError:
+            async with self._lock:
+                self._total_bytes -= self._entries.pop(name, 0)
+            return None
+
+        async with self._lock:
+            if name in self._entries:
+                self._entries.move_to_end(name)
+        os.utime(path, None)
+        return data
+
+    async def put(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+
+        name = self._entry_name(key)
+        path = self.cache_dir / name
+        tmp_path = self.cache_dir / f"{name}.{os.getpid()}.tmp"
+        async with aiofiles.open(tmp_path, "wb") as f:
+            await f.write(data)
+        os.replace(tmp_path, path)
+
+        async with self._lock:
+            self._total_bytes -= self._entries.pop(name, 0)
+            self._entries[name] = len(data)
+            self._total_bytes += len(data)
+            while self._total_bytes > self.max_bytes and self._entries:
+                evicted, size = self._entries.popitem(last=False)
+                self._total_bytes -= size
+                try:
+                    (self.cache_dir / evicted).unlink()
+                except FileNotFoundError:
+                    pass
+
+
+class AttachmentService:
+    """Сервис загрузки вложений с ограничением параллелизма и размера."""
+
+    _disk_cache: Optional[AttachmentDiskCache] = None
+
+    def __init__(self, s3_service: Optional[S3Service] = None):
+        self.s3_service = s3_service or S3Service()
+        self.concurrency = configs.ATTACHMENT_DOWNLOAD_CONCURRENCY
+        self.max_file_bytes = configs.ATTACHMENT_MAX_FILE_BYTES
+        self.max_total_bytes = configs.ATTACHMENT_MAX_TOTAL_BYTES
+
+    @property
+    def disk_cache(self) -> AttachmentDiskCache:
+        """Общий для процесса дисковый кэш"""
+        if AttachmentService._disk_cache is None:
+            AttachmentService._disk_cache = AttachmentDiskCache(
+                configs.ATTACHMENT_CACHE_DIR,
+                configs.ATTACHMENT_CACHE_MAX_BYTES
+            )
+        return AttachmentService._disk_cache
+
+    async def fetch(self, urls: List[str]) -> List[Tuple[str, bytes]]:
+        """
+        Скачивает вложения по списку URL.
+        Returns:
+            Список (имя файла, содержимое) в исходном порядке, без неудачных
+            и не поместившихся в общий лимит файлов
+        """
+        contents: List[Optional[bytes]] = [None] * len(urls)
+        s3_keys = {}
+        external = []
+
+        # В дисковом кэше хранятся только объекты нашего bucket: их ключи
+        # контентно-адресуемые, поэтому содержимое по ключу не меняется
+        for idx, url in enumerate(urls):
+            cached = await self.disk_cache.get(url)
+            if cached is not None:
+                contents[idx] = cached
+                continue
+            key = self.s3_service.extract_key(url)
+            if key:
+                s3_keys[idx] = key
+            else:
+                external.append(idx)
+
+        if s3_keys:
+            results = await self.s3_service.download_files(
+                s3_keys.values(),
+                max_bytes=self.max_file_bytes,
+                concurrency=self.concurrency
+            )
+            for idx, key in s3_keys.items():
+                result = results.get(key)
+                if isinstance(result, Exception):
+                    logger.warning(f"Failed to download attachment {key}: {result}")
+                    continue
+                contents[idx] = result
+                await self.disk_cache.put(urls[idx], result)
+
+        if external:
+            await self._fetch_external(urls, external, contents)
+
+        attachments = []
+        total = 0
+        for idx, (url, content) in enumerate(zip(urls, contents), 1):
+            if content is None:
+                continue
+            if total + len(content) > self.max_total_bytes:
+                logger.warning(f"Attachment {idx} skipped: total size limit {self.max_total_bytes} bytes reached")
+                continue
+            total += len(content)
+            file_ext = Path(urlparse(url).path).suffix or '.jpg'
+            attachments.append((f"photo_{idx}{file_ext}", content))
+
+        logger.info(f"Fetched {len(attachments)}/{len(urls)} attachments ({total} bytes)")
+        return attachments
+
+    async def _fetch_external(self, urls: List[str], indexes: List[int], contents: List[Optional[bytes]]):
+        """Скачивание URL вне нашего bucket по HTTP с ограничением размера."""
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+        timeout = aiohttp.ClientTimeout(total=30)
+
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async def fetch(idx: int):
+                url = urls[idx]
+                async with semaphore:
+                    try:
+                        async with session.get(url) as response:
+                            response.raise_for_status()
+                            if (response.content_length or 0) > self.max_file_bytes:
+                                raise ValueError(f"size {response.content_length} exceeds limit")
+                            chunks = []
+                            total = 0
+                            async for chunk in response.content.iter_chunked(64 * 1024):
+                                total += len(chunk)
+                                if total > self.max_file_bytes:
+                                    raise ValueError(f"size exceeds limit {self.max_file_bytes}")
+                                chunks.append(chunk)
+                            contents[idx] = b"".join(chunks)
+                    except Exception as e:
+                        logger.warning(f"Failed to download attachment from {url[:50]}: {e}")
+
+            await asyncio.gather(*(fetch(idx) for idx in indexes))
@@ -0,0 +1,181 @@
+"""
+Пул заранее запущенных браузеров для AI-агента.
+
+Запуск Chrome занимает несколько секунд, поэтому браузеры держатся открытыми
+и выдаются поисковым запросам по очереди. Браузер пересоздаётся после
+max_uses запросов, при капче и если не прошёл проверку перед выдачей.
+Фабрика драйвера передаётся снаружи, поэтому пул можно гонять на локальной
+статической странице вместо ya.ru.
+"""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+from loguru import logger
+
+from backend.core.config import configs
+
+
+class BrowserPoolTimeout(Exception):
+    """Свободный браузер не появился за отведённое время"""
+
+
+class PooledBrowser:
+    """Браузер из пула и его счётчики"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.monotonic()
+        self.last_request_time = 0.0
+        # Выставляется при капче или ошибке: браузер не вернётся в пул
+        self.recycle = False
+
+
+class BrowserPool:
+    """Ограниченный пул браузеров с выдачей через checkout/checkin."""
+
+    _shared: Optional["BrowserPool"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+            self,
+            driver_factory: Callable[[], object],
+            size: int = 2,
+            max_uses: int = 50,
+            checkout_timeout: float = 120.0
+    ):
+        self.driver_factory = driver_factory
+        self.size = size
+        self.max_uses = max_uses
+        self.checkout_timeout = checkout_timeout
+        self._idle: "queue.LifoQueue[PooledBrowser]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        # Будит ждущих checkout, когда браузер вернулся или освободилось место
+        self._released = threading.Condition(self._lock)
+        self._launched = 0
+        self._closed = False
+
+    @classmethod
+    def get_shared(cls, driver_factory: Callable[[], object]) -> "BrowserPool":
+        """Общий для процесса пул с размерами из конфига"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(
+                    driver_factory,
+                    size=configs.BROWSER_POOL_SIZE,
+                    max_uses=configs.BROWSER_POOL_MAX_USES,
+                    checkout_timeout=configs.BROWSER_POOL_CHECKOUT_TIMEOUT
+                )
+            return cls._shared
+
+    def _launch(self) -> Optional[PooledBrowser]:
+        """Запускает новый браузер, если не исчерпан лимит пула"""
+        with self._lock:
+            if self._launched >= self.size:
+                return None
+            self._launched += 1
+        try:
+            return PooledBrowser(self.driver_factory())
+        except Exception:
+            with self._lock:
+                self._launched -= 1
+            raise
+
+    def _discard(self, browser: PooledBrowser) -> None:
+        with self._released:
+            self._launched -= 1
+            self._released.notify()
+        try:
+            browser.driver.quit()
+        except Exception as e:
+            logger.debug(f"Browser quit failed: {e}")
+
+    def _wait_for_browser(self, deadline: float) -> None:
+        """Ждёт возврата браузера или свободного места в пуле"""
+        with self._released:
+            while self._idle.empty() and self._launched >= self.size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise BrowserPoolTimeout(f"No free browser in {self.checkout_timeout}s")
+                self._released.wait(remaining)
+
+    @staticmethod
+    def _is_healthy(browser: PooledBrowser) -> bool:
+        try:
+            return browser.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def start(self) -> None:
+        """Прогрев: запускает браузеры до размера пула"""
+        while True:
+            browser = self._launch()
+            if browser is None:
+                break
+            self._idle.put(browser)
+        logger.info(f"Browser pool warmed up: {self.size} browsers")
+
+    def checkout(self) -> PooledBrowser:
+        """Выдаёт исправный браузер, при необходимости запуская новый"""
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            if self._closed:
+                raise RuntimeError("Browser pool is closed")
+            try:
+                browser = self._idle.get_nowait()
+            except queue.Empty:
+                browser = self._launch()
+                if browser is None:
+                    self._wait_for_browser(deadline)
+                    continue
+
+            if self._is_healthy(browser):
+                return browser
+            logger.warning("Browser failed health check, replacing")
+            self._discard(browser)
+
+    def checkin(self, browser: PooledBrowser) -> None:
+        """Возвращает браузер в пул или закрывает его, если он отработал своё"""
+        browser.uses += 1
+        if self._closed or browser.recycle or browser.uses >= self.max_uses:
+            logger.debug(f"Recycling browser after {browser.uses} uses (recycle={browser.recycle})")
+            self._discard(browser)
+            return
+        try:
+            browser.driver.get("about:blank")
+        except Exception:
+            self._discard(browser)
+            return
+        self._idle.put(browser)
+        with self._released:
+            self._released.notify()
+
+    @contextmanager
+    def session(self) -> Iterator[PooledBrowser]:
+        """Браузер на время одного запроса; при исключении браузер пересоздаётся"""
+        browser = self.checkout()
+        try:
+            yield browser
+        except Exception:
+            browser.recycle = True
+            raise
+        finally:
+            self.checkin(browser)
+
+    def close(self) -> None:
+        """Закрывает все свободные браузеры; занятые закроются при возврате"""
+        self._closed = True
+        with self._released:
+            self._released.notify_all()
+        browsers: List[PooledBrowser] = []
+        while True:
+            try:
+                browsers.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for browser in browsers:
+            self._discard(browser)
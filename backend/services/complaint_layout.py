@@ -0,0 +1,98 @@
+"""
+Разметка заявления, повторяющая «Шаблон заявления.docx».
+
+Используется рендерерами, которые не работают с DOCX напрямую
+(HTML → PDF и др.), чтобы текст и оформление совпадали с шаблоном.
+"""
+
+import html
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# Параметры страницы и шрифта шаблона
+PAGE_MARGIN_LEFT_MM = 25
+PAGE_MARGIN_RIGHT_MM = 15
+PAGE_MARGIN_TOP_MM = 20
+FONT_SIZE_PT = 12
+LINE_HEIGHT = 1.5
+ADDRESSEE_INDENT_MM = 80
+FIRST_LINE_INDENT_MM = 12.5
+ATTACHMENT_INDENT_MM = 10
+
+
+@dataclass(frozen=True)
+class LayoutBlock:
+    # addressee | title | body | list | attachment | signature | spacer
+    style: str
+    text: str = ""
+    number: Optional[int] = None
+
+
+def complaint_blocks(context: Dict[str, Any]) -> List[LayoutBlock]:
+    """Абзацы заявления для контекста шаблона"""
+    city = context["city"]
+    street = context["street"]
+    year = f"20{context['yeer']}"
+    return [
+        LayoutBlock("addressee", "Кому"),
+        LayoutBlock("addressee", str(context["administration_name"])),
+        LayoutBlock("addressee", "От"),
+        LayoutBlock("addressee", str(context["person"])),
+        LayoutBlock("spacer"),
+        LayoutBlock("title", "Заявление"),
+        LayoutBlock("spacer"),
+        LayoutBlock(
+            "body",
+            f"В городе {city} мной были зафиксированы факты ненормативного состояния объектов "
+            f"улично-дорожной сети. Так, на дорожном покрытии на {street} были выявлены многочисленные "
+            f"повреждения, из-за которых проезжая часть дороги не соответствует требованиям "
+            f"ГОСТ Р 50597-2017 «Требования к эксплуатационному состоянию, допустимому по условиям "
+            f"обеспечения безопасности дорожного движения. Методы контроля». Зафиксированные ямы и "
+            f"выбоины (см. фото) представляют опасность для участников дорожного движения и способны "
+            f"привести к аварийной ситуации на дороге."
+        ),
+        LayoutBlock("body", "Прошу Вас:"),
+        LayoutBlock(
+            "list",
+            f"пояснить, какие меры и когда планирует предпринять администрация города {city} "
+            f"по приведению покрытия на улице {street} к нормативному состоянию.",
+            number=1
+        ),
+        LayoutBlock(
+            "list",
+            f"в случае отсутствия указанных дорог в планах ремонта на {year} год принять меры "
+            f"по приведению к соответствию нормативным требованиям дорожное покрытие.",
+            number=2
+        ),
+        LayoutBlock("attachment", f"Приложение: {context['count_photos']} фотографии(й)."),
+        LayoutBlock("spacer"),
+        LayoutBlock("spacer"),
+        LayoutBlock("signature", f"Дата: «{context['day_report']}» {context['month_report']} {year} г."),
+        LayoutBlock("signature", str(context["person"])),
+    ]
+
+
+def render_complaint_html(context: Dict[str, Any]) -> str:
+    """HTML-версия заявления для конвертации в PDF"""
+    paragraphs = []
+    for block in complaint_blocks(context):
+        text = html.escape(block.text)
+        if block.style == "spacer":
+            paragraphs.append('<p class="spacer">&nbsp;</p>')
+        elif block.style == "list":
+            paragraphs.append(f'<p class="body">{block.number}) {text}</p>')
+        else:
+            paragraphs.append(f'<p class="{block.style}">{text}</p>')
+
+    return f"""<!DOCTYPE html>
+<html lang="ru"><head><meta charset="utf-8"><style>
+@page {{ size: A4; margin: {PAGE_MARGIN_TOP_MM}mm {PAGE_MARGIN_RIGHT_MM}mm {PAGE_MARGIN_TOP_MM}mm {PAGE_MARGIN_LEFT_MM}mm; }}
+body {{ font-family: "Times New Roman", serif; font-size: {FONT_SIZE_PT}pt; line-height: {LINE_HEIGHT}; }}
+p {{ margin: 0; }}
+.addressee {{ margin-left: {ADDRESSEE_INDENT_MM}mm; }}
+.title {{ text-align: center; font-weight: bold; }}
+.body {{ text-align: justify; text-indent: {FIRST_LINE_INDENT_MM}mm; }}
+.attachment {{ text-align: justify; text-indent: {ATTACHMENT_INDENT_MM}mm; }}
+</style></head><body>
+{chr(10).join(paragraphs)}
+</body></html>"""
@@ -0,0 +1,195 @@
+"""
+Contacts Directory Service - справочник контактов дорожных служб по городам.
+
+Контакты хранятся в таблице road_agency_contacts и переиспользуются между
+заявками и процессами. Свежая запись отдаётся сразу, устаревшая с email
+отдаётся сразу и обновляется в фоне. При промахе и для устаревшей записи
+без email выполняется поиск через браузер (один на город, сколько бы
+заявок ни ждало).
+
+Прогрев справочника по городам из существующих заявок:
+    python -m backend.services.contacts_directory_service prewarm
+"""
+
+import asyncio
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from loguru import logger
+from sqlalchemy import select
+
+from backend.core.config import configs
+from backend.core.database import async_session_maker
+from backend.core.executors import STAGE_CONTACTS, run_in_stage
+from backend.models.report_model import Report
+from backend.models.road_agency_contact_model import RoadAgencyContact
+from backend.repositories.road_agency_contact_repository import RoadAgencyContactRepository
+from backend.services.ai_agent_service import AIAgentService, ContactsScrapeError, get_agent_service
+
+
+def normalize_key_part(value: Optional[str]) -> str:
+    """Нормализация названия города/региона для ключа справочника"""
+    if not value:
+        return ""
+    value = value.lower().replace("ё", "е")
+    value = re.sub(r"^(г|город)\.?\s+", "", value.strip())
+    return re.sub(r"[\s\-]+", " ", value).strip()
+
+
+def build_city_key(city: str, region: Optional[str]) -> str:
+    return f"{normalize_key_part(region)}|{normalize_key_part(city)}"
+
+
+class ContactsDirectoryService:
+    """Поиск контактов дорожных служб через постоянный справочник в БД."""
+
+    _refreshing: Dict[str, asyncio.Task] = {}
+
+    def __init__(self, agent: Optional[AIAgentService] = None):
+        self.agent = agent or get_agent_service()
+        self.ttl = timedelta(days=configs.CONTACTS_TTL_DAYS)
+        self.negative_ttl = timedelta(hours=configs.CONTACTS_NEGATIVE_TTL_HOURS)
+
+    @staticmethod
+    def _confidence(contacts: dict) -> float:
+        if contacts.get("email") and contacts.get("organization"):
+            return 0.9
+        if contacts.get("email"):
+            return 0.7
+        if contacts.get("phone"):
+            return 0.3
+        return 0.0
+
+    def _to_result(self, entry: RoadAgencyContact, status: str) -> dict:
+        contacts = {
+            "email": entry.email,
+            "phone": entry.phone,
+            "organization": entry.organization,
+            "website": entry.website,
+        }
+        return self.agent.build_result(entry.city, contacts, status)
+
+    async def _get_entry(self, city_key: str) -> Optional[RoadAgencyContact]:
+        try:
+            async with async_session_maker() as session:
+                return await RoadAgencyContactRepository(session).get_by_key(city_key)
+        except Exception as e:
+            logger.warning(f"Contacts directory read failed: {e}")
+            return None
+
+    async def _scrape_and_store(self, city_key: str, city: str, region: Optional[str]) -> RoadAgencyContact:
+        # Пул этапа по размеру пула браузеров: разные города ищутся параллельно.
+        # Сбой поиска (ContactsScrapeError) пробрасывается и в справочник не пишется:
+        # отрицательная запись - только если Алиса ответила без контактов
+        contacts = await run_in_stage(STAGE_CONTACTS, self.agent.scrape_city_contacts, city)
+
+        now = datetime.now(timezone.utc)
+        values = dict(
+            city_key=city_key,
+            city=city,
+            region=region,
+            organization=contacts.get("organization"),
+            email=contacts.get("email"),
+            phone=contacts.get("phone"),
+            website=contacts.get("website"),
+            confidence=self._confidence(contacts),
+            source="alisa",
+            refreshed_at=now,
+            expires_at=now + (self.ttl if contacts.get("email") else self.negative_ttl),
+        )
+        try:
+            async with async_session_maker() as session:
+                await RoadAgencyContactRepository(session).upsert(**values)
+        except Exception as e:
+            logger.warning(f"Contacts directory write failed for {city}: {e}")
+        return RoadAgencyContact(**values)
+
+    def _refresh(self, city_key: str, city: str, region: Optional[str]) -> asyncio.Task:
+        """Задача обновления записи; одна на ключ для всех ожидающих"""
+        task = self._refreshing.get(city_key)
+        if task is None:
+            task = asyncio.create_task(self._scrape_and_store(city_key, city, region))
+            self._refreshing[city_key] = task
+            task.add_done_callback(lambda done: self._on_refresh_done(city_key, done))
+        return task
+
+    def _on_refresh_done(self, city_key: str, task: asyncio.Task):
+        self._refreshing.pop(city_key, None)
+        # Фоновое обновление никто не ждёт: ошибку нужно забрать и залогировать здесь
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Contacts refresh failed for {city_key}: {task.exception()}")
+
+    async def find_contacts(self, address: str, coordinates: Optional[dict] = None) -> dict:
+        """
+        Контакты дорожной службы для адреса заявки.
+        Формат ответа совпадает с AIAgentService.find_road_agency_contacts.
+        """
+        city = self.agent._extract_city(address, coordinates)
+        if not city:
+            return self.agent.city_not_found_result()
+
+        region = self.agent._extract_region(address)
+        city_key = build_city_key(city, region)
+
+        entry = await self._get_entry(city_key)
+        if entry is not None:
+            if entry.expires_at > datetime.now(timezone.utc):
+                return self._to_result(entry, "directory")
+            if entry.email:
+                logger.info(f"Contacts for {city} are stale, refreshing in background")
+                self._refresh(city_key, city, region)
+                return self._to_result(entry, "stale")
+            # Устаревший отрицательный результат не отдаётся: без email заявление не отправить
+            logger.info(f"Contacts for {city} were not found earlier, searching again")
+        else:
+            logger.info(f"Contacts for {city} not in directory, searching")
+
+        try:
+            entry = await asyncio.shield(self._refresh(city_key, city, region))
+        except ContactsScrapeError as e:
+            logger.warning(f"Contacts search failed for {city}: {e}")
+            return self.agent.build_result(city, {}, "found")
+        return self._to_result(entry, "found")
+
+    async def prewarm(self) -> dict:
+        """
+        Заполняет справочник для всех городов из адресов заявок.
+        Returns:
+            Статистика: городов всего, обновлено
+        """
+        keys: Dict[str, tuple] = {}
+        async with async_session_maker() as session:
+            result = await session.stream(
+                select(Report.address).where(Report.address.isnot(None)).distinct()
+            )
+            async for (address,) in result:
+                city = self.agent._extract_city(address)
+                if city:
+                    region = self.agent._extract_region(address)
+                    keys.setdefault(build_city_key(city, region), (city, region))
+
+        refreshed = 0
+        now = datetime.now(timezone.utc)
+        for city_key, (city, region) in keys.items():
+            entry = await self._get_entry(city_key)
+            if entry is not None and entry.expires_at > now:
+                continue
+            try:
+                await self._refresh(city_key, city, region)
+                refreshed += 1
+            except Exception as e:
+                logger.error(f"Contacts prewarm failed for {city}: {e}")
+
+        logger.info(f"Contacts prewarm: cities={len(keys)}, refreshed={refreshed}")
+        return {"cities": len(keys), "refreshed": refreshed}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Справочник контактов дорожных служб")
+    parser.add_argument("command", choices=["prewarm"], help="prewarm - заполнить по адресам заявок")
+    args = parser.parse_args()
+
+    print(asyncio.run(ContactsDirectoryService().prewarm()))
@@ -1,19 +1,131 @@
 import io
-import os
-import tempfile
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Dict, Any, Sequence
 from docxtpl import DocxTemplate
+from jinja2 import Environment
 from pathlib import Path
+from loguru import logger
+
+from backend.core.config import configs
+from backend.services.complaint_layout import render_complaint_html
+from backend.services.pdf_converter import UnoserverPool, html_to_pdf
+from backend.services.pdf_renderer import ComplaintPdfRenderer
+
+# Части документа, в которых могут быть jinja-теги
+TEMPLATE_PARTS = re.compile(r"^word/(document|header\d*|footer\d*|footnotes)\.xml$")
+
+
+class CompiledDocxTemplate:
+    """
+    DOCX-шаблон, разобранный один раз: содержимое архива хранится в памяти,
+    XML с тегами очищен через patch_xml из docxtpl и скомпилирован в jinja-шаблон.
+    Рендер только подставляет контекст и собирает новый архив, без повторного
+    чтения и разбора файла шаблона.
+
+    Повторяет DocxTemplate.render_xml_part из docxtpl==0.20.1 (версия закреплена
+    в requirements.txt) и опирается на её patch_xml/resolve_listing, которые не
+    являются публичным API: при обновлении docxtpl сверить с новой версией.
+    """
+
+    def __init__(self, template_path: Path):
+        # Экземпляр docxtpl нужен только ради его обработки XML
+        helper = DocxTemplate(str(template_path))
+        env = Environment(autoescape=True)
+        members = []
+        templates = {}
+
+        with zipfile.ZipFile(template_path) as zf:
+            for info in zf.infolist():
+                data = zf.read(info)
+                if TEMPLATE_PARTS.match(info.filename):
+                    xml = helper.patch_xml(data.decode("utf-8"))
+                    if "{{" in xml or "{%" in xml:
+                        xml = re.sub(r"<w:p([ >])", r"\n<w:p\1", xml)
+                        templates[info.filename] = env.from_string(xml)
+                members.append((info, data))
+
+        self._members = tuple(members)
+        self._templates = templates
+        self._resolve_listing = helper.resolve_listing
+
+    def _postprocess(self, xml: str) -> str:
+        """Те же преобразования, что docxtpl выполняет после рендера части"""
+        xml = re.sub(r"\n<w:p([ >])", r"<w:p\1", xml)
+        xml = (
+            xml.replace("{_{", "{{")
+            .replace("}_}", "}}")
+            .replace("{_%", "{%")
+            .replace("%_}", "%}")
+        )
+        return self._resolve_listing(xml)
+
+    def render(self, context: Dict[str, Any]) -> bytes:
+        """Собирает DOCX с подставленным контекстом"""
+        out = io.BytesIO()
+        with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
+            for info, data in self._members:
+                template = self._templates.get(info.filename)
+                if template is not None:
+                    data = self._postprocess(template.render(context)).encode("utf-8")
+                zf.writestr(info, data)
+        return out.getvalue()
+
+
+# Шаблон в процессе пула рендеринга (создаётся инициализатором)
+_worker_template: Optional[CompiledDocxTemplate] = None
+
+
+def _init_render_worker(template_path: Path) -> None:
+    global _worker_template
+    _worker_template = CompiledDocxTemplate(template_path)
+
+
+def _render_in_worker(context: Dict[str, Any]) -> bytes:
+    return _worker_template.render(context)
+
 
 class DocumentService:
     """Сервис для создания Word/PDF документов из шаблона."""
 
+    # Разобранный шаблон и пул процессов рендеринга общие для процесса
+    _template: Optional[CompiledDocxTemplate] = None
+    _render_pool: Optional[ProcessPoolExecutor] = None
+
     def __init__(self):
         project_root = Path(__file__).parent.parent.parent
         self.template_path = project_root / "Шаблон заявления.docx"
         if not self.template_path.exists():
             raise FileNotFoundError(f"Template not found: {self.template_path}")
+        if DocumentService._template is None:
+            DocumentService._template = CompiledDocxTemplate(self.template_path)
+
+    def _get_render_pool(self) -> Optional[ProcessPoolExecutor]:
+        if configs.DOCUMENT_RENDER_PROCESSES <= 0:
+            return None
+        if DocumentService._render_pool is None:
+            DocumentService._render_pool = ProcessPoolExecutor(
+                max_workers=configs.DOCUMENT_RENDER_PROCESSES,
+                initializer=_init_render_worker,
+                initargs=(self.template_path,)
+            )
+        return DocumentService._render_pool
+
+    @classmethod
+    def shutdown_render_pool(cls) -> None:
+        """Останавливает пул процессов рендеринга (вызывается при завершении)"""
+        if cls._render_pool is not None:
+            cls._render_pool.shutdown(wait=False, cancel_futures=True)
+            cls._render_pool = None
+
+    def render_docx(self, context: Dict[str, Any]) -> bytes:
+        """Рендер шаблона в пуле процессов или, если он отключён, в текущем процессе"""
+        pool = self._get_render_pool()
+        if pool is None:
+            return self._template.render(context)
+        return pool.submit(_render_in_worker, context).result(timeout=configs.DOCUMENT_RENDER_TIMEOUT_SECONDS)
 
     def create_complaint_document(
             self,
@@ -23,10 +135,14 @@ class DocumentService:
             person_name: str,
             count_photos: int,
             year: Optional[int] = None,
-            convert_to_pdf: bool = True
+            convert_to_pdf: bool = True,
+            photos: Sequence[bytes] = ()
     ) -> Tuple[bytes, str]:
+        """
+        Заявление в PDF (или DOCX, если PDF получить не удалось).
+        При PDF_BACKEND=direct PDF строится сразу, с фотографиями внутри документа.
+        """
         try:
-            doc = DocxTemplate(str(self.template_path))
             now = datetime.now()
             if year is None:
                 year = now.year
@@ -41,23 +157,25 @@ class DocumentService:
                 'day_report': now.strftime('%d'),
                 'month_report': self._get_month_name_genitive(now.month)
             }
-            doc.render(context)
 
-            docx_bytes_io = io.BytesIO()
-            doc.save(docx_bytes_io)
-            docx_bytes_io.seek(0)
-            docx_bytes = docx_bytes_io.getvalue()
+            if convert_to_pdf and configs.PDF_BACKEND == "direct":
+                try:
+                    return ComplaintPdfRenderer.get_shared().render(context, photos), 'pdf'
+                except Exception as pdf_error:
+                    logger.error(f"Direct PDF failed, using DOCX template: {pdf_error}")
+
+            docx_bytes = self.render_docx(context)
 
             if convert_to_pdf:
                 try:
-                    pdf_bytes = self._convert_to_pdf(docx_bytes)
+                    pdf_bytes = self._convert_to_pdf(docx_bytes, context)
                     return pdf_bytes, 'pdf'
                 except Exception as pdf_error:
-                    print(f"[Document Service] PDF failed, returning DOCX: {pdf_error}")
+                    logger.error(f"PDF failed, returning DOCX: {pdf_error}")
                     return docx_bytes, 'docx'
             return docx_bytes, 'docx'
         except Exception as e:
-            print(f"[Document Service] Template error: {e}")
+            logger.error(f"Template error: {e}")
             fallback_text = f"""Заявление о дефектах дорожного покрытия
 
 Организация: {organization_name}
@@ -74,43 +192,16 @@ class DocumentService:
 {person_name}"""
             return fallback_text.encode('utf-8'), 'txt'
 
-    def _convert_to_pdf(self, docx_bytes: bytes) -> bytes:
-        """Конвертирует Word в PDF."""
-        try:
-            from docx2pdf import convert
-        except ImportError:
-            raise ImportError("docx2pdf not installed")
-
-        temp_docx_path = None
-        temp_pdf_path = None
+    def _convert_to_pdf(self, docx_bytes: bytes, context: Dict[str, Any]) -> bytes:
+        """
+        Конвертирует Word в PDF через пул unoserver.
+        Если LibreOffice недоступен, PDF строится из HTML-версии заявления.
+        """
         try:
-            with tempfile.NamedTemporaryFile(suffix='.docx', delete=False) as temp_docx:
-                temp_docx_path = temp_docx.name
-                temp_docx.write(docx_bytes)
-                temp_docx.flush()
-            temp_pdf_path = temp_docx_path.replace('.docx', '.pdf')
-            print(f"[Document Service] Converting {temp_docx_path} -> {temp_pdf_path}")
-            # Удалён аргумент timeout, так как docx2pdf его не поддерживает
-            convert(temp_docx_path, temp_pdf_path)
-
-            if not os.path.exists(temp_pdf_path):
-                raise FileNotFoundError("PDF not created")
-
-            with open(temp_pdf_path, 'rb') as f:
-                pdf_bytes = f.read()
-
-            if len(pdf_bytes) < 1000:
-                raise ValueError(f"PDF too small: {len(pdf_bytes)} bytes")
-
-            return pdf_bytes
-
-        finally:
-            for path in [temp_docx_path, temp_pdf_path]:
-                if path and os.path.exists(path):
-                    try:
-                        os.unlink(path)
-                    except Exception:
-                        pass
+            return UnoserverPool.get_shared().convert(docx_bytes)
+        except Exception as e:
+            logger.warning(f"unoserver conversion failed, using HTML renderer: {e}")
+        return html_to_pdf(render_complaint_html(context))
 
     def _get_month_name_genitive(self, month: int) -> str:
         months = {
@@ -2,18 +2,31 @@
 
 """
 Email Service для отправки заявлений через Mail.ru.
+
+Письма не отправляются при обработке заявления: готовое MIME-сообщение
+потоково пишется в спул, а воркер доставки (workers/email_worker.py)
+отправляет их пачками через пул авторизованных соединений aiosmtplib.
 """
 
-import os
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
-from typing import Optional, List
+import asyncio
+import mimetypes
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+
+import aiosmtplib
 from dotenv import load_dotenv
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.core.config import configs
+from backend.core.executors import STAGE_EMAIL, run_in_stage
+from backend.models.outbound_email_model import OutboundEmail
+from backend.services.image_utils import downscale_photo
+from backend.services.mail_spool import MailSpool
+from backend.services.mime_stream import send_file, write_message
 
 load_dotenv()
 
@@ -22,54 +35,243 @@ MAILRU_SMTP_PORT = configs.MAILRU_SMTP_PORT
 MAILRU_SMTP_USER = configs.MAILRU_SMTP_USER
 MAILRU_SMTP_PASSWORD = configs.MAILRU_SMTP_PASSWORD
 
+# Причины неудачной отправки
+REASON_AUTH = "auth"
+REASON_REJECTED = "rejected"
+REASON_TRANSIENT = "transient"
+REASON_CONNECTION = "connection"
+REASON_TIMEOUT = "timeout"
+
+RETRYABLE_REASONS = (REASON_TRANSIENT, REASON_CONNECTION, REASON_TIMEOUT)
+
+
+@dataclass
+class EmailSendResult:
+    success: bool
+    attempts: int = 0
+    reason: Optional[str] = None
+    smtp_code: Optional[int] = None
+    message: Optional[str] = None
+
+    @property
+    def retryable(self) -> bool:
+        """Ошибка временная, отправку можно повторить позже"""
+        return self.reason in RETRYABLE_REASONS
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def classify_smtp_error(error: Exception) -> Tuple[str, Optional[int]]:
+    """Причина и SMTP-код ошибки отправки"""
+    if isinstance(error, aiosmtplib.SMTPAuthenticationError):
+        return REASON_AUTH, error.code
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        codes = [recipient.code for recipient in error.recipients]
+        code = codes[0] if codes else None
+        if codes and all(400 <= c < 500 for c in codes):
+            return REASON_TRANSIENT, code
+        return REASON_REJECTED, code
+    if isinstance(error, (aiosmtplib.SMTPTimeoutError, asyncio.TimeoutError)):
+        return REASON_TIMEOUT, None
+    if isinstance(error, aiosmtplib.SMTPResponseException):
+        if 400 <= error.code < 500:
+            return REASON_TRANSIENT, error.code
+        return REASON_REJECTED, error.code
+    return REASON_CONNECTION, None
+
+
+class SmtpConnectionPool:
+    """Авторизованные SMTP-соединения, переиспользуемые между отправками."""
+
+    def __init__(
+            self,
+            host: str,
+            port: int,
+            user: str,
+            password: str,
+            size: int,
+            use_tls: bool = True,
+            timeout: float = 30.0,
+            idle_timeout: float = 60.0
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self._semaphore = asyncio.Semaphore(size)
+        # Свободные соединения со временем последнего использования
+        self._idle: List[Tuple[aiosmtplib.SMTP, float]] = []
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=self.host,
+            port=self.port,
+            use_tls=self.use_tls,
+            timeout=self.timeout
+        )
+        await client.connect()
+        try:
+            await client.login(self.user, self.password)
+        except Exception:
+            client.close()
+            raise
+        return client
+
+    @staticmethod
+    async def _quit(client: aiosmtplib.SMTP) -> None:
+        try:
+            await client.quit()
+        except Exception:
+            client.close()
+
+    async def _acquire(self) -> aiosmtplib.SMTP:
+        while self._idle:
+            client, last_used = self._idle.pop()
+            # Сервер закрывает простаивающие соединения, такие не используем
+            if client.is_connected and time.monotonic() - last_used < self.idle_timeout:
+                return client
+            await self._quit(client)
+        return await self._connect()
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        """Соединение из пула; после ошибки оно закрывается, а не возвращается"""
+        async with self._semaphore:
+            client = await self._acquire()
+            try:
+                yield client
+            except BaseException:
+                await self._quit(client)
+                raise
+            self._idle.append((client, time.monotonic()))
+
+    async def close(self) -> None:
+        while self._idle:
+            client, _ = self._idle.pop()
+            await self._quit(client)
+
 
 class EmailService:
     """Сервис для отправки email через Mail.ru."""
 
+    # Пул соединений и спул общие для процесса
+    _pool: Optional[SmtpConnectionPool] = None
+    _spool: Optional[MailSpool] = None
+
     def __init__(self):
         self.smtp_host = MAILRU_SMTP_HOST
         self.smtp_port = MAILRU_SMTP_PORT
         self.smtp_user = MAILRU_SMTP_USER
         self.smtp_password = MAILRU_SMTP_PASSWORD
 
-    def send_complaint_email(
+    def get_pool(self) -> SmtpConnectionPool:
+        if EmailService._pool is None:
+            EmailService._pool = SmtpConnectionPool(
+                host=self.smtp_host,
+                port=self.smtp_port,
+                user=self.smtp_user,
+                password=self.smtp_password,
+                size=configs.EMAIL_SMTP_POOL_SIZE,
+                use_tls=configs.MAILRU_SMTP_USE_TLS,
+                timeout=configs.EMAIL_SMTP_TIMEOUT_SECONDS,
+                idle_timeout=configs.EMAIL_SMTP_IDLE_SECONDS
+            )
+        return EmailService._pool
+
+    @classmethod
+    async def close_pool(cls) -> None:
+        """Закрывает соединения пула (вызывается при завершении воркера)"""
+        if cls._pool is not None:
+            await cls._pool.close()
+            cls._pool = None
+
+    @staticmethod
+    def _prepare_attachment(filename: str, data: bytes) -> Tuple[str, bytes]:
+        """Фотографии больше EMAIL_PHOTO_MAX_PX уменьшаются и пережимаются в JPEG"""
+        content_type = mimetypes.guess_type(filename)[0] or ""
+        if configs.EMAIL_PHOTO_MAX_PX <= 0 or not content_type.startswith("image/"):
+            return filename, data
+        photo = downscale_photo(data, configs.EMAIL_PHOTO_MAX_PX, configs.EMAIL_PHOTO_QUALITY)
+        if photo is None or len(photo[0]) >= len(data):
+            return filename, data
+        return f"{filename.rsplit('.', 1)[0]}.jpg", photo[0]
+
+    def _iter_attachments(self, attachments: Optional[List[tuple]]) -> Iterator[Tuple[str, bytes]]:
+        # Генератор: в памяти одновременно только одно уменьшенное фото
+        for filename, file_data in attachments or ():
+            filename, file_data = self._prepare_attachment(filename, file_data)
+            logger.debug(f"[Email Service] Attached: {filename} ({len(file_data)} bytes)")
+            yield filename, file_data
+
+    @classmethod
+    def get_spool(cls) -> MailSpool:
+        if cls._spool is None:
+            cls._spool = MailSpool(configs.EMAIL_SPOOL_DIR)
+        return cls._spool
+
+    def _spool_message(self, to_email: str, subject: str, body_text: str, attachments: Optional[List[tuple]]):
+        return self.get_spool().store(lambda out: write_message(
+            out, self.smtp_user, to_email, subject, body_text, self._iter_attachments(attachments)
+        ))
+
+    async def enqueue_complaint_email(
             self,
+            session: AsyncSession,
+            report_uuid: Optional[uuid.UUID],
             to_email: str,
             subject: str,
             body_text: str,
             attachments: Optional[List[tuple]] = None
-    ) -> bool:
+    ) -> OutboundEmail:
         """
-        Отправляет email с заявлением через Mail.ru.
-        Returns:
-            bool: True если успешно отправлено
+        Кладёт письмо с заявлением в исходящую очередь.
+        Запись добавляется в сессию без commit: она фиксируется вместе с изменениями вызывающего.
         """
-        try:
-            message = MIMEMultipart()
-            message["From"] = self.smtp_user
-            message["To"] = to_email
-            message["Subject"] = subject
-
-            message.attach(MIMEText(body_text, "plain", "utf-8"))
-
-            if attachments:
-                for filename, file_data in attachments:
-                    part = MIMEBase("application", "octet-stream")
-                    part.set_payload(file_data)
-                    encoders.encode_base64(part)
-                    part.add_header("Content-Disposition", f'attachment; filename="{filename}"')
-                    message.attach(part)
-                    print(f"[Email Service] Attached: {filename} ({len(file_data)} bytes)")
-
-            with smtplib.SMTP_SSL(self.smtp_host, self.smtp_port, timeout=30) as server:
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(message)
-
-            return True
-
-        except smtplib.SMTPAuthenticationError as e:
-            return False
-        except Exception as e:
-            return False
+        # Кодирование вложений и запись на диск вне event loop
+        spool_key, size = await run_in_stage(
+            STAGE_EMAIL, self._spool_message, to_email, subject, body_text, attachments
+        )
+        email = OutboundEmail(
+            uuid=uuid.uuid4(),
+            report_uuid=report_uuid,
+            to_email=to_email,
+            recipient_domain=to_email.rsplit("@", 1)[-1].lower(),
+            subject=subject,
+            spool_key=spool_key,
+            size_bytes=size,
+            max_attempts=configs.EMAIL_SEND_MAX_ATTEMPTS
+        )
+        session.add(email)
+        logger.info(f"[Email Service] Queued {size} bytes to {to_email} as {email.uuid}")
+        return email
 
+    async def deliver(self, client: aiosmtplib.SMTP, email: OutboundEmail) -> EmailSendResult:
+        """Одна попытка отправить письмо из спула по уже открытому соединению"""
+        try:
+            message_file = self.get_spool().open(email.spool_key)
+        except FileNotFoundError as e:
+            return EmailSendResult(success=False, attempts=email.attempts, reason=REASON_REJECTED, message=str(e))
 
+        try:
+            with message_file:
+                await send_file(client, self.smtp_user, [email.to_email], message_file)
+        except Exception as e:
+            reason, code = classify_smtp_error(e)
+            if client.is_connected and reason not in (REASON_CONNECTION, REASON_TIMEOUT):
+                # Сбрасываем незавершённую транзакцию, чтобы следующее письмо пачки ушло по тому же соединению
+                try:
+                    await client.rset()
+                except Exception:
+                    client.close()
+            return EmailSendResult(
+                success=False,
+                attempts=email.attempts,
+                reason=reason,
+                smtp_code=code,
+                message=f"{type(e).__name__}: {e}"
+            )
+        return EmailSendResult(success=True, attempts=email.attempts)
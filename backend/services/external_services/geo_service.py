@@ -1,21 +1,229 @@
 import os
+import math
+import time
+import asyncio
 import httpx
-from typing import Optional
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Tuple
 from dotenv import load_dotenv
+from loguru import logger
+
+from backend.core.circuit_breaker import CircuitBreaker, CircuitOpenError, CallStats
+from backend.core.config import configs
+from backend.core.database import async_session_maker
+from backend.repositories.geocode_cache_repository import GeocodeCacheRepository
+from backend.services.external_services.offline_geocoder import OfflineGeocoder
 
 load_dotenv()
 
+METERS_PER_DEGREE = 111_320.0
+
+
+class ReverseGeocodeCache:
+    """
+    Кэш обратного геокодирования по ячейкам сетки в несколько метров.
+    Уровни: LRU с TTL в памяти -> таблица geocode_cache в PostgreSQL.
+    Одновременные промахи по одной ячейке приводят к одному запросу наверх.
+    """
+
+    def __init__(self, cell_meters: float, ttl_seconds: int, max_entries: int):
+        self.cell_meters = cell_meters
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Tuple[Optional[str], float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def cell_for(self, lat: float, lon: float) -> str:
+        """Ключ ячейки сетки: шаг по долготе подбирается по широте ряда"""
+        lat_step = self.cell_meters / METERS_PER_DEGREE
+        row = math.floor(lat / lat_step)
+        row_lat = (row + 0.5) * lat_step
+        lon_step = lat_step / max(math.cos(math.radians(row_lat)), 0.01)
+        col = math.floor(lon / lon_step)
+        return f"{self.cell_meters:g}:{row}:{col}"
+
+    def _memory_get(self, cell: str) -> Tuple[bool, Optional[str]]:
+        entry = self._memory.get(cell)
+        if entry is None:
+            return False, None
+        address, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._memory[cell]
+            return False, None
+        self._memory.move_to_end(cell)
+        return True, address
+
+    def _memory_put(self, cell: str, address: Optional[str], ttl: Optional[float] = None):
+        self._memory[cell] = (address, time.monotonic() + (ttl if ttl is not None else self.ttl_seconds))
+        self._memory.move_to_end(cell)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def _db_get(self, cell: str) -> Tuple[bool, Optional[str], float]:
+        try:
+            not_before = datetime.now(timezone.utc) - timedelta(seconds=self.ttl_seconds)
+            async with async_session_maker() as session:
+                entry = await GeocodeCacheRepository(session).get_fresh(cell, not_before)
+            if entry is None:
+                return False, None, 0
+            age = (datetime.now(timezone.utc) - entry.updated_at).total_seconds()
+            return True, entry.address, self.ttl_seconds - age
+        except Exception as e:
+            logger.warning(f"Geocode cache DB read failed: {e}")
+            return False, None, 0
+
+    async def _db_put(self, cell: str, address: Optional[str]):
+        try:
+            async with async_session_maker() as session:
+                await GeocodeCacheRepository(session).upsert(cell, address)
+        except Exception as e:
+            logger.warning(f"Geocode cache DB write failed: {e}")
+
+    async def _load(self, cell: str, fetch) -> Optional[str]:
+        try:
+            found, address, ttl_left = await self._db_get(cell)
+            if found:
+                self._memory_put(cell, address, ttl_left)
+                return address
+            address = await fetch()
+            self._memory_put(cell, address)
+            await self._db_put(cell, address)
+            return address
+        finally:
+            self._inflight.pop(cell, None)
+
+    async def get_or_fetch(self, lat: float, lon: float, fetch) -> Optional[str]:
+        """
+        Адрес из кэша или результат fetch() для ячейки.
+        fetch должен выбрасывать исключение при ошибке, чтобы она не кэшировалась.
+        """
+        cell = self.cell_for(lat, lon)
+
+        found, address = self._memory_get(cell)
+        if found:
+            return address
+
+        task = self._inflight.get(cell)
+        if task is None:
+            # Загрузка идёт отдельной задачей: отмена любого из ожидающих, в том числе
+            # запустившего её, не отменяет запрос для остальных
+            task = asyncio.ensure_future(self._load(cell, fetch))
+            task.add_done_callback(_retrieve_exception)
+            self._inflight[cell] = task
+        return await asyncio.shield(task)
+
+
+def _retrieve_exception(task: asyncio.Task):
+    """Ошибка загрузки уже передана ожидающим; если их не осталось, не логировать её как потерянную"""
+    if not task.cancelled():
+        task.exception()
+
 
 class GeocodingService:
-    """Сервис для работы с геокодированием через DaData"""
+    """
+    Сервис обратного геокодирования.
+    Бэкенд задаётся GEOCODER_BACKEND: DaData (с кэшем) или локальный офлайн-индекс.
+    """
+
+    _cache: Optional[ReverseGeocodeCache] = None
+    # Общие для процесса HTTP-клиент, предохранитель и счётчики DaData
+    _client: Optional[httpx.AsyncClient] = None
+    _breaker = CircuitBreaker(
+        "dadata",
+        failure_threshold=configs.GEOCODER_BREAKER_FAILURES,
+        reset_timeout=configs.GEOCODER_BREAKER_RESET_SECONDS
+    )
+    _stats = CallStats()
+
     def __init__(self):
         self.api_key = os.getenv("DADATA_API_KEY")
         self.url = "https://suggestions.dadata.ru/suggestions/api/4_1/rs/geolocate/address"
+        if GeocodingService._cache is None:
+            GeocodingService._cache = ReverseGeocodeCache(
+                cell_meters=configs.GEOCODE_CACHE_CELL_METERS,
+                ttl_seconds=configs.GEOCODE_CACHE_TTL_SECONDS,
+                max_entries=configs.GEOCODE_CACHE_MAX_ENTRIES
+            )
+        self.cache = GeocodingService._cache
+        self.offline = OfflineGeocoder.get_shared() if configs.GEOCODER_BACKEND == "offline" else None
+
+    @classmethod
+    async def open_client(cls) -> httpx.AsyncClient:
+        """Создаёт долгоживущий клиент с пулом соединений (вызывается из lifespan)"""
+        if cls._client is None:
+            cls._client = httpx.AsyncClient(
+                http2=True,
+                timeout=httpx.Timeout(configs.GEOCODER_TIMEOUT_SECONDS, connect=2.0),
+                limits=httpx.Limits(
+                    max_connections=configs.GEOCODER_MAX_CONNECTIONS,
+                    max_keepalive_connections=configs.GEOCODER_MAX_CONNECTIONS,
+                    keepalive_expiry=60.0
+                ),
+                headers={
+                    "Content-Type": "application/json",
+                    "Accept": "application/json",
+                }
+            )
+        return cls._client
+
+    @classmethod
+    async def close_client(cls) -> None:
+        """Закрывает общий клиент (вызывается из lifespan)"""
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+
+    @classmethod
+    def get_metrics(cls) -> dict:
+        """Счётчики задержек и ошибок запросов к DaData"""
+        return {"circuit": cls._breaker.state, **cls._stats.as_dict()}
+
+    async def _fetch_address(self, lat: float, lon: float) -> Optional[str]:
+        """Запрос к DaData; ошибки пробрасываются, пустой ответ - None"""
+        try:
+            self._breaker.before_call()
+        except CircuitOpenError:
+            self._stats.rejected += 1
+            raise
+
+        started = time.perf_counter()
+        try:
+            client = await self.open_client()
+            response = await client.post(
+                url=self.url,
+                headers={"Authorization": f"Token {self.api_key}"},
+                json={"lat": lat, "lon": lon}
+            )
+            response.raise_for_status()
+            data = response.json()
+        except asyncio.CancelledError:
+            self._breaker.release_trial()
+            raise
+        except Exception as e:
+            self._stats.record(time.perf_counter() - started, e)
+            self._breaker.record_failure()
+            raise
+
+        self._stats.record(time.perf_counter() - started)
+        self._breaker.record_success()
+
+        if data.get("suggestions") and len(data["suggestions"]) > 0:
+            return data["suggestions"][0]["value"]
+        return None
 
     async def geocode_coordinates(self, latitude: str, longitude: str) -> Optional[str]:
         """
         Выполняет обратное геокодирование (координаты -> адрес)
         """
+        if self.offline is not None:
+            try:
+                result = self.offline.reverse(float(latitude), float(longitude))
+                return result.address if result else None
+            except Exception as e:
+                logger.warning(f"Ошибка офлайн-геокодирования: {e}")
+                return None
+
         if not self.api_key:
             return None
 
@@ -23,30 +231,14 @@ class GeocodingService:
             lat = float(latitude)
             lon = float(longitude)
 
-            coordinates = {"lat": lat, "lon": lon}
-
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    url=self.url,
-                    headers={
-                        "Content-Type": "application/json",
-                        "Accept": "application/json",
-                        "Authorization": f"Token {self.api_key}"
-                    },
-                    json=coordinates
-                )
-
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get("suggestions") and len(data["suggestions"]) > 0:
-                        address = data["suggestions"][0]["value"]
-                        return address
-                    else:
-                        return None
-                else:
-                    return None
+            return await self.cache.get_or_fetch(
+                lat, lon, lambda: self._fetch_address(lat, lon)
+            )
+        except CircuitOpenError:
+            logger.debug("DaData circuit is open, skipping geocoding")
+            return None
         except Exception as e:
-            print(f"Ошибка геокодирования: {e}")
+            logger.warning(f"Ошибка геокодирования: {e}")
             return None
 
     async def get_address_or_coordinates(
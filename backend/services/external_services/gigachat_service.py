@@ -2,48 +2,91 @@
 
 import os
 import time
-from typing import Optional
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Optional, Callable, Awaitable
 from dotenv import load_dotenv
 from gigachat import GigaChat
 from gigachat.models import Chat, Messages, MessagesRole
+from loguru import logger
+
+from backend.core.config import configs
 
 load_dotenv()
 
 GIGACHAT_CREDENTIALS = os.getenv('GIGACHAT_CREDENTIALS')
 GIGACHAT_SCOPE = os.getenv('GIGACHAT_SCOPE', 'GIGACHAT_API_PERS')
 
-
 class GigaChatService:
     """Сервис для работы с GigaChat API."""
 
+    # Общие для процесса клиент, ограничение параллельных запросов и кэш ответов
+    _client: Optional[GigaChat] = None
+    _semaphore: Optional[asyncio.Semaphore] = None
+    _cache: "OrderedDict[str, str]" = OrderedDict()
+
     def __init__(self):
         self.credentials = GIGACHAT_CREDENTIALS
         self.scope = GIGACHAT_SCOPE
-        self.client = None
-
-    def _get_client(self) -> GigaChat:
-        if self.client is None:
-            self.client = GigaChat(
-                credentials=self.credentials,
-                scope=self.scope,
+        self.timeout = configs.GIGACHAT_TIMEOUT_SECONDS
+
+    @classmethod
+    def _get_client(cls) -> GigaChat:
+        if cls._client is None:
+            cls._client = GigaChat(
+                base_url=configs.GIGACHAT_BASE_URL,
+                credentials=GIGACHAT_CREDENTIALS,
+                scope=GIGACHAT_SCOPE,
                 verify_ssl_certs=False
             )
-        return self.client
-
-    def generate_complaint_text(
-        self,
+        return cls._client
+
+    @classmethod
+    def _get_semaphore(cls) -> asyncio.Semaphore:
+        if cls._semaphore is None:
+            cls._semaphore = asyncio.Semaphore(configs.GIGACHAT_MAX_CONCURRENCY)
+        return cls._semaphore
+
+    @classmethod
+    async def close_client(cls) -> None:
+        """Закрывает общий клиент (вызывается из lifespan и воркера)"""
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+
+    @staticmethod
+    def _cache_key(**params) -> str:
+        """Хэш параметров промпта"""
+        payload = json.dumps(params, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def _cache_get(cls, key: str) -> Optional[str]:
+        text = cls._cache.get(key)
+        if text is not None:
+            cls._cache.move_to_end(key)
+        return text
+
+    @classmethod
+    def _cache_put(cls, key: str, text: str) -> None:
+        cls._cache[key] = text
+        cls._cache.move_to_end(key)
+        while len(cls._cache) > configs.GIGACHAT_CACHE_SIZE:
+            cls._cache.popitem(last=False)
+
+    @staticmethod
+    def _build_prompt(
         city: str,
         address: str,
         description: str,
         total_potholes: int,
         max_risk: float,
         priority: str,
-        person_name: str = "Заявитель"
+        person_name: str
     ) -> str:
-        """Генерирует текст заявления о дорожной проблеме."""
-        try:
-            client = self._get_client()
-            prompt = f"""Составь официальное заявление в управление дорожной деятельности города {city} о проблеме с дорожным покрытием.
+        return f"""Составь официальное заявление в управление дорожной деятельности города {city} о проблеме с дорожным покрытием.
 
 Заявитель: {person_name}
 Адрес проблемы: {address}
@@ -67,21 +110,73 @@ class GigaChatService:
 
 Кратко, официально, 150-200 слов. БЕЗ контактных данных заявителя!"""
 
-            messages = [Messages(role=MessagesRole.USER, content=prompt)]
-            response = client.chat(Chat(messages=messages, temperature=0.5, max_tokens=400))
-            generated_text = response.choices[0].message.content
-            return generated_text.strip()
+    async def generate_complaint_text(
+        self,
+        city: str,
+        address: str,
+        description: str,
+        total_potholes: int,
+        max_risk: float,
+        priority: str,
+        person_name: str = "Заявитель",
+        on_progress: Optional[Callable[[str], Awaitable[None]]] = None
+    ) -> str:
+        """
+        Генерирует текст заявления о дорожной проблеме.
+        Одинаковые параметры отдаются из кэша; при ошибке или превышении
+        GIGACHAT_TIMEOUT_SECONDS возвращается резервный текст.
+        Если передан on_progress, ответ запрашивается потоком и накопленный
+        текст передаётся в колбэк не чаще раза в GIGACHAT_STREAM_FLUSH_SECONDS.
+        """
+        params = dict(
+            city=city,
+            address=address,
+            description=description,
+            total_potholes=total_potholes,
+            max_risk=round(max_risk, 1),
+            priority=priority,
+            person_name=person_name
+        )
+        key = self._cache_key(**params)
+        cached = self._cache_get(key)
+        if cached is not None:
+            logger.info("GigaChat: using cached complaint text")
+            return cached
+
+        try:
+            messages = [Messages(role=MessagesRole.USER, content=self._build_prompt(**params))]
+            chat = Chat(messages=messages, temperature=0.5, max_tokens=400)
+            async with self._get_semaphore():
+                if on_progress is None:
+                    response = await asyncio.wait_for(self._get_client().achat(chat), timeout=self.timeout)
+                    generated_text = response.choices[0].message.content.strip()
+                else:
+                    generated_text = await asyncio.wait_for(self._stream(chat, on_progress), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"GigaChat did not respond in {self.timeout}s, using fallback text")
+            return self._generate_fallback_text(**params)
         except Exception as e:
-            print(f"[GigaChat Service] Error generating text: {e}")
-            return self._generate_fallback_text(
-                city=city,
-                address=address,
-                description=description,
-                total_potholes=total_potholes,
-                max_risk=max_risk,
-                priority=priority,
-                person_name=person_name
-            )
+            logger.error(f"GigaChat error generating text: {e}")
+            return self._generate_fallback_text(**params)
+
+        self._cache_put(key, generated_text)
+        return generated_text
+
+    async def _stream(self, chat: Chat, on_progress: Callable[[str], Awaitable[None]]) -> str:
+        """Потоковое получение ответа с периодической передачей накопленного текста"""
+        parts = []
+        last_flush = time.monotonic()
+        async for chunk in self._get_client().astream(chat):
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            parts.append(chunk.choices[0].delta.content)
+            if time.monotonic() - last_flush >= configs.GIGACHAT_STREAM_FLUSH_SECONDS:
+                last_flush = time.monotonic()
+                try:
+                    await on_progress("".join(parts))
+                except Exception as e:
+                    logger.warning(f"GigaChat progress callback failed: {e}")
+        return "".join(parts).strip()
 
     def _generate_fallback_text(
         self,
@@ -0,0 +1,190 @@
+"""
+Офлайн обратное геокодирование по локальной выгрузке адресов (OSM / ФИАС).
+
+Индекс строится один раз из CSV-выгрузки с колонками lat, lon, address, city
+и хранится в каталоге в виде массивов numpy и бинарного файла строк.
+Файлы открываются через mmap, поэтому несколько воркеров делят одни и те же
+страницы памяти. Поиск ближайшего адреса: ячейка сетки и соседние в радиусе
+max_distance_m (к северу ячейки уже, поэтому по долготе их берётся больше),
+бинарный поиск по отсортированным id ячеек, без обращений к сети.
+
+Сборка индекса:
+    python -m backend.services.external_services.offline_geocoder build addresses.csv data/geoindex
+"""
+
+import csv
+import json
+import math
+import mmap
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from backend.core.config import configs
+
+METERS_PER_DEGREE = 111_320.0
+CELL_COLUMNS = 1_000_000
+# Ограничение ширины поиска у полюсов, где ячейки сужаются почти до нуля
+MIN_COS_LAT = 0.01
+
+
+@dataclass(frozen=True)
+class ReverseGeocodeResult:
+    address: str
+    city: Optional[str]
+    distance_m: float
+
+
+def _cell_ids(lat: np.ndarray, lon: np.ndarray, grid_deg: float) -> np.ndarray:
+    rows = np.floor((lat + 90.0) / grid_deg).astype(np.int64)
+    cols = np.floor((lon + 180.0) / grid_deg).astype(np.int64)
+    return rows * CELL_COLUMNS + cols
+
+
+class OfflineGeocoder:
+    """Поиск ближайшего адреса по memory-mapped сеточному индексу."""
+
+    _shared: Optional["OfflineGeocoder"] = None
+    _shared_loaded = False
+
+    def __init__(self, index_dir: str, max_distance_m: float = 300.0):
+        index_path = Path(index_dir)
+        meta = json.loads((index_path / "meta.json").read_text(encoding="utf-8"))
+        self.grid_deg = meta["grid_deg"]
+        self.max_distance_m = max_distance_m
+
+        self.cells = np.load(index_path / "cells.npy", mmap_mode="r")
+        self.coords = np.load(index_path / "coords.npy", mmap_mode="r")
+        self.address_offsets = np.load(index_path / "address_offsets.npy", mmap_mode="r")
+        self.city_ids = np.load(index_path / "city_ids.npy", mmap_mode="r")
+        self.cities = meta["cities"]
+
+        self._strings_file = open(index_path / "addresses.bin", "rb")
+        self._strings = mmap.mmap(self._strings_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    def get_shared(cls) -> Optional["OfflineGeocoder"]:
+        """Общий для процесса индекс из OFFLINE_GEOCODER_INDEX_DIR (None, если не настроен)"""
+        if not cls._shared_loaded:
+            cls._shared_loaded = True
+            index_dir = configs.OFFLINE_GEOCODER_INDEX_DIR
+            if index_dir and (Path(index_dir) / "meta.json").exists():
+                cls._shared = cls(index_dir, configs.OFFLINE_GEOCODER_MAX_DISTANCE_M)
+        return cls._shared
+
+    def _address_at(self, idx: int) -> str:
+        start, end = int(self.address_offsets[idx]), int(self.address_offsets[idx + 1])
+        return self._strings[start:end].decode("utf-8")
+
+    def reverse(self, lat: float, lon: float) -> Optional[ReverseGeocodeResult]:
+        """Ближайший адрес в пределах max_distance_m"""
+        row = math.floor((lat + 90.0) / self.grid_deg)
+        col = math.floor((lon + 180.0) / self.grid_deg)
+        cos_lat = math.cos(math.radians(lat))
+
+        # Сколько ячеек укладывается в max_distance_m по широте и по долготе
+        cell_height_m = self.grid_deg * METERS_PER_DEGREE
+        cell_width_m = cell_height_m * max(cos_lat, MIN_COS_LAT)
+        row_span = max(1, math.ceil(self.max_distance_m / cell_height_m))
+        col_span = max(1, math.ceil(self.max_distance_m / cell_width_m))
+
+        # Ячейки одной строки идут подряд: один диапазон id на строку
+        rows = np.arange(row - row_span, row + row_span + 1, dtype=np.int64) * CELL_COLUMNS
+        starts = np.searchsorted(self.cells, rows + (col - col_span), side="left")
+        ends = np.searchsorted(self.cells, rows + (col + col_span), side="right")
+
+        best_idx, best_dist2 = -1, float("inf")
+        for lo, hi in zip(starts.tolist(), ends.tolist()):
+            if lo == hi:
+                continue
+            points = self.coords[lo:hi]
+            d_lat = (points[:, 0] - lat) * METERS_PER_DEGREE
+            d_lon = (points[:, 1] - lon) * METERS_PER_DEGREE * cos_lat
+            dist2 = d_lat * d_lat + d_lon * d_lon
+            local = int(np.argmin(dist2))
+            if dist2[local] < best_dist2:
+                best_idx, best_dist2 = lo + local, float(dist2[local])
+
+        if best_idx < 0:
+            return None
+        distance = math.sqrt(best_dist2)
+        if distance > self.max_distance_m:
+            return None
+
+        city_id = int(self.city_ids[best_idx])
+        return ReverseGeocodeResult(
+            address=self._address_at(best_idx),
+            city=self.cities[city_id] if city_id >= 0 else None,
+            distance_m=distance
+        )
+
+    @staticmethod
+    def build(csv_path: str, index_dir: str, grid_deg: float = 0.005) -> int:
+        """
+        Строит индекс из CSV-выгрузки (lat, lon, address, city).
+        Returns:
+            Количество проиндексированных адресов
+        """
+        lats, lons, addresses, city_ids = [], [], [], []
+        cities, city_index = [], {}
+
+        with open(csv_path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                try:
+                    lat, lon = float(row["lat"]), float(row["lon"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                address = (row.get("address") or "").strip()
+                if not address:
+                    continue
+                city = (row.get("city") or "").strip()
+                if city and city not in city_index:
+                    city_index[city] = len(cities)
+                    cities.append(city)
+
+                lats.append(lat)
+                lons.append(lon)
+                addresses.append(address.encode("utf-8"))
+                city_ids.append(city_index[city] if city else -1)
+
+        lat_arr = np.asarray(lats, dtype=np.float64)
+        lon_arr = np.asarray(lons, dtype=np.float64)
+        cells = _cell_ids(lat_arr, lon_arr, grid_deg)
+        order = np.argsort(cells, kind="stable")
+
+        out = Path(index_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        np.save(out / "cells.npy", cells[order])
+        np.save(out / "coords.npy", np.stack([lat_arr, lon_arr], axis=1)[order].astype(np.float64))
+        np.save(out / "city_ids.npy", np.asarray(city_ids, dtype=np.int32)[order])
+
+        offsets = np.zeros(len(order) + 1, dtype=np.int64)
+        with open(out / "addresses.bin", "wb") as f:
+            position = 0
+            for i, idx in enumerate(order):
+                data = addresses[idx]
+                f.write(data)
+                position += len(data)
+                offsets[i + 1] = position
+        np.save(out / "address_offsets.npy", offsets)
+
+        (out / "meta.json").write_text(
+            json.dumps({"grid_deg": grid_deg, "count": len(order), "cities": cities}, ensure_ascii=False),
+            encoding="utf-8"
+        )
+        return len(order)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "build":
+        count = OfflineGeocoder.build(sys.argv[2], sys.argv[3])
+        print(f"Indexed {count} addresses into {sys.argv[3]}")
+    elif len(sys.argv) == 5 and sys.argv[1] == "query":
+        print(OfflineGeocoder(sys.argv[2]).reverse(float(sys.argv[3]), float(sys.argv[4])))
+    else:
+        print("Usage:\n"
+              "  offline_geocoder build <addresses.csv> <index_dir>\n"
+              "  offline_geocoder query <index_dir> <lat> <lon>")
@@ -1,16 +1,35 @@
 import aioboto3
 from botocore.config import Config
-from typing import Optional
-from datetime import datetime
-import uuid
+from botocore.exceptions import ClientError
+from collections import OrderedDict
+from typing import Optional, Iterable, Dict, Union, List, AsyncIterator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import unquote
+import asyncio
+import hashlib
 from io import BytesIO
 
 from backend.core.config import configs
 
 
+CONTENT_TYPE_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "video/mp4": "mp4",
+}
+
+
 class S3Service:
     """Сервис для работы с S3"""
 
+    # Локальный индекс ключей, про которые известно, что они уже есть в bucket: ключ -> LastModified.
+    # Общий для всех экземпляров сервиса в процессе. Запись действует S3_INDEX_TTL_SECONDS, что
+    # меньше срока, после которого очистка медиа удаляет объект, поэтому объект, удалённый очисткой
+    # (в том числе из другого процесса), не может оказаться в индексе действующим.
+    _known_keys: "OrderedDict[str, datetime]" = OrderedDict()
+
     def __init__(self):
         self.config = Config(
             s3={'addressing_style': 'virtual'},
@@ -25,32 +44,149 @@ class S3Service:
         )
         self.bucket_name = configs.S3_BUCKET_NAME
         self.endpoint_url = configs.S3_ENDPOINT_URL
+        self.index_cache_size = configs.S3_INDEX_CACHE_SIZE
+        self.index_ttl = timedelta(seconds=configs.S3_INDEX_TTL_SECONDS)
+
+    def _client(self):
+        """Асинхронный клиент S3"""
+        return self.session.client(
+            "s3",
+            endpoint_url=self.endpoint_url,
+            config=self.config
+        )
+
+    def build_public_url(self, s3_key: str) -> str:
+        """Публичный URL объекта в bucket"""
+        return f"https://{self.bucket_name}.hb.ru-msk.vkcloud-storage.ru/{s3_key}"
+
+    def extract_key(self, url: str) -> Optional[str]:
+        """
+        Ключ объекта по его публичному URL
+        Returns:
+            Ключ или None, если URL указывает не на наш bucket
+        """
+        prefix = self.build_public_url("")
+        if not url or not url.startswith(prefix):
+            return None
+        return unquote(url[len(prefix):].split("?", 1)[0]) or None
+
+    @staticmethod
+    def build_content_key(file_bytes: bytes, folder: str, ext: str) -> str:
+        """Ключ объекта по SHA-256 содержимого"""
+        digest = hashlib.sha256(file_bytes).hexdigest()
+        return f"{folder}/{digest}.{ext}"
+
+    @staticmethod
+    def _resolve_extension(filename: Optional[str], content_type: str) -> str:
+        """Расширение файла по content-type, иначе по имени файла"""
+        if content_type in CONTENT_TYPE_EXTENSIONS:
+            return CONTENT_TYPE_EXTENSIONS[content_type]
+        if filename and Path(filename).suffix:
+            return Path(filename).suffix.lstrip(".").lower()
+        return "jpg" if "image" in content_type else "mp4"
+
+    def _remember_key(self, s3_key: str, last_modified: Optional[datetime] = None) -> None:
+        """Добавляет ключ в локальный индекс (LRU)"""
+        self._known_keys[s3_key] = last_modified or datetime.now(timezone.utc)
+        self._known_keys.move_to_end(s3_key)
+        while len(self._known_keys) > self.index_cache_size:
+            self._known_keys.popitem(last=False)
+
+    def _forget_key(self, s3_key: str) -> None:
+        """Удаляет ключ из локального индекса"""
+        self._known_keys.pop(s3_key, None)
+
+    def _is_recent(self, last_modified: datetime) -> bool:
+        return datetime.now(timezone.utc) - last_modified < self.index_ttl
+
+    async def _head(self, s3, s3_key: str) -> Optional[dict]:
+        """HEAD объекта или None, если его нет"""
+        try:
+            return await s3.head_object(Bucket=self.bucket_name, Key=s3_key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    async def reuse_existing_object(self, s3_key: str) -> bool:
+        """
+        Проверка наличия объекта для повторного использования: сначала локальный индекс, затем HEAD.
+        Если объект старше S3_INDEX_TTL_SECONDS, он копируется сам в себя, чтобы обновить
+        LastModified: иначе очистка медиа может удалить его до того, как ссылка попадёт в заявку.
+        """
+        known = self._known_keys.get(s3_key)
+        if known is not None and self._is_recent(known):
+            self._known_keys.move_to_end(s3_key)
+            return True
+
+        async with self._client() as s3:
+            head = await self._head(s3, s3_key)
+            if head is None:
+                self._forget_key(s3_key)
+                return False
+
+            last_modified = head["LastModified"]
+            if not self._is_recent(last_modified):
+                await s3.copy_object(
+                    Bucket=self.bucket_name,
+                    Key=s3_key,
+                    CopySource={"Bucket": self.bucket_name, "Key": s3_key},
+                    MetadataDirective="REPLACE",
+                    Metadata=head.get("Metadata") or {},
+                    ContentType=head.get("ContentType") or "application/octet-stream",
+                    CacheControl=head.get("CacheControl") or "public, max-age=31536000, immutable",
+                    ACL="public-read"
+                )
+                last_modified = datetime.now(timezone.utc)
+
+        self._remember_key(s3_key, last_modified)
+        return True
+
+    async def filter_not_modified_since(
+            self,
+            s3_keys: List[str],
+            threshold: datetime,
+            concurrency: int = 8
+    ) -> List[str]:
+        """
+        Ключи существующих объектов, не изменявшихся с threshold (HEAD каждого)
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        async with self._client() as s3:
+            async def check(key: str) -> bool:
+                async with semaphore:
+                    head = await self._head(s3, key)
+                return head is not None and head["LastModified"] < threshold
+
+            results = await asyncio.gather(*(check(key) for key in s3_keys))
+        return [key for key, old in zip(s3_keys, results) if old]
 
     async def upload_file(
             self,
             file_bytes: bytes,
             folder: str = "processed",
             filename: Optional[str] = None,
-            content_type: str = "image/jpeg"
+            content_type: str = "image/jpeg",
+            s3_key: Optional[str] = None
     ) -> str:
         """
-        Загрузка файла в S3
+        Загрузка файла в S3 по контентному адресу.
+        Ключ строится из хэша содержимого, поэтому повторная загрузка тех же
+        байтов ничего не стоит, а ключи разных пользователей не пересекаются.
+        Имя файла используется только для определения расширения.
+        Явный s3_key нужен для производных файлов (превью), ключ которых
+        выводится из контентного ключа исходника.
         Returns:
             URL загруженного файла
         """
-        if filename is None:
-            timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-            unique_id = str(uuid.uuid4())[:8]
-            ext = "jpg" if "image" in content_type else "mp4"
-            filename = f"{timestamp}_{unique_id}.{ext}"
+        if s3_key is None:
+            ext = self._resolve_extension(filename, content_type)
+            s3_key = self.build_content_key(file_bytes, folder, ext)
 
-        s3_key = f"{folder}/{filename}"
+        if await self.reuse_existing_object(s3_key):
+            return self.build_public_url(s3_key)
 
-        async with self.session.client(
-                "s3",
-                endpoint_url=self.endpoint_url,
-                config=self.config
-        ) as s3:
+        async with self._client() as s3:
             try:
                 file_obj = BytesIO(file_bytes)
 
@@ -59,7 +195,8 @@ class S3Service:
                     self.bucket_name,
                     s3_key,
                     ExtraArgs={
-                        'ContentType': content_type
+                        'ContentType': content_type,
+                        'CacheControl': 'public, max-age=31536000, immutable'
                     }
                 )
                 await s3.put_object_acl(
@@ -67,37 +204,84 @@ class S3Service:
                     Key=s3_key,
                     ACL='public-read'
                 )
-                file_url = f"https://{self.bucket_name}.hb.ru-msk.vkcloud-storage.ru/{s3_key}"
-                return file_url
+                self._remember_key(s3_key)
+                return self.build_public_url(s3_key)
 
             except Exception as e:
                 print(f"Ошибка загрузки в S3: {e}")
                 raise
 
+    async def _read_object(self, s3, s3_key: str, max_bytes: Optional[int] = None) -> bytes:
+        """Потоковое чтение объекта с ограничением размера"""
+        params = {"Bucket": self.bucket_name, "Key": s3_key}
+        if max_bytes is not None:
+            # Запрашиваем на байт больше лимита, чтобы отличить превышение
+            params["Range"] = f"bytes=0-{max_bytes}"
+
+        response = await s3.get_object(**params)
+        chunks = []
+        total = 0
+        async with response["Body"] as stream:
+            while True:
+                chunk = await stream.read(64 * 1024)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if max_bytes is not None and total > max_bytes:
+                    raise ValueError(f"Объект {s3_key} превышает лимит {max_bytes} байт")
+                chunks.append(chunk)
+        return b"".join(chunks)
+
+    async def download_file(self, s3_key: str, max_bytes: Optional[int] = None) -> bytes:
+        """
+        Скачивание объекта из S3 через API
+        Returns:
+            Содержимое объекта
+        """
+        async with self._client() as s3:
+            return await self._read_object(s3, s3_key, max_bytes)
+
+    async def download_files(
+            self,
+            s3_keys: Iterable[str],
+            max_bytes: Optional[int] = None,
+            concurrency: int = 4
+    ) -> Dict[str, Union[bytes, Exception]]:
+        """
+        Параллельное скачивание нескольких объектов одним клиентом
+        Returns:
+            Словарь ключ -> содержимое или исключение
+        """
+        keys = list(dict.fromkeys(s3_keys))
+        if not keys:
+            return {}
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        async with self._client() as s3:
+            async def fetch(key: str) -> bytes:
+                async with semaphore:
+                    return await self._read_object(s3, key, max_bytes)
+
+            results = await asyncio.gather(*(fetch(key) for key in keys), return_exceptions=True)
+        return dict(zip(keys, results))
+
     async def delete_file(self, s3_key: str) -> bool:
         """
         Удаление файла из S3
         Returns:
             True если успешно удалено
         """
-        async with self.session.client(
-                "s3",
-                endpoint_url=self.endpoint_url,
-                config=self.config
-        ) as s3:
+        async with self._client() as s3:
             try:
                 await s3.delete_object(Bucket=self.bucket_name, Key=s3_key)
+                self._forget_key(s3_key)
                 return True
             except Exception as e:
                 return False
 
     async def check_bucket_exists(self) -> bool:
         """Проверка существования bucket"""
-        async with self.session.client(
-                "s3",
-                endpoint_url=self.endpoint_url,
-                config=self.config
-        ) as s3:
+        async with self._client() as s3:
             try:
                 await s3.head_bucket(Bucket=self.bucket_name)
                 return True
@@ -106,11 +290,7 @@ class S3Service:
 
     async def create_bucket_if_not_exists(self):
         """Создание bucket если не существует"""
-        async with self.session.client(
-                "s3",
-                endpoint_url=self.endpoint_url,
-                config=self.config
-        ) as s3:
+        async with self._client() as s3:
             try:
                 if not await self.check_bucket_exists():
                     await s3.create_bucket(Bucket=self.bucket_name)
@@ -122,11 +302,7 @@ class S3Service:
         """
         Делает весь bucket публичным (опционально)
         """
-        async with self.session.client(
-                "s3",
-                endpoint_url=self.endpoint_url,
-                config=self.config
-        ) as s3:
+        async with self._client() as s3:
             try:
                 await s3.put_bucket_acl(
                     Bucket=self.bucket_name,
@@ -135,6 +311,18 @@ class S3Service:
             except Exception as e:
                 print(f"❌ Ошибка настройки ACL bucket: {e}")
 
+    async def iter_objects(self, prefix: str = "") -> AsyncIterator[dict]:
+        """
+        Постраничный обход объектов bucket без ограничения в 1000 ключей
+        Yields:
+            Описания объектов (Key, Size, LastModified, ...)
+        """
+        async with self._client() as s3:
+            paginator = s3.get_paginator("list_objects_v2")
+            async for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+                for obj in page.get("Contents", []):
+                    yield obj
+
     async def list_files(self, prefix: str = "") -> list:
         """
         Получить список файлов в bucket
@@ -142,20 +330,31 @@ class S3Service:
         Returns:
             Список ключей файлов
         """
-        async with self.session.client(
-                "s3",
-                endpoint_url=self.endpoint_url,
-                config=self.config
-        ) as s3:
-            try:
-                response = await s3.list_objects_v2(
+        try:
+            return [obj["Key"] async for obj in self.iter_objects(prefix)]
+        except Exception as e:
+            print(f"Ошибка получения списка файлов: {e}")
+            return []
+
+    async def delete_files(self, s3_keys: List[str]) -> int:
+        """
+        Пакетное удаление объектов (по 1000 ключей за запрос)
+        Returns:
+            Количество удалённых объектов
+        """
+        deleted = 0
+        async with self._client() as s3:
+            for start in range(0, len(s3_keys), 1000):
+                chunk = s3_keys[start:start + 1000]
+                response = await s3.delete_objects(
                     Bucket=self.bucket_name,
-                    Prefix=prefix
+                    Delete={"Objects": [{"Key": key} for key in chunk], "Quiet": True}
                 )
-
-                if 'Contents' in response:
-                    return [obj['Key'] for obj in response['Contents']]
-                return []
-            except Exception as e:
-                print(f"Ошибка получения списка файлов: {e}")
-                return []
+                failed = {error["Key"] for error in response.get("Errors", [])}
+                for error in response.get("Errors", []):
+                    print(f"Ошибка удаления {error.get('Key')}: {error.get('Message')}")
+                for key in chunk:
+                    if key not in failed:
+                        self._forget_key(key)
+                deleted += len(chunk) - len(failed)
+        return deleted
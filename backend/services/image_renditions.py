@@ -0,0 +1,52 @@
+"""
+Варианты (rendition) размеченных изображений: полный, средний и превью.
+Ключи производных вариантов выводятся из контентного ключа полного изображения,
+поэтому их URL можно получить по одному image_url без хранения в БД.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from backend.core.config import configs
+
+
+@dataclass(frozen=True)
+class RenditionSpec:
+    name: str
+    suffix: str
+    ext: str
+    content_type: str
+    max_side: int
+    quality: int
+
+
+RENDITIONS: List[RenditionSpec] = [
+    RenditionSpec("full", "", "jpg", "image/jpeg", configs.IMAGE_OUTPUT_MAX_SIDE, 85),
+    RenditionSpec("medium", "_medium", "webp", "image/webp", configs.IMAGE_MEDIUM_MAX_SIDE, 80),
+    RenditionSpec("thumbnail", "_thumb", "webp", "image/webp", configs.IMAGE_THUMBNAIL_MAX_SIDE, 75),
+]
+
+_CONTENT_ADDRESSED_IMAGE = re.compile(r"^(?P<base>.*processed/images/[0-9a-f]{64})\.jpg$")
+
+
+def build_rendition_key(full_key: str, spec: RenditionSpec) -> str:
+    """Ключ варианта по ключу полного изображения"""
+    base = full_key.rsplit(".", 1)[0]
+    return f"{base}{spec.suffix}.{spec.ext}"
+
+
+def rendition_urls(image_url: Optional[str]) -> Optional[Dict[str, Optional[str]]]:
+    """
+    URL всех вариантов изображения.
+    Для изображений, загруженных до появления вариантов, доступен только полный.
+    """
+    if not image_url:
+        return None
+
+    match = _CONTENT_ADDRESSED_IMAGE.match(image_url)
+    if not match:
+        return {spec.name: (image_url if spec.name == "full" else None) for spec in RENDITIONS}
+
+    base = match.group("base")
+    return {spec.name: f"{base}{spec.suffix}.{spec.ext}" for spec in RENDITIONS}
@@ -0,0 +1,30 @@
+"""
+Уменьшение фотографий перед вставкой в PDF и вложением в письмо.
+"""
+
+import io
+from typing import Optional, Tuple
+
+from loguru import logger
+from PIL import Image, ImageOps
+
+
+def downscale_photo(content: bytes, max_px: int, quality: int) -> Optional[Tuple[bytes, int, int]]:
+    """
+    Уменьшает фото до max_px по большей стороне и пережимает в JPEG.
+    Returns:
+        (JPEG, ширина, высота) или None, если файл не является изображением
+    """
+    try:
+        with Image.open(io.BytesIO(content)) as image:
+            # JPEG декодируется сразу в уменьшенном масштабе
+            image.draft("RGB", (max_px, max_px))
+            # Поворот по EXIF: при пережатии тег Orientation теряется
+            photo = ImageOps.exif_transpose(image)
+            photo.thumbnail((max_px, max_px))
+            out = io.BytesIO()
+            photo.convert("RGB").save(out, "JPEG", quality=quality)
+            return out.getvalue(), photo.width, photo.height
+    except Exception as e:
+        logger.warning(f"Skipping photo that cannot be decoded: {e}")
+        return None
@@ -0,0 +1,61 @@
+"""
+Спул исходящей почты в формате maildir.
+
+Сообщение сначала пишется в tmp/, сбрасывается на диск и переименовывается
+в new/, поэтому воркер доставки никогда не видит недописанный файл.
+При нескольких хостах каталог спула должен быть общим.
+"""
+
+import os
+import socket
+import time
+import uuid
+from pathlib import Path
+from typing import BinaryIO, Callable, Tuple
+
+
+class MailSpool:
+    """Каталог с готовыми к отправке MIME-сообщениями."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.tmp_dir = self.root / "tmp"
+        self.new_dir = self.root / "new"
+        for directory in (self.tmp_dir, self.new_dir, self.root / "cur"):
+            directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _unique_name() -> str:
+        return f"{time.time():.6f}.P{os.getpid()}_{uuid.uuid4().hex}.{socket.gethostname()}"
+
+    def store(self, write: Callable[[BinaryIO], None]) -> Tuple[str, int]:
+        """
+        Сохраняет сообщение, которое write пишет в переданный файл.
+        Returns:
+            (ключ для чтения, размер в байтах)
+        """
+        key = self._unique_name()
+        tmp_path = self.tmp_dir / key
+        try:
+            with open(tmp_path, "wb") as f:
+                write(f)
+                size = f.tell()
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.replace(tmp_path, self.new_dir / key)
+        return key, size
+
+    def path(self, key: str) -> Path:
+        return self.new_dir / key
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self.path(key), "rb")
+
+    def remove(self, key: str) -> None:
+        try:
+            self.path(key).unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,121 @@
+"""
+Media GC Service - фоновая очистка медиафайлов в S3, на которые не ссылается ни одна заявка.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Set, Optional
+
+from loguru import logger
+from sqlalchemy import select, text
+
+from backend.core.config import configs
+from backend.core.database import async_session_maker
+from backend.models.report_model import Report
+from backend.services.external_services.s3_service import S3Service
+from backend.services.image_renditions import rendition_urls
+
+# Ключ advisory lock, чтобы очистку одновременно выполнял только один процесс
+MEDIA_GC_LOCK_ID = 72_028_001
+
+
+class MediaGarbageCollector:
+    """Удаляет из S3 объекты, не связанные с заявками (в т.ч. от удалённых черновиков)."""
+
+    def __init__(self, s3_service: Optional[S3Service] = None):
+        self.s3_service = s3_service or S3Service()
+        self.prefix = configs.MEDIA_GC_PREFIX
+        self.grace_period = timedelta(hours=configs.MEDIA_GC_GRACE_HOURS)
+        self.interval = configs.MEDIA_GC_INTERVAL_SECONDS
+
+    async def _collect_referenced_keys(self, session) -> Set[str]:
+        """Потоково читает ссылки на медиа из всех заявок."""
+        keys = set()
+        stmt = select(
+            Report.image_url, Report.image_urls, Report.video_url
+        ).execution_options(yield_per=1000)
+
+        result = await session.stream(stmt)
+        async for image_url, image_urls, video_url in result:
+            urls = [image_url, video_url]
+            if isinstance(image_urls, dict):
+                urls.extend(image_urls.get("urls") or [])
+            elif isinstance(image_urls, list):
+                urls.extend(image_urls)
+
+            for url in urls:
+                # Производные варианты изображения живут, пока жив исходник
+                for variant_url in (rendition_urls(url) or {}).values():
+                    key = self.s3_service.extract_key(variant_url) if variant_url else None
+                    if key:
+                        keys.add(key)
+        return keys
+
+    async def collect(self, dry_run: bool = False) -> dict:
+        """
+        Один проход очистки.
+        Returns:
+            Статистика: просмотрено, кандидатов, удалено
+        """
+        async with async_session_maker() as session:
+            locked = (await session.execute(
+                text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": MEDIA_GC_LOCK_ID}
+            )).scalar()
+            if not locked:
+                logger.info("Media GC is already running in another process, skipping")
+                return {"scanned": 0, "orphans": 0, "deleted": 0}
+
+            try:
+                threshold = datetime.now(timezone.utc) - self.grace_period
+
+                # Сначала листинг, затем ссылки из БД: объект, на который сослались
+                # во время листинга, не попадёт в кандидаты на удаление
+                scanned = 0
+                candidates = []
+                async for obj in self.s3_service.iter_objects(self.prefix):
+                    scanned += 1
+                    if obj["LastModified"] < threshold:
+                        candidates.append(obj["Key"])
+
+                referenced = await self._collect_referenced_keys(session)
+                orphans = [key for key in candidates if key not in referenced]
+                # Повторная загрузка того же содержимого обновляет LastModified объекта
+                # (S3Service.reuse_existing_object) до записи ссылки в заявку. Если это
+                # случилось после листинга, HEAD перед удалением исключит такой объект
+                if orphans:
+                    orphans = await self.s3_service.filter_not_modified_since(orphans, threshold)
+
+                deleted = 0
+                if orphans and not dry_run:
+                    deleted = await self.s3_service.delete_files(orphans)
+
+                logger.info(
+                    f"Media GC: scanned={scanned}, referenced={len(referenced)}, "
+                    f"orphans={len(orphans)}, deleted={deleted}, dry_run={dry_run}"
+                )
+                return {"scanned": scanned, "orphans": len(orphans), "deleted": deleted}
+            finally:
+                await session.execute(
+                    text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": MEDIA_GC_LOCK_ID}
+                )
+
+    async def run_periodically(self):
+        """Бесконечный цикл очистки с интервалом MEDIA_GC_INTERVAL_SECONDS."""
+        while True:
+            try:
+                await self.collect()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Media GC failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Очистка неиспользуемых медиафайлов в S3")
+    parser.add_argument("--dry-run", action="store_true", help="Только подсчитать, ничего не удалять")
+    args = parser.parse_args()
+
+    print(asyncio.run(MediaGarbageCollector().collect(dry_run=args.dry_run)))
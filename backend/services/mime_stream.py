@@ -0,0 +1,143 @@
+"""
+Потоковая сборка и отправка MIME-писем.
+
+Письмо multipart/mixed пишется в файл по частям: вложения кодируются в
+base64 блоками, поэтому ни закодированное тело, ни всё письмо целиком не
+держатся в памяти. При отправке файл читается построчно и передаётся в
+SMTP DATA блоками с учётом flow control сокета.
+"""
+
+import asyncio
+import base64
+import mimetypes
+import uuid
+from email.header import Header
+from email.utils import encode_rfc2231, formatdate, make_msgid
+from typing import BinaryIO, Iterable, Tuple
+
+import aiosmtplib
+
+CRLF = b"\r\n"
+# Кратно 57 байтам: каждый блок даёт целые строки base64 по 76 символов
+BASE64_CHUNK_BYTES = 57 * 1024
+SEND_CHUNK_BYTES = 64 * 1024
+DRAIN_POLL_SECONDS = 0.01
+
+
+def _header(name: str, value: str) -> bytes:
+    if not value.isascii():
+        value = Header(value, "utf-8").encode(linesep="\r\n")
+    return f"{name}: {value}".encode("ascii") + CRLF
+
+
+def _filename_param(filename: str) -> str:
+    if filename.isascii():
+        return f'filename="{filename}"'
+    return f"filename*={encode_rfc2231(filename, 'utf-8')}"
+
+
+def write_base64(out: BinaryIO, data: bytes) -> None:
+    """Кодирует data в base64 блоками, строки по 76 символов с CRLF"""
+    view = memoryview(data)
+    for offset in range(0, len(view), BASE64_CHUNK_BYTES):
+        encoded = base64.encodebytes(view[offset:offset + BASE64_CHUNK_BYTES])
+        out.write(encoded.replace(b"\n", CRLF))
+
+
+def write_message(
+        out: BinaryIO,
+        sender: str,
+        to_email: str,
+        subject: str,
+        body_text: str,
+        attachments: Iterable[Tuple[str, bytes]] = ()
+) -> None:
+    """Пишет письмо с текстом и вложениями в out"""
+    boundary = f"=={uuid.uuid4().hex}=="
+    delimiter = f"--{boundary}".encode("ascii") + CRLF
+
+    out.write(_header("From", sender))
+    out.write(_header("To", to_email))
+    out.write(_header("Subject", subject))
+    out.write(_header("Date", formatdate(localtime=True)))
+    out.write(_header("Message-ID", make_msgid()))
+    out.write(_header("MIME-Version", "1.0"))
+    out.write(_header("Content-Type", f'multipart/mixed; boundary="{boundary}"'))
+    out.write(CRLF)
+
+    out.write(delimiter)
+    out.write(_header("Content-Type", 'text/plain; charset="utf-8"'))
+    out.write(_header("Content-Transfer-Encoding", "base64"))
+    out.write(CRLF)
+    write_base64(out, body_text.encode("utf-8"))
+
+    for filename, data in attachments:
+        content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        out.write(delimiter)
+        out.write(_header("Content-Type", content_type))
+        out.write(_header("Content-Transfer-Encoding", "base64"))
+        out.write(_header("Content-Disposition", f"attachment; {_filename_param(filename)}"))
+        out.write(CRLF)
+        write_base64(out, data)
+
+    out.write(f"--{boundary}--".encode("ascii") + CRLF)
+
+
+async def _wait_writable(client: aiosmtplib.SMTP) -> None:
+    """
+    Ждёт, пока в буфере транспорта останется не больше одного блока.
+    Использует только публичный API транспорта (get_write_buffer_size):
+    StreamWriter-обёртка закрыла бы соединение пула при сборке мусора.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + client.timeout if client.timeout else None
+    while True:
+        transport = client.protocol.transport if client.protocol else None
+        if transport is None or transport.is_closing():
+            raise aiosmtplib.SMTPServerDisconnected("Connection lost while sending message data")
+        if transport.get_write_buffer_size() <= SEND_CHUNK_BYTES:
+            return
+        if deadline is not None and loop.time() >= deadline:
+            raise aiosmtplib.SMTPTimeoutError("Timed out while sending message data")
+        await asyncio.sleep(DRAIN_POLL_SECONDS)
+
+
+async def send_file(
+        client: aiosmtplib.SMTP,
+        sender: str,
+        recipients: Iterable[str],
+        message_file: BinaryIO
+) -> None:
+    """
+    Отправляет письмо из файла по открытому соединению.
+    Файл должен быть записан write_message (строки с CRLF).
+    """
+    await client.mail(sender)
+    for recipient in recipients:
+        await client.rcpt(recipient)
+
+    response = await client.execute_command(b"DATA")
+    if response.code != aiosmtplib.SMTPStatus.start_input:
+        raise aiosmtplib.SMTPDataError(response.code, response.message)
+
+    protocol = client.protocol
+    try:
+        buffer = bytearray()
+        for line in message_file:
+            # Точка в начале строки экранируется (RFC 5321, 4.5.2)
+            if line.startswith(b"."):
+                buffer += b"."
+            buffer += line
+            if len(buffer) >= SEND_CHUNK_BYTES:
+                protocol.write(bytes(buffer))
+                buffer.clear()
+                await _wait_writable(client)
+        buffer += b"." + CRLF
+        protocol.write(bytes(buffer))
+        response = await protocol.read_response(timeout=client.timeout)
+    except (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPTimeoutError, ConnectionError):
+        client.close()
+        raise
+
+    if response.code != aiosmtplib.SMTPStatus.completed:
+        raise aiosmtplib.SMTPDataError(response.code, response.message)
@@ -0,0 +1,214 @@
+"""
+Конвертация DOCX → PDF через пул постоянно запущенных LibreOffice (unoserver).
+
+Каждый экземпляр unoserver держит свой LibreOffice с отдельным профилем,
+поэтому конвертации идут параллельно и без холодного старта. Документ
+передаётся байтами по XML-RPC, временные файлы не создаются. Зависший
+экземпляр перезапускается по таймауту задания.
+"""
+
+import os
+import queue
+import shlex
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Optional
+
+from loguru import logger
+
+from backend.core.config import configs
+
+
+class PdfConversionError(Exception):
+    """Не удалось сконвертировать документ в PDF"""
+
+
+class UnoserverInstance:
+    """Один процесс unoserver со своим LibreOffice"""
+
+    def __init__(self, port: int, uno_port: int, command: str, conversion_timeout: float):
+        self.port = port
+        self.uno_port = uno_port
+        # Команда запуска: unoserver должен работать в Python с модулем uno из LibreOffice
+        self.command = shlex.split(command)
+        self.conversion_timeout = conversion_timeout
+        self.profile_dir = os.path.join(tempfile.gettempdir(), f"unoserver-profile-{port}")
+        self.process: Optional[subprocess.Popen] = None
+
+    def start(self, start_timeout: float) -> None:
+        self.process = subprocess.Popen(
+            [
+                *self.command,
+                "--interface", "127.0.0.1",
+                "--port", str(self.port),
+                "--uno-port", str(self.uno_port),
+                "--user-installation", f"file://{self.profile_dir}",
+                "--conversion-timeout", str(int(self.conversion_timeout)),
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + start_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise PdfConversionError(f"unoserver on port {self.port} exited with {self.process.returncode}")
+            try:
+                with socket.create_connection(("127.0.0.1", self.port), timeout=0.5):
+                    logger.info(f"unoserver started on port {self.port}")
+                    return
+            except OSError:
+                time.sleep(0.2)
+        self.stop()
+        raise PdfConversionError(f"unoserver on port {self.port} did not start in {start_timeout}s")
+
+    def stop(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+    def restart(self, start_timeout: float) -> None:
+        logger.warning(f"Restarting unoserver on port {self.port}")
+        self.stop()
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+        self.start(start_timeout)
+
+    def convert(self, docx_bytes: bytes) -> bytes:
+        from unoserver.client import UnoClient
+
+        client = UnoClient(server="127.0.0.1", port=str(self.port), host_location="local")
+        return client.convert(indata=docx_bytes, convert_to="pdf")
+
+
+class UnoserverPool:
+    """Пул экземпляров unoserver с выдачей по одному на конвертацию."""
+
+    _shared: Optional["UnoserverPool"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+            self,
+            size: int,
+            base_port: int,
+            command: str = "unoserver",
+            timeout: float = 20.0,
+            start_timeout: float = 30.0,
+            retry_after: float = 300.0
+    ):
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.retry_after = retry_after
+        self.instances: List[UnoserverInstance] = [
+            UnoserverInstance(base_port + i * 2, base_port + i * 2 + 1, command, timeout)
+            for i in range(size)
+        ]
+        self._idle: "queue.Queue[UnoserverInstance]" = queue.Queue()
+        # Вызовы XML-RPC не поддерживают таймаут, поэтому идут через свой пул потоков
+        self._calls = ThreadPoolExecutor(max_workers=size, thread_name_prefix="unoserver")
+        self._started = False
+        self._start_lock = threading.Lock()
+        # Время и причина последнего неудачного запуска
+        self._failed_at: Optional[float] = None
+        self._failure: Optional[str] = None
+
+    @classmethod
+    def get_shared(cls) -> "UnoserverPool":
+        """Общий для процесса пул с параметрами из конфига"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(
+                    size=configs.PDF_UNOSERVER_INSTANCES,
+                    base_port=configs.PDF_UNOSERVER_BASE_PORT,
+                    command=configs.PDF_UNOSERVER_COMMAND,
+                    timeout=configs.PDF_CONVERT_TIMEOUT_SECONDS,
+                    start_timeout=configs.PDF_UNOSERVER_START_TIMEOUT_SECONDS,
+                    retry_after=configs.PDF_UNOSERVER_RETRY_SECONDS
+                )
+            return cls._shared
+
+    def _stop_all(self) -> None:
+        for instance in self.instances:
+            instance.stop()
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+
+    def start(self) -> None:
+        """
+        Запускает все экземпляры (повторный вызов ничего не делает).
+        Если запуск не удался, уже запущенные экземпляры останавливаются, а следующие
+        retry_after секунд вызов сразу завершается ошибкой, не ожидая нового запуска.
+        """
+        with self._start_lock:
+            if self._started:
+                return
+            if self._failed_at is not None and time.monotonic() - self._failed_at < self.retry_after:
+                raise PdfConversionError(f"unoserver pool is unavailable: {self._failure}")
+            try:
+                for instance in self.instances:
+                    instance.start(self.start_timeout)
+                    self._idle.put(instance)
+            except Exception as e:
+                self._stop_all()
+                self._failed_at = time.monotonic()
+                self._failure = str(e)
+                logger.error(f"unoserver pool failed to start, next attempt in {self.retry_after:g}s: {e}")
+                if isinstance(e, PdfConversionError):
+                    raise
+                raise PdfConversionError(f"unoserver pool failed to start: {e}") from e
+            self._failed_at = None
+            self._failure = None
+            self._started = True
+
+    def convert(self, docx_bytes: bytes) -> bytes:
+        """DOCX → PDF на свободном экземпляре с ограничением времени"""
+        self.start()
+        try:
+            instance = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PdfConversionError(f"No free unoserver instance in {self.timeout}s")
+
+        try:
+            future = self._calls.submit(instance.convert, docx_bytes)
+            try:
+                pdf_bytes = future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                instance.restart(self.start_timeout)
+                raise PdfConversionError(f"Conversion timed out after {self.timeout}s")
+            except Exception as e:
+                if instance.process is None or instance.process.poll() is not None:
+                    instance.restart(self.start_timeout)
+                raise PdfConversionError(f"Conversion failed: {e}") from e
+        finally:
+            self._idle.put(instance)
+
+        if not pdf_bytes or not pdf_bytes.startswith(b"%PDF"):
+            raise PdfConversionError("unoserver returned no PDF data")
+        return pdf_bytes
+
+    def close(self) -> None:
+        """Останавливает все экземпляры (вызывается при завершении)"""
+        with self._start_lock:
+            self._stop_all()
+            self._calls.shutdown(wait=False, cancel_futures=True)
+            self._started = False
+
+
+def html_to_pdf(html: str) -> bytes:
+    """Резервный рендер HTML → PDF через wkhtmltopdf"""
+    import pdfkit
+
+    pdf_bytes = pdfkit.from_string(html, False, options={"encoding": "UTF-8", "quiet": ""})
+    if not pdf_bytes:
+        raise PdfConversionError("wkhtmltopdf returned no PDF data")
+    return pdf_bytes
@@ -0,0 +1,129 @@
+"""
+Прямая генерация PDF заявления без DOCX и внешних программ (fpdf2).
+
+Разметка берётся из complaint_layout, поэтому текст и оформление совпадают
+с шаблоном. Шрифты загружаются один раз на процесс: каждый документ
+создаётся копией заготовки с уже разобранными шрифтами. Фотографии
+уменьшаются перед вставкой, чтобы PDF оставался небольшим.
+"""
+
+import copy
+import io
+import threading
+from typing import Any, Dict, Optional, Sequence
+
+from fpdf import FPDF
+
+from backend.core.config import configs
+from backend.services.complaint_layout import (
+    ADDRESSEE_INDENT_MM,
+    ATTACHMENT_INDENT_MM,
+    FIRST_LINE_INDENT_MM,
+    FONT_SIZE_PT,
+    LINE_HEIGHT,
+    PAGE_MARGIN_LEFT_MM,
+    PAGE_MARGIN_RIGHT_MM,
+    PAGE_MARGIN_TOP_MM,
+    complaint_blocks,
+)
+from backend.services.image_utils import downscale_photo
+
+FONT_FAMILY = "complaint"
+PHOTO_GAP_MM = 5
+
+_ALIGN_BY_STYLE = {
+    "addressee": "LEFT",
+    "title": "CENTER",
+    "body": "JUSTIFY",
+    "list": "JUSTIFY",
+    "attachment": "JUSTIFY",
+    "signature": "LEFT",
+    "spacer": "LEFT",
+}
+
+
+class ComplaintPdfRenderer:
+    """Рендер заявления в PDF с кэшированными шрифтами."""
+
+    _shared: Optional["ComplaintPdfRenderer"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+            self,
+            font_regular: str,
+            font_bold: str,
+            photo_max_px: int = 1280,
+            photo_quality: int = 75
+    ):
+        self.photo_max_px = photo_max_px
+        self.photo_quality = photo_quality
+        # Заготовка документа: разбор TTF-файлов выполняется только здесь
+        self._blank = FPDF(format="A4", unit="mm")
+        self._blank.set_margins(PAGE_MARGIN_LEFT_MM, PAGE_MARGIN_TOP_MM, PAGE_MARGIN_RIGHT_MM)
+        self._blank.set_auto_page_break(True, margin=PAGE_MARGIN_TOP_MM)
+        self._blank.add_font(FONT_FAMILY, "", font_regular)
+        self._blank.add_font(FONT_FAMILY, "B", font_bold)
+
+    @classmethod
+    def get_shared(cls) -> "ComplaintPdfRenderer":
+        """Общий для процесса рендер с параметрами из конфига"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(
+                    font_regular=configs.PDF_FONT_REGULAR,
+                    font_bold=configs.PDF_FONT_BOLD,
+                    photo_max_px=configs.PDF_PHOTO_MAX_PX,
+                    photo_quality=configs.PDF_PHOTO_QUALITY
+                )
+            return cls._shared
+
+    def render(self, context: Dict[str, Any], photos: Sequence[bytes] = ()) -> bytes:
+        """PDF заявления; фотографии добавляются после подписи"""
+        pdf = copy.deepcopy(self._blank)
+        pdf.add_page()
+        pdf.set_font(FONT_FAMILY, size=FONT_SIZE_PT)
+
+        with pdf.text_columns(line_height=LINE_HEIGHT) as columns:
+            for block in complaint_blocks(context):
+                if block.style == "title":
+                    pdf.set_font(FONT_FAMILY, "B", FONT_SIZE_PT)
+                with columns.paragraph(
+                        text_align=_ALIGN_BY_STYLE[block.style],
+                        indent=ADDRESSEE_INDENT_MM if block.style == "addressee" else 0,
+                        first_line_indent=self._first_line_indent(block.style)
+                ) as paragraph:
+                    if block.style == "list":
+                        paragraph.write(f"{block.number}) {block.text}")
+                    else:
+                        # Пустой абзац-отступ должен занимать строку
+                        paragraph.write(block.text or " ")
+                if block.style == "title":
+                    pdf.set_font(FONT_FAMILY, "", FONT_SIZE_PT)
+
+        self._add_photos(pdf, photos)
+        return bytes(pdf.output())
+
+    @staticmethod
+    def _first_line_indent(style: str) -> float:
+        if style in ("body", "list"):
+            return FIRST_LINE_INDENT_MM
+        if style == "attachment":
+            return ATTACHMENT_INDENT_MM
+        return 0
+
+    def _add_photos(self, pdf: FPDF, photos: Sequence[bytes]) -> None:
+        for content in photos:
+            photo = downscale_photo(content, self.photo_max_px, self.photo_quality)
+            if photo is None:
+                continue
+            jpeg, width_px, height_px = photo
+            width = pdf.epw
+            height = width * height_px / width_px
+            max_height = pdf.eph
+            if height > max_height:
+                width, height = width * max_height / height, max_height
+            if pdf.get_y() + PHOTO_GAP_MM + height > pdf.page_break_trigger:
+                pdf.add_page()
+            else:
+                pdf.ln(PHOTO_GAP_MM)
+            pdf.image(io.BytesIO(jpeg), x=pdf.l_margin + (pdf.epw - width) / 2, w=width, h=height)
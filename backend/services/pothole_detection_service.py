@@ -7,14 +7,17 @@ from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple, Dict
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
+from io import BytesIO
 import tempfile
 import os
 
+from backend.core.config import configs
 from backend.schemas.cv_schema import (
     InputValues, DetectionResponse, MultipleDetectionResponse,
-    VideoDetectionResponse, SeverityStats, SingleImageResult
+    VideoDetectionResponse, SeverityStats, SingleImageResult, ImageRenditions
 )
 from backend.services.external_services.geo_service import GeocodingService
+from backend.services.image_renditions import RENDITIONS, RenditionSpec, build_rendition_key
 from backend.services.external_services.s3_service import S3Service
 
 
@@ -31,6 +34,7 @@ class PotholeDetectionService:
         self.conf_threshold = 0.15
         self.iou_threshold = 0.5
         self.imgsz = 1280  # 640
+        self.output_max_side = configs.IMAGE_OUTPUT_MAX_SIDE
 
     def _load_model(self):
         """Загрузка YOLO11 модели"""
@@ -96,15 +100,98 @@ class PotholeDetectionService:
 
         return severity, color_bgr, label_text, risk_score
 
-    def _process_image_sync(self, image_bytes: bytes) -> Tuple[bytes, Dict, List]:
+    @staticmethod
+    def _read_image_header(image_bytes: bytes) -> Tuple[int, int, int]:
+        """Размеры и EXIF-ориентация без декодирования пикселей"""
+        try:
+            with Image.open(BytesIO(image_bytes)) as img:
+                width, height = img.size
+                orientation = img.getexif().get(0x0112, 1)
+            return width, height, orientation
+        except Exception:
+            return 0, 0, 1
+
+    @staticmethod
+    def _apply_exif_orientation(image: np.ndarray, orientation: int) -> np.ndarray:
+        """Поворот/отражение изображения по тегу EXIF Orientation"""
+        if orientation == 2:
+            return cv2.flip(image, 1)
+        if orientation == 3:
+            return cv2.rotate(image, cv2.ROTATE_180)
+        if orientation == 4:
+            return cv2.flip(image, 0)
+        if orientation == 5:
+            return cv2.transpose(image)
+        if orientation == 6:
+            return cv2.rotate(image, cv2.ROTATE_90_CLOCKWISE)
+        if orientation == 7:
+            return cv2.flip(cv2.transpose(image), -1)
+        if orientation == 8:
+            return cv2.rotate(image, cv2.ROTATE_90_COUNTERCLOCKWISE)
+        return image
+
+    @staticmethod
+    def _limit_size(image: np.ndarray, max_side: int) -> np.ndarray:
+        """Уменьшает изображение так, чтобы длинная сторона не превышала max_side"""
+        h, w = image.shape[:2]
+        scale = max_side / max(h, w)
+        if scale >= 1:
+            return image
+        return cv2.resize(image, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+
+    def _load_image(self, image_bytes: bytes) -> np.ndarray:
+        """
+        Этап приёма изображения: JPEG декодируется сразу в уменьшенном размере,
+        если исходник намного больше нужного, затем применяется EXIF-ориентация
+        и ограничивается итоговое разрешение
+        """
+        width, height, orientation = self._read_image_header(image_bytes)
+        target_side = max(self.imgsz, self.output_max_side)
+
+        flags = cv2.IMREAD_COLOR
+        for factor, reduced_flag in ((4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2)):
+            if max(width, height) // factor >= target_side:
+                flags = reduced_flag
+                break
+
+        image = cv2.imdecode(
+            np.frombuffer(image_bytes, np.uint8),
+            flags | cv2.IMREAD_IGNORE_ORIENTATION
+        )
+        if image is None:
+            raise HTTPException(status_code=400, detail="Ошибка при загрузке изображения")
+
+        image = self._apply_exif_orientation(image, orientation)
+        return self._limit_size(image, self.output_max_side)
+
+    def _process_image_sync(self, image_bytes: bytes) -> Tuple[np.ndarray, Dict, List]:
         """Синхронная обработка изображения с YOLO11"""
         if self.model is None:
             raise HTTPException(status_code=500, detail="YOLO11 модель не загружена")
 
-        # Декодирование изображения
-        image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
-        if image is None:
-            raise HTTPException(status_code=400, detail="Ошибка при загрузке изображения")
+        image = self._load_image(image_bytes)
+        return self._detect_and_annotate(image)
+
+    def _encode_rendition(self, image: np.ndarray, spec: RenditionSpec) -> bytes:
+        """Кодирование одного варианта изображения (progressive JPEG или WebP)"""
+        resized = self._limit_size(image, spec.max_side)
+        if spec.ext == "webp":
+            params = [cv2.IMWRITE_WEBP_QUALITY, spec.quality]
+        else:
+            params = [
+                cv2.IMWRITE_JPEG_QUALITY, spec.quality,
+                cv2.IMWRITE_JPEG_PROGRESSIVE, 1,
+                cv2.IMWRITE_JPEG_OPTIMIZE, 1
+            ]
+        ok, buffer = cv2.imencode(f".{spec.ext}", resized, params)
+        if not ok:
+            raise ValueError(f"Не удалось закодировать вариант {spec.name}")
+        return buffer.tobytes()
+
+    def _detect_and_annotate(self, image: np.ndarray) -> Tuple[np.ndarray, Dict, List]:
+        """Детекция ям и отрисовка разметки на изображении"""
+        if self.model is None:
+            raise HTTPException(status_code=500, detail="YOLO11 модель не загружена")
 
         orig_h, orig_w = image.shape[:2]
         image_area = orig_h * orig_w
@@ -173,9 +260,45 @@ class PotholeDetectionService:
                 draw.text((x1, y1 - 25), label, fill=(0, 0, 0), font=font)
 
         output_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
-        _, buffer = cv2.imencode('.jpg', output_image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        return output_image, severity_stats, all_risks
+
+    async def _upload_renditions(self, image: np.ndarray) -> ImageRenditions:
+        """
+        Параллельное кодирование всех вариантов в пуле потоков и их загрузка в S3.
+        Ключи производных вариантов выводятся из контентного ключа полного изображения.
+        """
+        loop = asyncio.get_event_loop()
+        encoded = await asyncio.gather(*(
+            loop.run_in_executor(self.executor, self._encode_rendition, image, spec)
+            for spec in RENDITIONS
+        ))
+
+        full_key = self.s3_service.build_content_key(encoded[0], "processed/images", RENDITIONS[0].ext)
+        urls = await asyncio.gather(*(
+            self.s3_service.upload_file(
+                file_bytes=data,
+                content_type=spec.content_type,
+                s3_key=build_rendition_key(full_key, spec)
+            )
+            for spec, data in zip(RENDITIONS, encoded)
+        ))
+        return ImageRenditions(**{spec.name: url for spec, url in zip(RENDITIONS, urls)})
+
+    def _start_geocoding(self, input_data) -> asyncio.Task:
+        """
+        Запускает геокодирование фоновой задачей при получении запроса:
+        оно зависит только от координат и выполняется параллельно с инференсом
+        """
+        return asyncio.create_task(self.geocoding_service.geocode_coordinates(
+            latitude=input_data.latitude,
+            longitude=input_data.longitude
+        ))
 
-        return buffer.tobytes(), severity_stats, all_risks
+    @staticmethod
+    def _cancel_if_pending(task: asyncio.Task):
+        """Отмена незавершённой фоновой задачи при ошибке обработки"""
+        if not task.done():
+            task.cancel()
 
     async def process_single_image(
             self,
@@ -185,20 +308,13 @@ class PotholeDetectionService:
             db: AsyncSession
     ) -> DetectionResponse:
         """Обработка одного изображения"""
+        geocode_task = self._start_geocoding(input_data)
         try:
-            result_bytes, stats, risks = await asyncio.get_event_loop().run_in_executor(
+            output_image, stats, risks = await asyncio.get_event_loop().run_in_executor(
                 self.executor, self._process_image_sync, image_bytes
             )
-            image_url = await self.s3_service.upload_file(
-                file_bytes=result_bytes,
-                folder="processed/images",
-                filename=filename,
-                content_type="image/jpeg"
-            )
-            address = await self.geocoding_service.geocode_coordinates(
-                latitude=input_data.latitude,
-                longitude=input_data.longitude
-            )
+            renditions = await self._upload_renditions(output_image)
+            address = await geocode_task
 
             return DetectionResponse(
                 user_id = input_data.user_id,
@@ -207,13 +323,17 @@ class PotholeDetectionService:
                 average_risk=float(np.mean(risks)) if risks else 0.0,
                 max_risk=float(np.max(risks)) if risks else 0.0,
                 total_potholes=sum(stats.values()),
-                image_url=image_url,
+                image_url=renditions.full,
+                thumbnail_url=renditions.thumbnail,
+                renditions=renditions,
                 address=address,
                 latitude=input_data.latitude,
                 longitude=input_data.longitude
             )
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Ошибка обработки: {str(e)}")
+        finally:
+            self._cancel_if_pending(geocode_task)
 
     async def process_multiple_images_bytes(
             self,
@@ -222,6 +342,7 @@ class PotholeDetectionService:
             db: AsyncSession
     ) -> MultipleDetectionResponse:
         """Обработка нескольких изображений из base64 с загрузкой в S3"""
+        geocode_task = self._start_geocoding(input_data)
         results = []
         successful = 0
         failed = 0
@@ -233,7 +354,11 @@ class PotholeDetectionService:
             )
             tasks.append(task)
 
-        task_results = await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            task_results = await asyncio.gather(*tasks, return_exceptions=True)
+        except BaseException:
+            self._cancel_if_pending(geocode_task)
+            raise
 
         for result in task_results:
             if isinstance(result, Exception):
@@ -254,10 +379,7 @@ class PotholeDetectionService:
                 else:
                     failed += 1
 
-        address = await self.geocoding_service.geocode_coordinates(
-            latitude=input_data.latitude,
-            longitude=input_data.longitude
-        )
+        address = await geocode_task
 
         return MultipleDetectionResponse(
             user_id = input_data.user_id,
@@ -279,16 +401,11 @@ class PotholeDetectionService:
     ) -> SingleImageResult:
         """Задача для обработки одного изображения"""
         try:
-            result_bytes, stats, risks = await asyncio.get_event_loop().run_in_executor(
+            output_image, stats, risks = await asyncio.get_event_loop().run_in_executor(
                 self.executor, self._process_image_sync, image_bytes
             )
 
-            image_url = await self.s3_service.upload_file(
-                file_bytes=result_bytes,
-                folder="processed/images",
-                filename=filename,
-                content_type="image/jpeg"
-            )
+            renditions = await self._upload_renditions(output_image)
 
             return SingleImageResult(
                 filename=filename,
@@ -297,7 +414,9 @@ class PotholeDetectionService:
                 average_risk=float(np.mean(risks)) if risks else 0.0,
                 max_risk=float(np.max(risks)) if risks else 0.0,
                 total_potholes=sum(stats.values()),
-                image_url=image_url
+                image_url=renditions.full,
+                thumbnail_url=renditions.thumbnail,
+                renditions=renditions
             )
         except Exception as e:
             return SingleImageResult(
@@ -321,6 +440,7 @@ class PotholeDetectionService:
         if self.model is None:
             raise HTTPException(status_code=500, detail="YOLO11 модель не загружена")
 
+        geocode_task = self._start_geocoding(input_data)
         temp_input = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4', mode='wb')
         temp_input.write(video_bytes)
         temp_input.close()
@@ -350,17 +470,9 @@ class PotholeDetectionService:
                 if not ret:
                     break
 
-                _, buffer = cv2.imencode('.jpg', frame)
-                frame_bytes = buffer.tobytes()
-
                 try:
-                    result_bytes, stats, risks = await asyncio.get_event_loop().run_in_executor(
-                        self.executor, self._process_image_sync, frame_bytes
-                    )
-
-                    processed_frame = cv2.imdecode(
-                        np.frombuffer(result_bytes, np.uint8),
-                        cv2.IMREAD_COLOR
+                    processed_frame, stats, risks = await asyncio.get_event_loop().run_in_executor(
+                        self.executor, self._detect_and_annotate, frame
                     )
 
                     out.write(processed_frame)
@@ -388,10 +500,7 @@ class PotholeDetectionService:
                 content_type="video/mp4"
             )
 
-            address = await self.geocoding_service.geocode_coordinates(
-                latitude=input_data.latitude,
-                longitude=input_data.longitude
-            )
+            address = await geocode_task
 
             return VideoDetectionResponse(
                 filename=filename,
@@ -408,6 +517,7 @@ class PotholeDetectionService:
             )
 
         finally:
+            self._cancel_if_pending(geocode_task)
             try:
                 os.unlink(temp_input.name)
                 os.unlink(temp_output.name)
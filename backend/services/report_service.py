@@ -1,34 +1,42 @@
-from pathlib import Path
-from urllib.parse import urlparse
-import aiohttp
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import HTTPException, BackgroundTasks
-from typing import Optional, List
+from fastapi import HTTPException
+from collections import OrderedDict
+from typing import Optional, List, Tuple
 from datetime import datetime
+import asyncio
+import time
 import uuid
 import logging
 
 from backend.core.config import configs
 from backend.core.database import async_session_maker  # Импортируем session_maker
+from backend.core.executors import STAGE_DOCUMENT, run_in_stage
+from backend.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
 from backend.models.report_model import ReportStatus, ReportPriority, Report
+from backend.models.complaint_job_model import ComplaintJob
+from backend.schemas.cv_schema import ImageRenditions
 from backend.schemas.report_schema import (
     ReportCreateDraft, ReportUpdate,
     ReportDraftCreatedResponse, ReportResponse, ReportSubmitResponse,
-    ReportListResponse, ReportListItem
+    ReportListResponse, ReportListItem, ReportCountModeEnum
 )
 
 from backend.repositories.ReportRepository import ReportRepository
-from backend.services.ai_agent_service import find_road_agency_contacts
+from backend.services.attachment_service import AttachmentService
+from backend.services.contacts_directory_service import ContactsDirectoryService
+from backend.services.image_renditions import rendition_urls
 from backend.services.users_service import UserService
 from backend.services.external_services.email_service import EmailService
 from backend.services.external_services.gigachat_service import GigaChatService
 from backend.services.document_service import DocumentService
-from backend.schemas.users_schema import UserUpdate
 
 logger = logging.getLogger(__name__)
 
 
 class ReportService:
+    # Кэш точного количества заявок по фильтрам: ключ -> (значение, истекает в)
+    _count_cache: "OrderedDict[tuple, Tuple[int, float]]" = OrderedDict()
+
     def __init__(self, db: AsyncSession):
         self.db = db
         self.repository = ReportRepository(db)
@@ -36,6 +44,8 @@ class ReportService:
         self._email_service = None
         self._document_service = None
         self._gigachat_service = None
+        self._attachment_service = None
+        self._contacts_directory = None
 
     @property
     def email_service(self) -> EmailService:
@@ -51,6 +61,13 @@ class ReportService:
             self._document_service = DocumentService()
         return self._document_service
 
+    @property
+    def contacts_directory(self) -> ContactsDirectoryService:
+        """Lazy init для ContactsDirectoryService"""
+        if self._contacts_directory is None:
+            self._contacts_directory = ContactsDirectoryService()
+        return self._contacts_directory
+
     @property
     def gigachat_service(self) -> GigaChatService:
         """Lazy init для GigaChatService"""
@@ -58,6 +75,13 @@ class ReportService:
             self._gigachat_service = GigaChatService()
         return self._gigachat_service
 
+    @property
+    def attachment_service(self) -> AttachmentService:
+        """Lazy init для AttachmentService"""
+        if self._attachment_service is None:
+            self._attachment_service = AttachmentService()
+        return self._attachment_service
+
     async def create_draft(self, data: ReportCreateDraft) -> ReportDraftCreatedResponse:
         """Создать черновик заявки"""
         report = Report()
@@ -131,6 +155,16 @@ class ReportService:
             description=report.description,
             comment=report.comment,
             created_at=report.created_at,
+            submitted_at=report.submitted_at,
+            ai_agent_task_id=report.ai_agent_task_id,
+            ai_agent_status=report.ai_agent_status,
+            organization_name=report.organization_name,
+            complaint_text=report.complaint_text,
+            stage_timings=report.stage_timings,
+            email_status=report.email_status,
+            email_sent_at=report.email_sent_at,
+            email_error=report.email_error,
+            renditions=self._build_renditions(report),
         )
 
     async def update_draft(
@@ -163,7 +197,7 @@ class ReportService:
         logger.info(f"Report {report_uuid} updated successfully")
         return await self.get_by_uuid(report_uuid)
 
-    async def submit_report(self, report_uuid: uuid.UUID, background_tasks: BackgroundTasks) -> ReportSubmitResponse:
+    async def submit_report(self, report_uuid: uuid.UUID) -> ReportSubmitResponse:
         """Отправка заявки с генерацией текста и отправкой email."""
         report = await self.repository.get_by_uuid(report_uuid)
         if not report:
@@ -206,18 +240,19 @@ class ReportService:
             except Exception as e:
                 logger.error(f"Error updating user {report.user_id} points: {e}", exc_info=True)
 
-        task_id = str(uuid.uuid4())
+        # Задание в очереди фиксируется в одной транзакции с отправкой заявки
+        job = ComplaintJob(
+            uuid=uuid.uuid4(),
+            report_uuid=report.uuid,
+            max_attempts=configs.COMPLAINT_JOB_MAX_ATTEMPTS
+        )
+        self.db.add(job)
+        task_id = str(job.uuid)
         report.ai_agent_task_id = task_id
-        report.ai_agent_status = "processing"
+        report.ai_agent_status = "queued"
         report = await self.repository.update(report)
         logger.info(f"Report {report_uuid} submitted, task_id={task_id}")
 
-        background_tasks.add_task(
-            self._process_and_send_complaint_wrapper,
-            report_uuid=report.uuid,
-            task_id=task_id
-        )
-
         return ReportSubmitResponse(
             uuid=report.uuid,
             status=report.status.value,
@@ -227,41 +262,56 @@ class ReportService:
             estimated_processing_time=60
         )
 
-    async def _process_and_send_complaint_wrapper(self, report_uuid: uuid.UUID, task_id: str):
+    async def process_complaint(self, session: AsyncSession, report_uuid: uuid.UUID, task_id: str):
         """
-        Wrapper для фоновой задачи - создаёт новую сессию БД.
-        Это необходимо, так как фоновые задачи выполняются вне контекста запроса.
+        Обработка заявления воркером очереди: поиск контактов, генерация, постановка письма с фото в очередь.
+        Этапы выполняются как граф зависимостей:
+            contacts ─┬─> text ─────┐
+            user ─────┴─> document ─┼─> email
+            photos ─────────────────┘
+        Временные ошибки пробрасываются, чтобы воркер повторил задание.
         """
-        async with async_session_maker() as session:
-            try:
-                await self._process_and_send_complaint(session, report_uuid, task_id)
-                await session.commit()
-            except Exception as e:
-                await session.rollback()
-                logger.error(f"[Task {task_id}] Error in wrapper: {e}", exc_info=True)
-            finally:
-                await session.close()
+        logger.info(f"[Task {task_id}] Starting background processing for report {report_uuid}")
 
-    async def _process_and_send_complaint(self, session: AsyncSession, report_uuid: uuid.UUID, task_id: str):
-        """Фоновая обработка: поиск контактов, генерация, отправка с фото."""
-        try:
-            logger.info(f"[Task {task_id}] Starting background processing for report {report_uuid}")
+        repository = ReportRepository(session)
+        report = await repository.get_by_uuid(report_uuid)
 
-            # Создаём новый repository с новой сессией
-            repository = ReportRepository(session)
-            report = await repository.get_by_uuid(report_uuid)
+        if not report:
+            logger.error(f"[Task {task_id}] Report {report_uuid} not found")
+            return
 
-            if not report:
-                logger.error(f"[Task {task_id}] Report {report_uuid} not found")
-                return
+        if report.email_status is not None:
+            # Письмо уже в очереди: повтор задания не должен отправить его второй раз
+            logger.info(f"[Task {task_id}] Email for report {report_uuid} already {report.email_status}")
+            return
 
-            # Step 1: Find contacts
-            logger.info(f"[Task {task_id}] Finding contacts for address: {report.address}")
-            contacts_result = find_road_agency_contacts(report.address)
+        timings = {}
+        started = time.perf_counter()
+
+        async def timed(stage: str, coro):
+            stage_started = time.perf_counter()
+            try:
+                return await coro
+            finally:
+                timings[stage] = round(time.perf_counter() - stage_started, 3)
+
+        # Независимые этапы стартуют сразу
+        logger.info(f"[Task {task_id}] Finding contacts for address: {report.address}")
+        contacts_task = asyncio.create_task(timed("contacts", self.contacts_directory.find_contacts(
+            report.address,
+            {"lat": report.latitude, "lon": report.longitude}
+        )))
+        user_task = asyncio.create_task(timed("user", self._get_person_name(report.user_id, task_id)))
+        photos_task = asyncio.create_task(timed("photos", self._download_photos(report)))
+        tasks = [contacts_task, user_task, photos_task]
+
+        try:
+            contacts_result = await contacts_task
 
             if not contacts_result.get('success') or not contacts_result.get('email'):
                 report.ai_agent_status = "failed"
                 report.comment = "Не удалось найти email для обращения"
+                report.stage_timings = timings
                 await repository.update(report)
                 logger.error(f"[Task {task_id}] Failed to find contacts")
                 return
@@ -274,91 +324,116 @@ class ReportService:
             await repository.update(report)
             logger.info(f"[Task {task_id}] Found email: {email_to}, organization: {organization_name}")
 
-            # Step 2: Get user name
-            person_name = "Заявитель"
-            if report.user_id:
-                try:
-                    user_service = UserService(session)
-                    user = await user_service.get_user_by_max_user_id(report.user_id)
-                    if user and user.first_name and user.last_name:
-                        person_name = f"{user.first_name} {user.last_name}"
-                    logger.debug(f"[Task {task_id}] User name: {person_name}")
-                except Exception as e:
-                    logger.error(f"[Task {task_id}] Error getting user data: {e}", exc_info=True)
-
-            # Step 3: Generate complaint text
-            logger.info(f"[Task {task_id}] Generating complaint text")
-            complaint_text = self.gigachat_service.generate_complaint_text(
+            person_name = await user_task
+
+            # Текст и документ зависят только от контактов и имени заявителя
+            logger.info(f"[Task {task_id}] Generating complaint text and document")
+            text_task = asyncio.create_task(timed("text", self.gigachat_service.generate_complaint_text(
                 city=contacts_result.get('city', 'Неизвестно'),
                 address=report.address,
                 description=report.description or "Обнаружены дефекты дорожного покрытия",
                 total_potholes=report.total_potholes,
                 max_risk=report.max_risk,
                 priority=report.priority.value,
-                person_name=person_name
-            )
-
-            # Step 4: Create document
-            logger.info(f"[Task {task_id}] Creating complaint document")
-            street = self._extract_street(report.address)
-            file_bytes, file_ext = self.document_service.create_complaint_document(
+                person_name=person_name,
+                on_progress=lambda text: self._save_complaint_text(report_uuid, text)
+            )))
+            document_task = asyncio.create_task(timed("document", self._create_document(
+                photos_task,
                 city=contacts_result.get("city", ""),
-                street=street,
+                street=self._extract_street(report.address),
                 organization_name=organization_name,
                 person_name=person_name,
                 count_photos=self._count_photos(report),
                 year=datetime.now().year,
                 convert_to_pdf=True
-            )
+            )))
+            tasks.extend([text_task, document_task])
 
-            if len(file_bytes) == 0:
-                raise ValueError("Generated document is empty")
-            logger.info(f"[Task {task_id}] Document created: {len(file_bytes)} bytes")
-
-            # Step 5: Download photos
-            logger.info(f"[Task {task_id}] Downloading photos")
-            photo_attachments = await self._download_photos(report)
-            attachments = [(f"zayavlenie.{file_ext}", file_bytes)]
-            attachments.extend(photo_attachments)
-            logger.info(f"[Task {task_id}] Total attachments: {len(attachments)}")
-
-            # Step 6: Send email
-            logger.info(f"[Task {task_id}] Sending email to {email_to}")
-            subject = f"Заявление о дефектах дорожного покрытия - {report.address}"
-            success = self.email_service.send_complaint_email(
-                to_email=email_to,
-                subject=subject,
-                body_text=complaint_text,
-                attachments=attachments
+            complaint_text, (file_bytes, file_ext), photo_attachments = await asyncio.gather(
+                text_task, document_task, photos_task
             )
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if len(file_bytes) == 0:
+            raise ValueError("Generated document is empty")
+        logger.info(f"[Task {task_id}] Document created: {len(file_bytes)} bytes")
+
+        attachments = [(f"zayavlenie.{file_ext}", file_bytes)]
+        attachments.extend(photo_attachments)
+        logger.info(f"[Task {task_id}] Total attachments: {len(attachments)}")
+
+        # Письмо уходит в исходящую очередь и фиксируется в одной транзакции с заявкой
+        subject = f"Заявление о дефектах дорожного покрытия - {report.address}"
+        outbound = await timed("email", self.email_service.enqueue_complaint_email(
+            session,
+            report.uuid,
+            to_email=email_to,
+            subject=subject,
+            body_text=complaint_text,
+            attachments=attachments
+        ))
+
+        timings["total"] = round(time.perf_counter() - started, 3)
+        report.ai_agent_status = "completed"
+        report.email_status = "queued"
+        report.email_error = None
+        report.comment = f"Заявление поставлено в очередь на отправку на {email_to} с {len(photo_attachments)} фото"
+        report.complaint_text = complaint_text
+        report.stage_timings = timings
+        await repository.update(report)
+        logger.info(f"[Task {task_id}] Email {outbound.uuid} to {email_to} queued, timings: {timings}")
+
+    async def _save_complaint_text(self, report_uuid: uuid.UUID, text: str):
+        """Промежуточный текст заявления; отдельная сессия, чтобы не мешать другим этапам."""
+        async with async_session_maker() as session:
+            await ReportRepository(session).update_fields(report_uuid, complaint_text=text)
 
-            if success:
-                report.ai_agent_status = "completed"
-                report.status = ReportStatus.IN_REVIEW
-                report.comment = f"Заявление отправлено на {email_to} с {len(photo_attachments)} фото"
-                logger.info(f"[Task {task_id}] Successfully sent to {email_to}")
-            else:
-                report.ai_agent_status = "failed"
-                report.comment = "Ошибка при отправке email"
-                logger.error(f"[Task {task_id}] Failed to send email")
-
-            await repository.update(report)
-
+    async def _get_person_name(self, user_id: Optional[int], task_id: str) -> str:
+        """Имя заявителя; читается в своей сессии, чтобы идти параллельно с другими этапами."""
+        person_name = "Заявитель"
+        if not user_id:
+            return person_name
+        try:
+            async with async_session_maker() as session:
+                user = await UserService(session).get_user_by_max_user_id(user_id)
+            if user and user.first_name and user.last_name:
+                person_name = f"{user.first_name} {user.last_name}"
+            logger.debug(f"[Task {task_id}] User name: {person_name}")
         except Exception as e:
-            logger.error(f"[Task {task_id}] Error processing report {report_uuid}: {e}", exc_info=True)
-            try:
-                repository = ReportRepository(session)
-                report = await repository.get_by_uuid(report_uuid)
-                if report:
-                    report.ai_agent_status = "failed"
-                    report.comment = f"Ошибка: {str(e)}"
-                    await repository.update(report)
-            except Exception as update_error:
-                logger.error(f"[Task {task_id}] Failed to update report status: {update_error}", exc_info=True)
+            logger.error(f"[Task {task_id}] Error getting user data: {e}", exc_info=True)
+        return person_name
+
+    async def _create_document(self, photos_task: asyncio.Task, **kwargs) -> tuple:
+        """
+        Генерирует заявление в пуле этапа документов.
+        PDF без шаблона встраивает фотографии, поэтому ждёт их загрузки.
+        """
+        photos = ()
+        if configs.PDF_BACKEND == "direct" and kwargs.get("convert_to_pdf"):
+            photos = [content for _, content in await photos_task]
+        return await run_in_stage(
+            STAGE_DOCUMENT,
+            self.document_service.create_complaint_document,
+            photos=photos,
+            **kwargs
+        )
 
     async def _download_photos(self, report: Report) -> List[tuple]:
-        """Скачивает все фотографии из report.image_urls."""
-        photo_attachments = []
+        """Скачивает все фотографии заявки через AttachmentService."""
+        photo_urls = self._collect_photo_urls(report)
+        logger.info(f"Found {len(photo_urls)} photo URLs to download")
+
+        photo_attachments = await self.attachment_service.fetch(photo_urls)
+
+        logger.info(f"Successfully downloaded {len(photo_attachments)}/{len(photo_urls)} photos")
+        return photo_attachments
+
+    @staticmethod
+    def _collect_photo_urls(report: Report) -> List[str]:
+        """Собирает URL всех фотографий заявки (Report или строка списка с image_url/image_urls)."""
         photo_urls = []
 
         if report.image_url:
@@ -370,26 +445,14 @@ class ReportService:
         elif isinstance(report.image_urls, list):
             photo_urls.extend(report.image_urls)
 
-        logger.info(f"Found {len(photo_urls)} photo URLs to download")
-
-        async with aiohttp.ClientSession() as session:
-            for idx, url in enumerate(photo_urls, 1):
-                try:
-                    logger.debug(f"Downloading photo {idx}/{len(photo_urls)}: {url[:50]}...")
-                    async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                        response.raise_for_status()
-                        content = await response.read()
-                        parsed_url = urlparse(url)
-                        file_ext = Path(parsed_url.path).suffix or '.jpg'
-                        filename = f"photo_{idx}{file_ext}"
-                        photo_attachments.append((filename, content))
-                        logger.debug(f"Downloaded: {filename} ({len(content)} bytes)")
-                except Exception as e:
-                    logger.warning(f"Failed to download photo {idx} from {url[:50]}: {e}")
-                    continue
+        return photo_urls
 
-        logger.info(f"Successfully downloaded {len(photo_attachments)}/{len(photo_urls)} photos")
-        return photo_attachments
+    def _build_renditions(self, report: Report) -> List[ImageRenditions]:
+        """URL вариантов для каждой фотографии заявки."""
+        return [
+            ImageRenditions(**rendition_urls(url))
+            for url in self._collect_photo_urls(report)
+        ]
 
     def _count_photos(self, report: Report) -> int:
         """Подсчитывает количество фотографий."""
@@ -419,38 +482,105 @@ class ReportService:
             status: Optional[ReportStatus] = None,
             priority: Optional[ReportPriority] = None,
             skip: int = 0,
-            limit: int = 50
+            limit: int = 50,
+            cursor: Optional[str] = None,
+            count: ReportCountModeEnum = ReportCountModeEnum.EXACT
     ) -> ReportListResponse:
-        """Получить список заявок с фильтрацией"""
-        reports, total = await self.repository.get_list(
+        """
+        Получить список заявок с фильтрацией.
+        С cursor страница выбирается по ключу (created_at, uuid) без OFFSET,
+        skip оставлен для совместимости и применяется только без курсора.
+        """
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except InvalidCursorError:
+                raise HTTPException(status_code=400, detail="Некорректный курсор страницы")
+
+        # Лишняя запись показывает, есть ли следующая страница
+        rows = await self.repository.get_page(
             user_id=user_id,
             status=status,
             priority=priority,
-            skip=skip,
-            limit=limit
+            limit=limit + 1,
+            after=after,
+            skip=skip
         )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].uuid)
 
-        items = [
-            ReportListItem(
-                uuid=r.uuid,
-                user_id=r.user_id,
-                latitude=r.latitude,
-                longitude=r.longitude,
-                address=r.address,
-                status=r.status.value,
-                priority=r.priority.value,
-                total_potholes=r.total_potholes,
-                max_risk=r.max_risk,
-                created_at=r.created_at,
-                image_url=r.image_url,
-                image_urls=r.image_urls,
-                video_url=r.video_url
-            )
-            for r in reports
-        ]
+        total, total_estimated = await self._count_reports(user_id, status, priority, count)
+
+        items = [self._to_list_item(row) for row in rows]
 
         logger.debug(f"Retrieved {len(items)}/{total} reports")
-        return ReportListResponse(total=total, items=items)
+        return ReportListResponse(
+            total=total,
+            total_estimated=total_estimated,
+            items=items,
+            next_cursor=next_cursor
+        )
+
+    def _to_list_item(self, row) -> ReportListItem:
+        """
+        Элемент списка из строки ReportRepository.get_page.
+        Типы колонок уже совпадают со схемой, поэтому модель собирается без валидации.
+        """
+        return ReportListItem.model_construct(
+            uuid=row.uuid,
+            user_id=row.user_id,
+            latitude=row.latitude,
+            longitude=row.longitude,
+            address=row.address,
+            status=row.status.value,
+            priority=row.priority.value,
+            total_potholes=row.total_potholes,
+            max_risk=row.max_risk,
+            created_at=row.created_at,
+            submitted_at=row.submitted_at,
+            image_url=row.image_url,
+            image_urls=row.image_urls,
+            video_url=row.video_url,
+            renditions=self._build_renditions(row)
+        )
+
+    async def _count_reports(
+            self,
+            user_id: Optional[int],
+            status: Optional[ReportStatus],
+            priority: Optional[ReportPriority],
+            mode: ReportCountModeEnum
+    ) -> Tuple[Optional[int], bool]:
+        """
+        Общее количество для списка: (значение, приблизительное ли оно).
+        В режиме cached точное значение кэшируется по набору фильтров на REPORTS_COUNT_CACHE_SECONDS.
+        """
+        if mode == ReportCountModeEnum.NONE:
+            return None, False
+        if mode == ReportCountModeEnum.EXACT:
+            return await self.repository.count(user_id=user_id, status=status, priority=priority), False
+
+        filters = (user_id, status, priority)
+        if mode == ReportCountModeEnum.ESTIMATED and filters == (None, None, None):
+            estimate = await self.repository.estimate_total()
+            if estimate is not None:
+                return estimate, True
+
+        key = (user_id, getattr(status, "value", status), getattr(priority, "value", priority))
+        cached = ReportService._count_cache.get(key)
+        now = time.monotonic()
+        if cached is not None and cached[1] > now:
+            return cached[0], False
+
+        total = await self.repository.count(user_id=user_id, status=status, priority=priority)
+        ReportService._count_cache[key] = (total, now + configs.REPORTS_COUNT_CACHE_SECONDS)
+        ReportService._count_cache.move_to_end(key)
+        while len(ReportService._count_cache) > configs.REPORTS_COUNT_CACHE_SIZE:
+            ReportService._count_cache.popitem(last=False)
+        return total, False
 
     async def delete_draft(self, report_uuid: uuid.UUID) -> dict:
         """Удалить черновик"""
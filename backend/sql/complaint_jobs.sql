@@ -0,0 +1,23 @@
+-- Очередь заданий на обработку заявлений
+DROP TABLE IF EXISTS complaint_jobs CASCADE;
+DROP TYPE IF EXISTS complaintjobstatus CASCADE;
+
+CREATE TYPE complaintjobstatus AS ENUM ('PENDING', 'RUNNING', 'DONE', 'FAILED');
+
+CREATE TABLE complaint_jobs (
+    uuid UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    report_uuid UUID NOT NULL REFERENCES reports(uuid) ON DELETE CASCADE,
+    status complaintjobstatus NOT NULL DEFAULT 'PENDING',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    last_error TEXT,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT now(),
+    locked_by VARCHAR(200),
+    locked_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX idx_complaint_jobs_report_uuid ON complaint_jobs(report_uuid);
+-- Выборка готовых заданий воркерами
+CREATE INDEX idx_complaint_jobs_pending ON complaint_jobs(run_after) WHERE status = 'PENDING';
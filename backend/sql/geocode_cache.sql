@@ -0,0 +1,6 @@
+-- Кэш обратного геокодирования по ячейкам сетки координат
+CREATE TABLE IF NOT EXISTS geocode_cache (
+    cell VARCHAR(64) PRIMARY KEY,
+    address VARCHAR(500),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -0,0 +1,29 @@
+-- Исходящая почта: тела писем лежат в maildir-спуле, здесь состояние доставки
+DROP TABLE IF EXISTS outbound_emails CASCADE;
+DROP TYPE IF EXISTS outboundemailstatus CASCADE;
+
+CREATE TYPE outboundemailstatus AS ENUM ('PENDING', 'SENDING', 'SENT', 'FAILED');
+
+CREATE TABLE outbound_emails (
+    uuid UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    report_uuid UUID REFERENCES reports(uuid) ON DELETE CASCADE,
+    to_email VARCHAR(320) NOT NULL,
+    recipient_domain VARCHAR(255) NOT NULL,
+    subject TEXT NOT NULL,
+    spool_key VARCHAR(255) NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    status outboundemailstatus NOT NULL DEFAULT 'PENDING',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    last_error TEXT,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT now(),
+    locked_by VARCHAR(200),
+    locked_at TIMESTAMPTZ,
+    sent_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX idx_outbound_emails_report_uuid ON outbound_emails(report_uuid);
+-- Выборка готовых писем воркерами доставки
+CREATE INDEX idx_outbound_emails_pending ON outbound_emails(run_after) WHERE status = 'PENDING';
@@ -46,11 +46,17 @@ CREATE TABLE reports (
     ai_agent_task_id TEXT,
     ai_agent_status TEXT,
     organization_name TEXT,
+    complaint_text TEXT,
+    stage_timings JSONB,
+    email_status TEXT,
+    email_sent_at TIMESTAMPTZ,
+    email_error JSONB,
     external_tracking_id TEXT
 );
 
--- Создаём индексы для удобства запросов
-CREATE INDEX idx_reports_user_id ON reports(user_id);
-CREATE INDEX idx_reports_status ON reports(status);
-CREATE INDEX idx_reports_priority ON reports(priority);
-CREATE INDEX idx_reports_created_at ON reports(created_at);
\ No newline at end of file
+-- Создаём индексы под фильтры списка заявок и сортировку (created_at, uuid) DESC
+CREATE INDEX idx_reports_created_at_uuid ON reports(created_at DESC, uuid DESC);
+CREATE INDEX idx_reports_user_created_at ON reports(user_id, created_at DESC, uuid DESC);
+CREATE INDEX idx_reports_status_created_at ON reports(status, created_at DESC, uuid DESC);
+CREATE INDEX idx_reports_priority_created_at ON reports(priority, created_at DESC, uuid DESC);
+CREATE INDEX idx_reports_user_submitted ON reports(user_id) WHERE status <> 'draft';
\ No newline at end of file
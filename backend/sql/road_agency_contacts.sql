@@ -0,0 +1,16 @@
+-- Справочник контактов управлений дорожной деятельности
+CREATE TABLE IF NOT EXISTS road_agency_contacts (
+    city_key VARCHAR(300) PRIMARY KEY,
+    city VARCHAR(200) NOT NULL,
+    region VARCHAR(200),
+    organization VARCHAR(500),
+    email VARCHAR(255),
+    phone VARCHAR(50),
+    website VARCHAR(500),
+    confidence DOUBLE PRECISION NOT NULL DEFAULT 0.0,
+    source VARCHAR(50) NOT NULL DEFAULT 'alisa',
+    refreshed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    expires_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_road_agency_contacts_expires_at ON road_agency_contacts(expires_at);
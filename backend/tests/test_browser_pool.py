@@ -0,0 +1,172 @@
+import threading
+import time
+
+import pytest
+
+from backend.services.browser_pool import BrowserPool, BrowserPoolTimeout
+
+
+class FakeDriver:
+    """Драйвер без браузера: считает запросы и умеет «сломаться»"""
+
+    def __init__(self, number: int):
+        self.number = number
+        self.healthy = True
+        self.quit_called = False
+        self.pages = []
+
+    def execute_script(self, script):
+        if not self.healthy:
+            raise RuntimeError("chrome not reachable")
+        return 1
+
+    def get(self, url):
+        self.pages.append(url)
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakeDriverFactory:
+    def __init__(self):
+        self.drivers = []
+        self._lock = threading.Lock()
+
+    def __call__(self) -> FakeDriver:
+        with self._lock:
+            driver = FakeDriver(len(self.drivers))
+            self.drivers.append(driver)
+            return driver
+
+
+@pytest.fixture
+def factory():
+    return FakeDriverFactory()
+
+
+def test_checkin_returns_browser_for_reuse(factory):
+    pool = BrowserPool(factory, size=2, max_uses=10, checkout_timeout=0.1)
+    pool.start()
+    assert len(factory.drivers) == 2
+
+    browser = pool.checkout()
+    pool.checkin(browser)
+    again = pool.checkout()
+
+    assert again is browser
+    assert browser.uses == 1
+    assert browser.driver.pages == ["about:blank"]
+    assert len(factory.drivers) == 2
+    pool.close()
+
+
+def test_checkout_waits_for_checkin_and_times_out(factory):
+    pool = BrowserPool(factory, size=1, checkout_timeout=0.1)
+    browser = pool.checkout()
+
+    with pytest.raises(BrowserPoolTimeout):
+        pool.checkout()
+
+    releaser = threading.Timer(0.02, pool.checkin, args=(browser,))
+    pool.checkout_timeout = 2
+    releaser.start()
+    assert pool.checkout() is browser
+    releaser.join()
+    assert len(factory.drivers) == 1
+
+
+def test_browser_recycled_after_max_uses(factory):
+    pool = BrowserPool(factory, size=1, max_uses=2, checkout_timeout=0.1)
+    first = pool.checkout()
+    pool.checkin(first)
+    assert pool.checkout() is first
+    pool.checkin(first)
+
+    assert first.driver.quit_called
+    second = pool.checkout()
+    assert second is not first
+    assert len(factory.drivers) == 2
+    assert pool._launched == 1
+
+
+def test_unhealthy_browser_replaced_on_checkout(factory):
+    pool = BrowserPool(factory, size=1, checkout_timeout=0.1)
+    pool.start()
+    broken = factory.drivers[0]
+    broken.healthy = False
+
+    browser = pool.checkout()
+    assert browser.driver is not broken
+    assert broken.quit_called
+    assert pool._launched == 1
+
+
+def test_failed_session_recycles_browser(factory):
+    pool = BrowserPool(factory, size=1, checkout_timeout=0.1)
+    with pytest.raises(ValueError):
+        with pool.session() as browser:
+            raise ValueError("captcha")
+
+    assert browser.driver.quit_called
+    with pool.session() as replacement:
+        assert replacement is not browser
+
+
+def test_close_quits_idle_and_returned_browsers(factory):
+    pool = BrowserPool(factory, size=2, checkout_timeout=0.1)
+    pool.start()
+    busy = pool.checkout()
+    pool.close()
+
+    idle = [driver for driver in factory.drivers if driver is not busy.driver]
+    assert all(driver.quit_called for driver in idle)
+    assert not busy.driver.quit_called
+    pool.checkin(busy)
+    assert busy.driver.quit_called
+    with pytest.raises(RuntimeError):
+        pool.checkout()
+
+
+def checkout_in_thread(pool):
+    """Запускает checkout в отдельном потоке; возвращает поток и список с результатом"""
+    result = []
+
+    def run():
+        started = time.monotonic()
+        try:
+            result.append((pool.checkout(), time.monotonic() - started))
+        except Exception as e:
+            result.append((e, time.monotonic() - started))
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, result
+
+
+def test_recycled_checkin_wakes_waiting_checkout(factory):
+    pool = BrowserPool(factory, size=1, max_uses=1, checkout_timeout=5)
+    browser = pool.checkout()
+    waiter, result = checkout_in_thread(pool)
+    time.sleep(0.05)
+
+    # Браузер отработал max_uses и закрывается - освободилось место для нового
+    pool.checkin(browser)
+    waiter.join(timeout=2)
+
+    replacement, waited = result[0]
+    assert replacement is not browser and replacement.driver is factory.drivers[1]
+    assert waited < 1
+
+
+def test_close_wakes_waiting_checkout(factory):
+    pool = BrowserPool(factory, size=1, checkout_timeout=5)
+    pool.checkout()
+    waiter, result = checkout_in_thread(pool)
+    time.sleep(0.05)
+
+    pool.close()
+    waiter.join(timeout=2)
+
+    error, waited = result[0]
+    assert isinstance(error, RuntimeError)
+    assert waited < 1
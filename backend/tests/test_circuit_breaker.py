@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from backend.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from backend.services.external_services.geo_service import GeocodingService
+
+
+def open_breaker(**kwargs) -> CircuitBreaker:
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01, **kwargs)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    return breaker
+
+
+def test_half_open_allows_single_trial():
+    breaker = open_breaker()
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_released_trial_allows_next_call():
+    breaker = open_breaker()
+    breaker.before_call()
+    breaker.release_trial()
+    breaker.before_call()
+
+
+def test_lost_trial_expires_after_trial_timeout():
+    breaker = open_breaker(trial_timeout=0.01)
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    time.sleep(0.02)
+    breaker.before_call()
+
+
+def test_cancelled_dadata_trial_does_not_stick(monkeypatch):
+    async def scenario():
+        async def hang(request):
+            await asyncio.sleep(3600)
+
+        breaker = open_breaker()
+        monkeypatch.setattr(GeocodingService, "_breaker", breaker)
+        monkeypatch.setattr(GeocodingService, "_client", httpx.AsyncClient(transport=httpx.MockTransport(hang)))
+
+        service = GeocodingService()
+        trial = asyncio.create_task(service._fetch_address(43.115, 131.885))
+        await asyncio.sleep(0.01)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        breaker.before_call()
+        await GeocodingService._client.aclose()
+
+    asyncio.run(scenario())
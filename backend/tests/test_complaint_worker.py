@@ -0,0 +1,173 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from backend.core.database import Base
+from backend.models.complaint_job_model import ComplaintJob, ComplaintJobStatus
+from backend.models.report_model import Report
+from backend.models.tasks_model import Task  # noqa: F401 - связь User.tasks при настройке мапперов
+from backend.models.users_model import User
+from backend.repositories.complaint_job_repository import ComplaintJobRepository
+from backend.workers import complaint_worker
+from backend.workers.complaint_worker import ComplaintWorker
+
+LOCK_TIMEOUT = 0.3
+
+
+class SlowReportService:
+    """Обработка заявления, которая длится дольше таймаута блокировки"""
+    duration = 1.0
+    cancelled = False
+
+    def __init__(self, session):
+        pass
+
+    async def process_complaint(self, session, report_uuid, task_id):
+        try:
+            await asyncio.sleep(SlowReportService.duration)
+        except asyncio.CancelledError:
+            SlowReportService.cancelled = True
+            raise
+
+
+@pytest.fixture
+def job_db(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+    monkeypatch.setattr(complaint_worker, "async_session_maker", session_maker)
+    monkeypatch.setattr(complaint_worker, "ReportService", SlowReportService)
+    monkeypatch.setattr(SlowReportService, "cancelled", False)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(
+                Base.metadata.create_all,
+                tables=[User.__table__, Report.__table__, ComplaintJob.__table__]
+            )
+
+    asyncio.run(setup())
+    yield session_maker
+    asyncio.run(engine.dispose())
+
+
+def make_worker() -> ComplaintWorker:
+    worker = ComplaintWorker(concurrency=1)
+    worker.lock_timeout = LOCK_TIMEOUT
+    worker.heartbeat_interval = LOCK_TIMEOUT / 4
+    return worker
+
+
+async def enqueue_and_claim(session_maker, worker_id: str) -> ComplaintJob:
+    async with session_maker() as session:
+        session.add(ComplaintJob(
+            report_uuid=uuid.uuid4(),
+            run_after=datetime.now(timezone.utc) - timedelta(seconds=1)
+        ))
+        await session.commit()
+    async with session_maker() as session:
+        return await ComplaintJobRepository(session).claim(worker_id)
+
+
+async def job_status(session_maker, job_uuid):
+    async with session_maker() as session:
+        return (await session.execute(select(ComplaintJob.status).where(ComplaintJob.uuid == job_uuid))).scalar()
+
+
+def test_heartbeat_keeps_long_job_from_being_released(job_db):
+    session_maker = job_db
+
+    async def scenario():
+        worker = make_worker()
+        job = await enqueue_and_claim(session_maker, f"{worker.worker_id}/0")
+        released = []
+
+        async def release_stale():
+            while True:
+                async with session_maker() as session:
+                    released.append(await ComplaintJobRepository(session).release_stale(LOCK_TIMEOUT))
+                await asyncio.sleep(LOCK_TIMEOUT / 4)
+
+        cleaner = asyncio.create_task(release_stale())
+        try:
+            await worker._run_job(job)
+        finally:
+            cleaner.cancel()
+        return job, released
+
+    job, released = asyncio.run(scenario())
+    assert not SlowReportService.cancelled
+    assert len(released) > 3 and not any(released)
+    assert asyncio.run(job_status(session_maker, job.uuid)) == ComplaintJobStatus.DONE
+
+
+def test_lost_lock_stops_processing(job_db):
+    session_maker = job_db
+
+    async def scenario():
+        worker = make_worker()
+        job = await enqueue_and_claim(session_maker, f"{worker.worker_id}/0")
+        run = asyncio.create_task(worker._run_job(job))
+        await asyncio.sleep(0.05)
+
+        # Задание признали зависшим (например, воркер долго стоял на паузе)
+        async with session_maker() as session:
+            assert await ComplaintJobRepository(session).release_stale(0) == 1
+
+        await asyncio.wait_for(run, timeout=LOCK_TIMEOUT * 2)
+        return job
+
+    job = asyncio.run(scenario())
+    assert SlowReportService.cancelled
+    # Задание осталось в очереди для другого воркера, а не помечено выполненным
+    assert asyncio.run(job_status(session_maker, job.uuid)) == ComplaintJobStatus.PENDING
+
+
+def test_failed_status_update_reschedules_job(job_db):
+    session_maker = job_db
+
+    async def scenario():
+        worker = make_worker()
+        job = await enqueue_and_claim(session_maker, f"{worker.worker_id}/0")
+
+        async def set_report_status(report_uuid, status, comment=None):
+            if status == "processing":
+                raise ConnectionError("connection reset by peer")
+
+        worker._set_report_status = set_report_status
+        await worker._run_job(job)
+
+        async with session_maker() as session:
+            return await session.get(ComplaintJob, job.uuid)
+
+    job = asyncio.run(scenario())
+    assert job.status == ComplaintJobStatus.PENDING
+    assert "connection reset" in job.last_error
+
+
+def test_slot_survives_job_error():
+    async def scenario():
+        worker = make_worker()
+        worker.poll_interval = 0.01
+        claims = []
+
+        async def claim(slot):
+            claims.append(slot)
+            if len(claims) == 1:
+                return ComplaintJob(uuid=uuid.uuid4(), report_uuid=uuid.uuid4())
+            if len(claims) >= 3:
+                worker.stop()
+            return None
+
+        async def run_job(job):
+            raise ConnectionError("database is unavailable")
+
+        worker._claim = claim
+        worker._run_job = run_job
+        await asyncio.wait_for(worker._slot(0), timeout=2)
+        return claims
+
+    assert len(asyncio.run(scenario())) >= 3
@@ -0,0 +1,172 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from loguru import logger
+
+from backend.models.road_agency_contact_model import RoadAgencyContact
+from backend.services.ai_agent_service import AIAgentService, ContactsScrapeError
+from backend.services import contacts_directory_service as directory
+from backend.services.contacts_directory_service import ContactsDirectoryService, build_city_key
+
+
+class FakeAgent:
+    def __init__(self, contacts=None, error=None):
+        self.contacts = contacts or {}
+        self.error = error
+        self.scraped = threading.Event()
+
+    def _extract_city(self, address, coordinates=None):
+        return "Владивосток"
+
+    def _extract_region(self, address):
+        return "Приморский край"
+
+    def scrape_city_contacts(self, city):
+        self.scraped.set()
+        if self.error:
+            raise self.error
+        return self.contacts
+
+    def build_result(self, city, contacts, status):
+        return {"city": city, "status": status, **contacts}
+
+    def city_not_found_result(self):
+        return {"success": False}
+
+
+class FakeRepository:
+    upserts = []
+
+    def __init__(self, session):
+        pass
+
+    async def upsert(self, **values):
+        self.upserts.append(values)
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def expired_entry(email):
+    past = datetime.now(timezone.utc) - timedelta(hours=1)
+    return RoadAgencyContact(
+        city_key=build_city_key("Владивосток", "Приморский край"),
+        city="Владивосток",
+        region="Приморский край",
+        email=email,
+        refreshed_at=past - timedelta(days=1),
+        expires_at=past,
+    )
+
+
+@pytest.fixture
+def service_factory(monkeypatch):
+    monkeypatch.setattr(directory, "async_session_maker", FakeSession)
+    monkeypatch.setattr(directory, "RoadAgencyContactRepository", FakeRepository)
+    monkeypatch.setattr(ContactsDirectoryService, "_refreshing", {})
+    monkeypatch.setattr(FakeRepository, "upserts", [])
+
+    def make(agent, entry):
+        service = ContactsDirectoryService(agent=agent)
+
+        async def get_entry(city_key):
+            return entry
+
+        service._get_entry = get_entry
+        return service
+
+    return make
+
+
+def test_expired_negative_entry_waits_for_refresh(service_factory):
+    agent = FakeAgent(contacts={"email": "road@vlc.ru", "organization": "УДДиБ"})
+    service = service_factory(agent, expired_entry(email=None))
+
+    result = asyncio.run(service.find_contacts("г Владивосток, ул Светланская, 1"))
+    assert result["status"] == "found"
+    assert result["email"] == "road@vlc.ru"
+
+
+def test_expired_entry_with_email_is_served_stale(service_factory):
+    agent = FakeAgent(contacts={"email": "new@vlc.ru"})
+    service = service_factory(agent, expired_entry(email="old@vlc.ru"))
+
+    async def scenario():
+        result = await service.find_contacts("г Владивосток, ул Светланская, 1")
+        assert result["status"] == "stale"
+        assert result["email"] == "old@vlc.ru"
+        await asyncio.gather(*ContactsDirectoryService._refreshing.values())
+
+    asyncio.run(scenario())
+    assert agent.scraped.is_set()
+
+
+def test_background_refresh_error_is_logged(service_factory):
+    agent = FakeAgent(error=RuntimeError("captcha"))
+    service = service_factory(agent, expired_entry(email="old@vlc.ru"))
+    messages = []
+    sink = logger.add(messages.append, level="WARNING")
+
+    async def scenario():
+        result = await service.find_contacts("г Владивосток, ул Светланская, 1")
+        assert result["status"] == "stale"
+        while ContactsDirectoryService._refreshing:
+            await asyncio.sleep(0.01)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        logger.remove(sink)
+    assert any("Contacts refresh failed" in str(m) and "captcha" in str(m) for m in messages)
+
+
+def test_failed_background_refresh_is_not_stored(service_factory):
+    agent = FakeAgent(error=ContactsScrapeError("Captcha detected"))
+    service = service_factory(agent, expired_entry(email="old@vlc.ru"))
+
+    async def scenario():
+        await service.find_contacts("г Владивосток, ул Светланская, 1")
+        while ContactsDirectoryService._refreshing:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    assert agent.scraped.is_set()
+    assert FakeRepository.upserts == []
+
+
+def test_failed_search_is_not_cached_as_negative(service_factory):
+    agent = FakeAgent(error=ContactsScrapeError("Alisa tab not found"))
+    service = service_factory(agent, None)
+
+    result = asyncio.run(service.find_contacts("г Владивосток, ул Светланская, 1"))
+    assert result["status"] == "found"
+    assert "email" not in result
+    assert FakeRepository.upserts == []
+
+
+def test_answer_without_contacts_is_stored_as_negative(service_factory):
+    service = service_factory(FakeAgent(contacts={}), None)
+
+    asyncio.run(service.find_contacts("г Владивосток, ул Светланская, 1"))
+    [values] = FakeRepository.upserts
+    assert values["email"] is None
+    assert values["expires_at"] - values["refreshed_at"] == service.negative_ttl
+
+
+class BrokenBrowserPool:
+    def session(self):
+        raise RuntimeError("chrome crashed")
+
+
+def test_browser_error_is_raised_not_returned_as_empty_contacts():
+    agent = AIAgentService(browser_pool=BrokenBrowserPool())
+
+    with pytest.raises(ContactsScrapeError, match="chrome crashed"):
+        agent.scrape_city_contacts("Владивосток")
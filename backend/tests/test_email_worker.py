@@ -0,0 +1,269 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from backend.core.config import configs
+from backend.core.database import Base
+from backend.models.outbound_email_model import OutboundEmail, OutboundEmailStatus
+from backend.models.report_model import Report
+from backend.models.tasks_model import Task  # noqa: F401 - связь User.tasks при настройке мапперов
+from backend.models.users_model import User
+from backend.repositories.outbound_email_repository import OutboundEmailRepository
+from backend.services.external_services.email_service import (
+    EmailSendResult,
+    REASON_CONNECTION,
+    REASON_REJECTED,
+    REASON_TRANSIENT,
+)
+from backend.workers import email_worker
+from backend.workers.email_worker import DomainRateLimiter, EmailWorker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_rate_limiter_allows_burst_then_spaces_messages(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(email_worker.time, "monotonic", clock.monotonic)
+    limiter = DomainRateLimiter(rate_per_minute=6, burst=2)
+
+    assert limiter.reserve("mail.ru") == 0
+    assert limiter.reserve("mail.ru") == 0
+    assert limiter.reserve("mail.ru") == pytest.approx(10)
+    # Другой домен лимитируется отдельно
+    assert limiter.reserve("vlc.ru") == 0
+
+    clock.now += 5
+    assert limiter.reserve("mail.ru") == pytest.approx(5)
+    clock.now += 5
+    assert limiter.reserve("mail.ru") == 0
+
+
+def test_rate_limiter_refill_is_capped_by_burst(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(email_worker.time, "monotonic", clock.monotonic)
+    limiter = DomainRateLimiter(rate_per_minute=60, burst=2)
+
+    limiter.reserve("mail.ru")
+    clock.now += 3600
+    assert limiter.reserve("mail.ru") == 0
+    assert limiter.reserve("mail.ru") == 0
+    assert limiter.reserve("mail.ru") > 0
+
+
+class FakeSmtpPool:
+    def __init__(self, error: Exception = None):
+        self.error = error
+        self.sessions = 0
+
+    @asynccontextmanager
+    async def connection(self):
+        if self.error:
+            raise self.error
+        self.sessions += 1
+        yield SimpleNamespace(close=lambda: None)
+
+
+class FakeEmailService:
+    """Отдаёт заранее заданные результаты отправки по адресату"""
+
+    def __init__(self, results, pool=None):
+        self.results = results
+        self.pool = pool or FakeSmtpPool()
+        self.delivered = []
+        self.removed = []
+
+    def get_pool(self):
+        return self.pool
+
+    def get_spool(self):
+        return SimpleNamespace(remove=self.removed.append)
+
+    async def deliver(self, client, email):
+        self.delivered.append(email.to_email)
+        return self.results.get(email.to_email, EmailSendResult(success=True, attempts=email.attempts))
+
+
+@pytest.fixture
+def email_db(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'emails.db'}")
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+    monkeypatch.setattr(email_worker, "async_session_maker", session_maker)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(
+                Base.metadata.create_all,
+                tables=[User.__table__, Report.__table__, OutboundEmail.__table__]
+            )
+
+    asyncio.run(setup())
+    yield session_maker
+    asyncio.run(engine.dispose())
+
+
+def make_worker(service: FakeEmailService, burst: int = 5) -> EmailWorker:
+    worker = EmailWorker(concurrency=1)
+    worker.email_service = service
+    worker.limiter = DomainRateLimiter(rate_per_minute=1, burst=burst)
+    worker.poll_interval = 0.01
+    return worker
+
+
+async def enqueue_and_claim(session_maker, worker: EmailWorker, recipients, max_attempts: int = 3):
+    async with session_maker() as session:
+        for to_email in recipients:
+            session.add(OutboundEmail(
+                to_email=to_email,
+                recipient_domain=to_email.split("@")[1],
+                subject="Заявление",
+                spool_key=uuid.uuid4().hex,
+                size_bytes=100,
+                max_attempts=max_attempts,
+                run_after=datetime.now(timezone.utc) - timedelta(seconds=1)
+            ))
+        await session.commit()
+    async with session_maker() as session:
+        return await OutboundEmailRepository(session).claim_batch(f"{worker.worker_id}/0", 10)
+
+
+async def load_emails(session_maker):
+    async with session_maker() as session:
+        emails = await session.run_sync(lambda s: s.query(OutboundEmail).all())
+        return {email.to_email: email for email in emails}
+
+
+def run_batch(session_maker, worker, recipients, **kwargs):
+    async def scenario():
+        batch = await enqueue_and_claim(session_maker, worker, recipients, **kwargs)
+        await worker._deliver_batch(batch)
+        return await load_emails(session_maker)
+
+    return asyncio.run(scenario())
+
+
+def assert_run_after_in(email, low: float, high: float):
+    run_after = email.run_after.replace(tzinfo=timezone.utc) if email.run_after.tzinfo is None else email.run_after
+    delay = (run_after - datetime.now(timezone.utc)).total_seconds()
+    assert low <= delay <= high
+
+
+def test_batch_is_sent_over_one_session(email_db):
+    service = FakeEmailService({})
+    worker = make_worker(service)
+
+    emails = run_batch(email_db, worker, ["a@mail.ru", "b@vlc.ru", "c@mail.ru"])
+
+    assert service.pool.sessions == 1
+    assert all(email.status == OutboundEmailStatus.SENT for email in emails.values())
+    assert len(service.removed) == 3
+
+
+def test_rate_limited_email_is_deferred_without_spending_attempt(email_db):
+    service = FakeEmailService({})
+    worker = make_worker(service, burst=1)
+
+    emails = run_batch(email_db, worker, ["a@mail.ru", "b@mail.ru"])
+
+    assert service.delivered == ["a@mail.ru"]
+    deferred = emails["b@mail.ru"]
+    assert deferred.status == OutboundEmailStatus.PENDING
+    assert deferred.attempts == 0
+    assert_run_after_in(deferred, 30, 61)
+
+
+def test_transient_failure_is_retried_with_backoff(email_db, monkeypatch):
+    monkeypatch.setattr(configs, "EMAIL_RETRY_BASE_SECONDS", 100.0)
+    service = FakeEmailService({
+        "a@mail.ru": EmailSendResult(success=False, reason=REASON_TRANSIENT, smtp_code=451, message="try later"),
+        "b@mail.ru": EmailSendResult(success=False, reason=REASON_REJECTED, smtp_code=550, message="no such user"),
+    })
+    worker = make_worker(service)
+
+    emails = run_batch(email_db, worker, ["a@mail.ru", "b@mail.ru"])
+
+    retried = emails["a@mail.ru"]
+    assert retried.status == OutboundEmailStatus.PENDING
+    assert retried.attempts == 1 and retried.last_error == "try later"
+    assert_run_after_in(retried, 70, 130)
+    assert emails["b@mail.ru"].status == OutboundEmailStatus.FAILED
+
+
+def test_transient_failure_on_last_attempt_fails(email_db):
+    service = FakeEmailService({
+        "a@mail.ru": EmailSendResult(success=False, reason=REASON_TRANSIENT, smtp_code=451, message="try later"),
+    })
+    worker = make_worker(service)
+
+    emails = run_batch(email_db, worker, ["a@mail.ru"], max_attempts=1)
+    assert emails["a@mail.ru"].status == OutboundEmailStatus.FAILED
+
+
+def test_lost_connection_returns_rest_of_batch(email_db):
+    service = FakeEmailService({
+        "a@mail.ru": EmailSendResult(success=False, reason=REASON_CONNECTION, message="reset"),
+    })
+    worker = make_worker(service)
+
+    emails = run_batch(email_db, worker, ["a@mail.ru", "b@vlc.ru", "c@vlc.ru"])
+
+    assert service.delivered == ["a@mail.ru"]
+    assert emails["a@mail.ru"].attempts == 1
+    for rest in ("b@vlc.ru", "c@vlc.ru"):
+        assert emails[rest].status == OutboundEmailStatus.PENDING
+        assert emails[rest].attempts == 0
+
+
+def test_login_failure_records_every_email(email_db):
+    service = FakeEmailService({}, pool=FakeSmtpPool(ConnectionRefusedError("smtp down")))
+    worker = make_worker(service)
+
+    emails = run_batch(email_db, worker, ["a@mail.ru", "b@vlc.ru"])
+
+    for email in emails.values():
+        assert email.status == OutboundEmailStatus.PENDING
+        assert email.attempts == 1
+        assert "smtp down" in email.last_error
+
+
+def test_slot_survives_db_error_and_releases_batch(email_db, monkeypatch):
+    session_maker = email_db
+    monkeypatch.setattr(configs, "EMAIL_RETRY_BASE_SECONDS", 100.0)
+    worker = make_worker(FakeEmailService({}))
+
+    async def scenario():
+        batch = await enqueue_and_claim(session_maker, worker, ["a@mail.ru", "b@vlc.ru"])
+        claims = []
+
+        async def claim(slot):
+            claims.append(slot)
+            if len(claims) >= 3:
+                worker.stop()
+            return batch if len(claims) == 1 else []
+
+        async def record(email, result):
+            raise ConnectionError("database is unavailable")
+
+        worker._claim = claim
+        worker._record = record
+        await asyncio.wait_for(worker._slot(0), timeout=2)
+        return claims, await load_emails(session_maker)
+
+    claims, emails = asyncio.run(scenario())
+    assert len(claims) >= 3
+    for email in emails.values():
+        # Письма не остались захваченными до release_stale
+        assert email.status == OutboundEmailStatus.PENDING
+        assert email.locked_by is None
+        assert email.attempts == 1
+        assert_run_after_in(email, 90, 101)
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from backend.services.external_services.geo_service import ReverseGeocodeCache
+
+
+def make_cache() -> ReverseGeocodeCache:
+    cache = ReverseGeocodeCache(cell_meters=25, ttl_seconds=3600, max_entries=100)
+    db = {}
+
+    async def db_get(cell):
+        if cell in db:
+            return True, db[cell], 3600
+        return False, None, 0
+
+    async def db_put(cell, address):
+        db[cell] = address
+
+    cache._db_get = db_get
+    cache._db_put = db_put
+    return cache
+
+
+def test_leader_cancel_does_not_cancel_followers():
+    async def scenario():
+        cache = make_cache()
+        release = asyncio.Event()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "ул Светланская, 1"
+
+        leader = asyncio.create_task(cache.get_or_fetch(43.115, 131.885, fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.get_or_fetch(43.115, 131.885, fetch))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        release.set()
+        assert await follower == "ул Светланская, 1"
+        assert calls == 1
+        # Результат закэширован, повторный запрос не идёт наверх
+        assert await cache.get_or_fetch(43.115, 131.885, fetch) == "ул Светланская, 1"
+        assert calls == 1
+        assert not cache._inflight
+
+    asyncio.run(scenario())
+
+
+def test_fetch_error_reaches_all_waiters_and_is_not_cached():
+    async def scenario():
+        cache = make_cache()
+        release = asyncio.Event()
+
+        async def failing_fetch():
+            await release.wait()
+            raise RuntimeError("dadata unavailable")
+
+        waiters = [
+            asyncio.create_task(cache.get_or_fetch(43.115, 131.885, failing_fetch))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+        async def fetch():
+            return "ул Алеутская, 2"
+
+        assert await cache.get_or_fetch(43.115, 131.885, fetch) == "ул Алеутская, 2"
+
+    asyncio.run(scenario())
@@ -0,0 +1,244 @@
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+from gigachat import GigaChat
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from backend.core.config import configs
+from backend.core.database import Base
+from backend.models.report_model import Report, ReportPriority, ReportStatus
+from backend.models.tasks_model import Task  # noqa: F401 - связь User.tasks при настройке мапперов
+from backend.models.users_model import User
+from backend.services import report_service as report_service_module
+from backend.services.external_services.gigachat_service import GigaChatService
+from backend.services.report_service import ReportService
+
+PARTS = ["Заявление\n", "В Управление дорожной деятельности\n", "От: Заявитель\n", "Прошу отремонтировать дорогу."]
+
+
+def chunk(content: str) -> str:
+    payload = {
+        "choices": [{"delta": {"role": "assistant", "content": content}, "index": 0}],
+        "created": int(time.time()),
+        "model": "GigaChat",
+        "object": "chat.completion",
+    }
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+async def start_fake_gigachat(stall_after: int = None, delay: float = 0.05):
+    """SSE-сервер в формате /chat/completions; после stall_after частей перестаёт отвечать"""
+
+    released = asyncio.Event()
+
+    async def completions(request):
+        body = await request.json()
+        assert body["stream"] is True
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for index, part in enumerate(PARTS):
+            if stall_after is not None and index >= stall_after:
+                await released.wait()
+                return response
+            await response.write(chunk(part).encode("utf-8"))
+            await asyncio.sleep(delay)
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+    app = web.Application()
+    app["released"] = released
+    app.router.add_post("/chat/completions", completions)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+@pytest.fixture(autouse=True)
+def fresh_gigachat(monkeypatch):
+    monkeypatch.setattr(GigaChatService, "_client", None)
+    monkeypatch.setattr(GigaChatService, "_semaphore", None)
+    monkeypatch.setattr(GigaChatService, "_cache", OrderedDict())
+    monkeypatch.setattr(configs, "GIGACHAT_STREAM_FLUSH_SECONDS", 0.0)
+
+
+async def stop_fake_gigachat(runner):
+    await GigaChatService.close_client()
+    runner.app["released"].set()
+    await runner.cleanup()
+
+
+async def use_fake_gigachat(**server_options):
+    runner, base_url = await start_fake_gigachat(**server_options)
+    GigaChatService._client = GigaChat(base_url=base_url, access_token="test-token", verify_ssl_certs=False)
+    return runner
+
+
+COMPLAINT_PARAMS = dict(
+    city="Владивосток",
+    address="г Владивосток, ул Светланская, 1",
+    description="Яма",
+    total_potholes=2,
+    max_risk=55.0,
+    priority="high",
+    person_name="Заявитель",
+)
+
+
+def test_stream_reports_growing_text():
+    async def scenario():
+        runner = await use_fake_gigachat()
+        progress = []
+
+        async def on_progress(text):
+            progress.append(text)
+
+        try:
+            text = await GigaChatService().generate_complaint_text(**COMPLAINT_PARAMS, on_progress=on_progress)
+        finally:
+            await stop_fake_gigachat(runner)
+
+        assert text == "".join(PARTS).strip()
+        assert len(progress) >= 2
+        assert all(later.startswith(earlier) for earlier, later in zip(progress, progress[1:]))
+
+    asyncio.run(scenario())
+
+
+def test_stream_timeout_returns_fallback():
+    async def scenario():
+        runner = await use_fake_gigachat(stall_after=2)
+        service = GigaChatService()
+        service.timeout = 0.5
+        progress = []
+
+        async def on_progress(text):
+            progress.append(text)
+
+        try:
+            text = await service.generate_complaint_text(**COMPLAINT_PARAMS, on_progress=on_progress)
+        finally:
+            await stop_fake_gigachat(runner)
+
+        assert progress and progress[-1] == "".join(PARTS[:2])
+        assert text == service._generate_fallback_text(**COMPLAINT_PARAMS)
+        # Резервный текст не кэшируется
+        assert not GigaChatService._cache
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def report_db(tmp_path, monkeypatch):
+    """SQLite вместо PostgreSQL для заявки и промежуточных записей текста"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'reports.db'}")
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+    monkeypatch.setattr(report_service_module, "async_session_maker", session_maker)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[User.__table__, Report.__table__])
+        async with session_maker() as session:
+            report = Report(
+                address="г Владивосток, ул Светланская, 1",
+                latitude="43.115",
+                longitude="131.885",
+                status=ReportStatus.SUBMITTED,
+                priority=ReportPriority.HIGH,
+                total_potholes=2,
+                max_risk=55.0,
+            )
+            session.add(report)
+            await session.commit()
+            return report.uuid
+
+    report_uuid = asyncio.run(setup())
+    yield session_maker, report_uuid
+    asyncio.run(engine.dispose())
+
+
+def make_report_service(session) -> ReportService:
+    service = ReportService(session)
+
+    async def find_contacts(address, coordinates=None):
+        return {"success": True, "email": "road@vlc.ru", "organization": "УДДиБ", "city": "Владивосток"}
+
+    async def enqueue_complaint_email(session, report_uuid, **kwargs):
+        return SimpleNamespace(uuid=uuid.uuid4())
+
+    async def download_photos(report):
+        return []
+
+    async def create_document(photos_task, **kwargs):
+        return b"%PDF-1.4", "pdf"
+
+    service._contacts_directory = SimpleNamespace(find_contacts=find_contacts)
+    service._email_service = SimpleNamespace(enqueue_complaint_email=enqueue_complaint_email)
+    service._download_photos = download_photos
+    service._create_document = create_document
+    return service
+
+
+async def process_with_recorded_progress(session_maker, report_uuid, gigachat_timeout=None):
+    """process_complaint; возвращает промежуточные тексты и итоговый complaint_text из БД"""
+    saved = []
+    async with session_maker() as session:
+        service = make_report_service(session)
+        if gigachat_timeout is not None:
+            service.gigachat_service.timeout = gigachat_timeout
+        save_complaint_text = service._save_complaint_text
+
+        async def record(report_uuid, text):
+            saved.append(text)
+            await save_complaint_text(report_uuid, text)
+
+        service._save_complaint_text = record
+        await service.process_complaint(session, report_uuid, "task-1")
+
+    async with session_maker() as session:
+        final = (await session.execute(select(Report.complaint_text).where(Report.uuid == report_uuid))).scalar()
+    return saved, final
+
+
+def test_process_complaint_updates_text_progressively(report_db):
+    session_maker, report_uuid = report_db
+
+    async def scenario():
+        runner = await use_fake_gigachat()
+        try:
+            return await process_with_recorded_progress(session_maker, report_uuid)
+        finally:
+            await stop_fake_gigachat(runner)
+
+    saved, final = asyncio.run(scenario())
+    assert len(saved) >= 2
+    assert all(later.startswith(earlier) for earlier, later in zip(saved, saved[1:]))
+    assert final == "".join(PARTS).strip()
+
+
+def test_process_complaint_timeout_replaces_partial_text_with_fallback(report_db):
+    session_maker, report_uuid = report_db
+
+    async def scenario():
+        runner = await use_fake_gigachat(stall_after=2)
+        try:
+            return await process_with_recorded_progress(session_maker, report_uuid, gigachat_timeout=0.5)
+        finally:
+            await stop_fake_gigachat(runner)
+
+    saved, final = asyncio.run(scenario())
+    partial = "".join(PARTS[:2])
+    assert saved and saved[-1] == partial
+    assert final != partial
+    assert final == GigaChatService()._generate_fallback_text(**{
+        **COMPLAINT_PARAMS, "description": "Обнаружены дефекты дорожного покрытия", "person_name": "Заявитель"
+    })
@@ -0,0 +1,37 @@
+import io
+
+from PIL import Image
+
+from backend.services.image_utils import downscale_photo
+
+ORIENTATION_TAG = 0x0112
+
+
+def jpeg(width: int, height: int, orientation: int = None) -> bytes:
+    image = Image.new("RGB", (width, height), "gray")
+    exif = Image.Exif()
+    if orientation is not None:
+        exif[ORIENTATION_TAG] = orientation
+    out = io.BytesIO()
+    image.save(out, "JPEG", exif=exif)
+    return out.getvalue()
+
+
+def test_downscale_applies_exif_orientation():
+    # Снимок с телефона: пиксели в альбомной ориентации, тег «повернуть на 90°»
+    content, width, height = downscale_photo(jpeg(800, 400, orientation=6), max_px=200, quality=80)
+
+    assert (width, height) == (100, 200)
+    with Image.open(io.BytesIO(content)) as result:
+        assert result.size == (100, 200)
+        # Поворот уже применён: тег в результате не повернёт фото второй раз
+        assert result.getexif().get(ORIENTATION_TAG) in (None, 1)
+
+
+def test_downscale_keeps_photo_without_orientation():
+    _, width, height = downscale_photo(jpeg(800, 400), max_px=200, quality=80)
+    assert (width, height) == (200, 100)
+
+
+def test_downscale_skips_non_image():
+    assert downscale_photo(b"not an image", max_px=200, quality=80) is None
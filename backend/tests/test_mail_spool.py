@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from backend.services.mail_spool import MailSpool
+
+
+def test_store_moves_finished_message_into_new(tmp_path):
+    spool = MailSpool(str(tmp_path / "spool"))
+    seen_in_new = []
+
+    def write(f):
+        f.write(b"Subject: test\r\n\r\n")
+        # Пока сообщение дописывается, в new/ его ещё нет
+        seen_in_new.append(os.listdir(spool.new_dir))
+        f.write(b"body\r\n")
+
+    key, size = spool.store(write)
+
+    assert seen_in_new == [[]]
+    assert os.listdir(spool.tmp_dir) == []
+    assert os.listdir(spool.new_dir) == [key]
+    assert (spool.root / "cur").is_dir()
+    assert size == len(b"Subject: test\r\n\r\nbody\r\n")
+    with spool.open(key) as f:
+        assert f.read().endswith(b"body\r\n")
+
+
+def test_failed_write_leaves_nothing_behind(tmp_path):
+    spool = MailSpool(str(tmp_path / "spool"))
+
+    def write(f):
+        f.write(b"partial")
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        spool.store(write)
+
+    assert os.listdir(spool.tmp_dir) == []
+    assert os.listdir(spool.new_dir) == []
+
+
+def test_keys_are_unique_and_remove_is_idempotent(tmp_path):
+    spool = MailSpool(str(tmp_path / "spool"))
+    keys = {spool.store(lambda f: f.write(b"x"))[0] for _ in range(20)}
+    assert len(keys) == 20
+
+    key = keys.pop()
+    spool.remove(key)
+    spool.remove(key)
+    assert key not in os.listdir(spool.new_dir)
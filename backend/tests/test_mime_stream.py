@@ -0,0 +1,109 @@
+import asyncio
+import email
+import io
+import os
+
+import aiosmtplib
+
+from backend.services.mime_stream import SEND_CHUNK_BYTES, send_file, write_message
+
+
+async def start_fake_smtp(received: list, read_delay: float = 0.0):
+    """Минимальный SMTP-сервер; перед чтением DATA ждёт read_delay, чтобы заполнился буфер клиента"""
+
+    async def handle(reader, writer):
+        writer.write(b"220 fake ESMTP\r\n")
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.strip().upper()
+            if command.startswith((b"EHLO", b"HELO", b"MAIL", b"RCPT", b"RSET", b"NOOP")):
+                writer.write(b"250 OK\r\n")
+            elif command == b"DATA":
+                writer.write(b"354 go ahead\r\n")
+                await writer.drain()
+                await asyncio.sleep(read_delay)
+                received.append(await reader.readuntil(b"\r\n.\r\n"))
+                writer.write(b"250 queued\r\n")
+            elif command == b"QUIT":
+                writer.write(b"221 bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"502 unknown\r\n")
+            await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0, limit=64 * 1024 * 1024)
+    return server, server.sockets[0].getsockname()[1]
+
+
+def build_message(attachment: bytes) -> io.BytesIO:
+    message_file = io.BytesIO()
+    write_message(
+        message_file,
+        sender="robot@example.com",
+        to_email="road@example.com",
+        subject="Заявление о ремонте дороги",
+        body_text="Прошу отремонтировать дорогу.\nФото во вложении.",
+        attachments=[("заявление.pdf", attachment)],
+    )
+    message_file.seek(0)
+    return message_file
+
+
+def parse_received(data: bytes) -> email.message.Message:
+    lines = data[:-len(b".\r\n")].split(b"\r\n")
+    unescaped = [line[1:] if line.startswith(b".") else line for line in lines]
+    return email.message_from_bytes(b"\r\n".join(unescaped))
+
+
+def send(attachment: bytes, read_delay: float = 0.0):
+    async def scenario():
+        received = []
+        server, port = await start_fake_smtp(received, read_delay)
+        client = aiosmtplib.SMTP(hostname="127.0.0.1", port=port, use_tls=False, start_tls=False, timeout=10)
+        buffer_sizes = []
+
+        async def watch_buffer():
+            while True:
+                transport = client.protocol.transport if client.protocol else None
+                if transport is not None:
+                    buffer_sizes.append(transport.get_write_buffer_size())
+                await asyncio.sleep(0.001)
+
+        watcher = asyncio.create_task(watch_buffer())
+        try:
+            await client.connect()
+            await send_file(client, "robot@example.com", ["road@example.com"], build_message(attachment))
+            # Соединение остаётся рабочим для следующего письма из пула
+            assert client.is_connected
+            await client.quit()
+        finally:
+            watcher.cancel()
+            server.close()
+            await server.wait_closed()
+        return received, buffer_sizes
+
+    return asyncio.run(scenario())
+
+
+def test_send_file_delivers_message():
+    attachment = os.urandom(100 * 1024)
+    received, _ = send(attachment)
+
+    message = parse_received(received[0])
+    body, pdf = message.get_payload()
+    assert body.get_payload(decode=True).decode("utf-8").startswith("Прошу отремонтировать")
+    assert pdf.get_filename() == "заявление.pdf"
+    assert pdf.get_payload(decode=True) == attachment
+
+
+def test_send_file_waits_for_slow_reader():
+    attachment = os.urandom(24 * 1024 * 1024)
+    received, buffer_sizes = send(attachment, read_delay=0.3)
+
+    assert parse_received(received[0]).get_payload()[1].get_payload(decode=True) == attachment
+    # Пока сервер не читает, письмо не накапливается в памяти транспорта
+    assert max(buffer_sizes) <= 2 * SEND_CHUNK_BYTES
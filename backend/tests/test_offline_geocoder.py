@@ -0,0 +1,60 @@
+import csv
+import math
+
+import pytest
+
+from backend.services.external_services.offline_geocoder import METERS_PER_DEGREE, OfflineGeocoder
+
+GRID_DEG = 0.005
+
+
+def east_of(lat: float, lon: float, meters: float) -> float:
+    return lon + meters / (METERS_PER_DEGREE * math.cos(math.radians(lat)))
+
+
+def grid_lon(col: int, fraction: float) -> float:
+    """Долгота внутри столбца сетки: fraction - доля ширины ячейки от её западного края"""
+    return (col + fraction) * GRID_DEG - 180.0
+
+
+@pytest.fixture
+def build_index(tmp_path):
+    def build(rows):
+        csv_path = tmp_path / "addresses.csv"
+        with open(csv_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["lat", "lon", "address", "city"])
+            writer.writeheader()
+            writer.writerows(rows)
+        OfflineGeocoder.build(str(csv_path), str(tmp_path / "index"), grid_deg=GRID_DEG)
+        return OfflineGeocoder(str(tmp_path / "index"), max_distance_m=300.0)
+
+    return build
+
+
+def test_finds_address_two_columns_away_at_high_latitude(build_index):
+    # Мурманск: ячейка 0.005° по долготе уже ~200 м, адрес в 290 м лежит через столбец
+    lat = 68.97
+    lon = grid_lon(42_600, 0.9)
+    target_lon = east_of(lat, lon, 290)
+    assert math.floor((target_lon + 180.0) / GRID_DEG) - math.floor((lon + 180.0) / GRID_DEG) == 2
+
+    geocoder = build_index([{"lat": lat, "lon": target_lon, "address": "ул Ленина, 1", "city": "Мурманск"}])
+    result = geocoder.reverse(lat, lon)
+
+    assert result is not None
+    assert result.address == "ул Ленина, 1"
+    assert result.city == "Мурманск"
+    assert result.distance_m == pytest.approx(290, abs=1)
+
+
+def test_picks_nearest_within_max_distance(build_index):
+    lat, lon = 43.1155, 131.8855
+    geocoder = build_index([
+        {"lat": lat, "lon": east_of(lat, lon, 250), "address": "ул Светланская, 10", "city": "Владивосток"},
+        {"lat": lat, "lon": east_of(lat, lon, 120), "address": "ул Светланская, 5", "city": "Владивосток"},
+        {"lat": lat, "lon": east_of(lat, lon, -400), "address": "ул Алеутская, 1", "city": ""},
+    ])
+
+    assert geocoder.reverse(lat, lon).address == "ул Светланская, 5"
+    assert geocoder.reverse(lat, east_of(lat, lon, -350)).city is None
+    assert geocoder.reverse(lat, east_of(lat, lon, 700)) is None
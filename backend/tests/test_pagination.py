@@ -0,0 +1,47 @@
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from backend.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 19, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    item_uuid = uuid.uuid4()
+
+    assert decode_cursor(encode_cursor(created_at, item_uuid)) == (created_at, item_uuid)
+
+
+def test_cursor_is_url_safe_without_padding():
+    for microsecond in range(0, 999_999, 77_777):
+        cursor = encode_cursor(datetime(2026, 1, 1, microsecond=microsecond, tzinfo=timezone.utc), uuid.uuid4())
+        assert "=" not in cursor
+        assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    "",
+    base64.urlsafe_b64encode(b'{"c":"2026-10-19T00:00:00"}').decode(),
+    base64.urlsafe_b64encode(b'{"c":"yesterday","u":"00000000-0000-0000-0000-000000000000"}').decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    base64.urlsafe_b64encode(b"[1, 2]").decode(),
+])
+def test_tampered_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_cursor_with_edited_payload_is_rejected():
+    cursor = encode_cursor(datetime.now(timezone.utc), uuid.uuid4())
+    padded = cursor + "=" * (-len(cursor) % 4)
+    payload = json.loads(base64.urlsafe_b64decode(padded))
+    payload["u"] = "not-a-uuid"
+    tampered = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(tampered)
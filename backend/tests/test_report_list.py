@@ -0,0 +1,114 @@
+import asyncio
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from backend.core.database import Base
+from backend.models.report_model import Report, ReportPriority, ReportStatus
+from backend.models.tasks_model import Task  # noqa: F401 - связь User.tasks при настройке мапперов
+from backend.models.users_model import User
+from backend.repositories.ReportRepository import ReportRepository
+from backend.schemas.report_schema import ReportCountModeEnum
+from backend.services.report_service import ReportService
+
+CREATED_AT = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def session_maker(tmp_path, monkeypatch):
+    monkeypatch.setattr(ReportService, "_count_cache", OrderedDict())
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'reports.db'}")
+    maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[User.__table__, Report.__table__])
+
+    asyncio.run(setup())
+    yield maker
+    asyncio.run(engine.dispose())
+
+
+async def add_reports(maker, created_at_values):
+    async with maker() as session:
+        for created_at in created_at_values:
+            session.add(Report(
+                address="г Владивосток, ул Светланская, 1",
+                latitude="43.115",
+                longitude="131.885",
+                status=ReportStatus.SUBMITTED,
+                priority=ReportPriority.MEDIUM,
+                total_potholes=1,
+                max_risk=30.0,
+                created_at=created_at,
+            ))
+        await session.commit()
+
+
+def test_keyset_pages_do_not_repeat_or_skip_rows_with_equal_created_at(session_maker):
+    # Большинство заявок созданы в одну и ту же секунду: порядок решает uuid
+    created = [CREATED_AT] * 7 + [CREATED_AT - timedelta(seconds=1)] * 3 + [CREATED_AT + timedelta(seconds=1)]
+
+    async def scenario():
+        await add_reports(session_maker, created)
+        async with session_maker() as session:
+            repository = ReportRepository(session)
+            everything = [row.uuid for row in await repository.get_page(limit=100)]
+            paged, after = [], None
+            while True:
+                rows = await repository.get_page(limit=3, after=after)
+                if not rows:
+                    break
+                paged.extend(row.uuid for row in rows)
+                after = (rows[-1].created_at, rows[-1].uuid)
+            return everything, paged
+
+    everything, paged = asyncio.run(scenario())
+    assert len(everything) == len(created)
+    assert paged == everything
+
+
+def test_service_cursor_walks_whole_list(session_maker):
+    async def scenario():
+        await add_reports(session_maker, [CREATED_AT] * 5)
+        seen, cursor = [], None
+        async with session_maker() as session:
+            service = ReportService(session)
+            while True:
+                page = await service.get_list(limit=2, cursor=cursor, count=ReportCountModeEnum.NONE)
+                seen.extend(item.uuid for item in page.items)
+                cursor = page.next_cursor
+                if cursor is None:
+                    return seen
+
+    seen = asyncio.run(scenario())
+    assert len(seen) == len(set(seen)) == 5
+
+
+def test_exact_count_is_not_cached(session_maker):
+    async def scenario():
+        await add_reports(session_maker, [CREATED_AT] * 2)
+        async with session_maker() as session:
+            service = ReportService(session)
+            first = await service.get_list(count=ReportCountModeEnum.EXACT)
+            await add_reports(session_maker, [CREATED_AT])
+            second = await service.get_list(count=ReportCountModeEnum.EXACT)
+        return first.total, second.total
+
+    assert asyncio.run(scenario()) == (2, 3)
+
+
+def test_cached_count_is_reused_within_ttl(session_maker):
+    async def scenario():
+        await add_reports(session_maker, [CREATED_AT] * 2)
+        async with session_maker() as session:
+            service = ReportService(session)
+            first = await service.get_list(count=ReportCountModeEnum.CACHED)
+            await add_reports(session_maker, [CREATED_AT])
+            cached = await service.get_list(count=ReportCountModeEnum.CACHED)
+            exact = await service.get_list(count=ReportCountModeEnum.EXACT)
+        return first.total, cached.total, exact.total
+
+    assert asyncio.run(scenario()) == (2, 2, 3)
@@ -0,0 +1,93 @@
+import asyncio
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from botocore.exceptions import ClientError
+
+from backend.services.external_services.s3_service import S3Service
+
+
+class FakeS3:
+    """Bucket в памяти с нужным S3Service подмножеством API"""
+
+    def __init__(self):
+        self.objects = {}
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def head_object(self, Bucket, Key):
+        self.calls.append("head")
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        return dict(self.objects[Key])
+
+    async def copy_object(self, Bucket, Key, CopySource, MetadataDirective, ACL, **kwargs):
+        self.calls.append("copy")
+        assert CopySource == {"Bucket": Bucket, "Key": Key} and MetadataDirective == "REPLACE"
+        self.objects[Key]["LastModified"] = datetime.now(timezone.utc)
+
+    async def upload_fileobj(self, file_obj, bucket, key, ExtraArgs):
+        self.calls.append("put")
+        self.objects[key] = {"LastModified": datetime.now(timezone.utc), "ContentType": ExtraArgs["ContentType"]}
+
+    async def put_object_acl(self, **kwargs):
+        pass
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    fake = FakeS3()
+    monkeypatch.setattr(S3Service, "_known_keys", OrderedDict())
+    monkeypatch.setattr(S3Service, "_client", lambda self: fake)
+    return fake
+
+
+def test_recent_index_hit_skips_network(s3):
+    service = S3Service()
+    asyncio.run(service.upload_file(b"photo", folder="processed/images"))
+    s3.calls.clear()
+
+    asyncio.run(service.upload_file(b"photo", folder="processed/images"))
+    assert s3.calls == []
+
+
+def test_expired_index_entry_does_not_hide_deleted_object(s3):
+    service = S3Service()
+    key = service.build_content_key(b"photo", "processed/images", "jpg")
+    # Запись индекса из прошлого; сам объект уже удалён очисткой в другом процессе
+    service._remember_key(key, datetime.now(timezone.utc) - service.index_ttl - timedelta(seconds=1))
+
+    asyncio.run(service.upload_file(b"photo", folder="processed/images"))
+    assert s3.calls == ["head", "put"]
+    assert key in s3.objects
+
+
+def test_reusing_old_object_refreshes_last_modified(s3):
+    service = S3Service()
+    key = service.build_content_key(b"photo", "processed/images", "jpg")
+    old = datetime.now(timezone.utc) - timedelta(days=3)
+    s3.objects[key] = {"LastModified": old, "ContentType": "image/jpeg"}
+
+    asyncio.run(service.upload_file(b"photo", folder="processed/images"))
+    assert s3.calls == ["head", "copy"]
+    assert s3.objects[key]["LastModified"] > old
+
+    # Очистка, составившая список кандидатов до обновления, объект уже не удалит
+    threshold = datetime.now(timezone.utc) - timedelta(hours=1)
+    assert asyncio.run(service.filter_not_modified_since([key], threshold)) == []
+
+
+def test_filter_not_modified_since_keeps_only_old_existing_objects(s3):
+    service = S3Service()
+    now = datetime.now(timezone.utc)
+    s3.objects["old"] = {"LastModified": now - timedelta(days=2)}
+    s3.objects["fresh"] = {"LastModified": now}
+
+    result = asyncio.run(service.filter_not_modified_since(["old", "fresh", "gone"], now - timedelta(days=1)))
+    assert result == ["old"]
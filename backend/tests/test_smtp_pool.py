@@ -0,0 +1,216 @@
+import asyncio
+import socket
+import uuid
+
+import aiosmtplib
+import pytest
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+from backend.models.outbound_email_model import OutboundEmail
+from backend.services.external_services.email_service import (
+    EmailService,
+    REASON_AUTH,
+    REASON_REJECTED,
+    REASON_TRANSIENT,
+    SmtpConnectionPool,
+    classify_smtp_error,
+)
+from backend.services.mail_spool import MailSpool
+from backend.services.mime_stream import write_message
+
+USER, PASSWORD = "robot@example.com", "secret"
+
+
+class RecordingHandler:
+    """Принимает письма; busy@ отвечает 451, nouser@ - 550"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("busy@"):
+            return "451 4.2.1 Mailbox busy, try later"
+        if address.startswith("nouser@"):
+            return "550 5.1.1 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((envelope.rcpt_tos[:], envelope.content))
+        return "250 Message accepted"
+
+
+class CountingAuthenticator:
+    def __init__(self):
+        self.logins = 0
+
+    def __call__(self, server, session, envelope, mechanism, auth_data):
+        self.logins += 1
+        ok = auth_data.login.decode() == USER and auth_data.password.decode() == PASSWORD
+        # handled=False: ответ 535 при отказе формирует сам aiosmtpd
+        return AuthResult(success=ok, handled=False)
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    """aiosmtpd в отдельном потоке вместо smtp.mail.ru"""
+    handler = RecordingHandler()
+    authenticator = CountingAuthenticator()
+    controller = Controller(
+        handler,
+        hostname="127.0.0.1",
+        port=free_port(),
+        authenticator=authenticator,
+        auth_require_tls=False,
+    )
+    controller.start()
+    yield controller, handler, authenticator
+    controller.stop()
+
+
+@pytest.fixture
+def email_service(tmp_path, monkeypatch):
+    monkeypatch.setattr(EmailService, "_spool", MailSpool(str(tmp_path / "spool")))
+    service = EmailService()
+    service.smtp_user = USER
+    return service
+
+
+def make_pool(controller, password: str = PASSWORD, idle_timeout: float = 60.0) -> SmtpConnectionPool:
+    return SmtpConnectionPool(
+        host=controller.hostname,
+        port=controller.port,
+        user=USER,
+        password=password,
+        size=1,
+        use_tls=False,
+        timeout=5,
+        idle_timeout=idle_timeout,
+    )
+
+
+def queued_email(service: EmailService, to_email: str) -> OutboundEmail:
+    spool_key, size = service.get_spool().store(lambda out: write_message(
+        out, USER, to_email, "Заявление", "Прошу отремонтировать дорогу.", [("photo.jpg", b"\xff\xd8jpeg")]
+    ))
+    return OutboundEmail(uuid=uuid.uuid4(), to_email=to_email, spool_key=spool_key, size_bytes=size, attempts=1)
+
+
+def test_connection_is_reused_between_sends(smtp_server, email_service):
+    controller, handler, authenticator = smtp_server
+
+    async def scenario():
+        pool = make_pool(controller)
+        clients, results = [], []
+        for to_email in ("road@vlc.ru", "road@nakhodka.ru"):
+            async with pool.connection() as client:
+                clients.append(client)
+                results.append(await email_service.deliver(client, queued_email(email_service, to_email)))
+        await pool.close()
+        return clients, results
+
+    clients, results = asyncio.run(scenario())
+    assert all(result.success for result in results)
+    assert clients[0] is clients[1]
+    assert authenticator.logins == 1
+    assert [rcpt for rcpt, _ in handler.messages] == [["road@vlc.ru"], ["road@nakhodka.ru"]]
+
+
+def test_4xx_is_transient_and_5xx_is_permanent(smtp_server, email_service):
+    controller, handler, authenticator = smtp_server
+
+    async def scenario():
+        pool = make_pool(controller)
+        async with pool.connection() as client:
+            busy = await email_service.deliver(client, queued_email(email_service, "busy@vlc.ru"))
+            missing = await email_service.deliver(client, queued_email(email_service, "nouser@vlc.ru"))
+            # После отказа транзакция сброшена, соединение годится для следующего письма
+            ok = await email_service.deliver(client, queued_email(email_service, "road@vlc.ru"))
+        await pool.close()
+        return busy, missing, ok
+
+    busy, missing, ok = asyncio.run(scenario())
+    assert (busy.reason, busy.smtp_code, busy.retryable) == (REASON_TRANSIENT, 451, True)
+    assert (missing.reason, missing.smtp_code, missing.retryable) == (REASON_REJECTED, 550, False)
+    assert ok.success
+    assert authenticator.logins == 1
+    assert [rcpt for rcpt, _ in handler.messages] == [["road@vlc.ru"]]
+
+
+def test_expired_idle_connection_is_replaced(smtp_server):
+    controller, _, authenticator = smtp_server
+
+    async def scenario():
+        pool = make_pool(controller, idle_timeout=0.05)
+        async with pool.connection() as first:
+            await first.noop()
+        await asyncio.sleep(0.1)
+        async with pool.connection() as second:
+            await second.noop()
+        await pool.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert second is not first
+    assert not first.is_connected
+    assert authenticator.logins == 2
+
+
+def test_connection_closed_by_server_is_replaced(smtp_server):
+    controller, _, authenticator = smtp_server
+
+    async def scenario():
+        pool = make_pool(controller)
+        async with pool.connection() as first:
+            await first.noop()
+        # Сервер разорвал простаивающее соединение
+        first.close()
+        async with pool.connection() as second:
+            await second.noop()
+        await pool.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert second is not first
+    assert authenticator.logins == 2
+
+
+def test_connection_is_dropped_after_error(smtp_server):
+    controller, _, authenticator = smtp_server
+
+    async def scenario():
+        pool = make_pool(controller)
+        with pytest.raises(aiosmtplib.SMTPServerDisconnected):
+            async with pool.connection() as first:
+                raise aiosmtplib.SMTPServerDisconnected("connection reset")
+        assert pool._idle == []
+        async with pool.connection() as second:
+            await second.noop()
+        await pool.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert second is not first
+    assert not first.is_connected
+    assert authenticator.logins == 2
+
+
+def test_wrong_password_is_classified_as_auth_error(smtp_server):
+    controller, _, _ = smtp_server
+
+    async def scenario():
+        pool = make_pool(controller, password="wrong")
+        with pytest.raises(aiosmtplib.SMTPAuthenticationError) as error:
+            async with pool.connection():
+                pass
+        return error.value
+
+    error = asyncio.run(scenario())
+    assert classify_smtp_error(error) == (REASON_AUTH, 535)
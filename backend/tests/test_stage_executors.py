@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.core import executors
+from backend.core.executors import STAGE_DOCUMENT, STAGE_EMAIL, run_in_stage
+
+HEARTBEAT_INTERVAL = 0.01
+MAX_LOOP_LAG = 0.1
+
+
+@pytest.fixture(autouse=True)
+def stage_pools(monkeypatch):
+    monkeypatch.setattr(executors, "_STAGE_SIZES", {STAGE_DOCUMENT: 2, STAGE_EMAIL: 2})
+    monkeypatch.setattr(executors, "_executors", {})
+    yield
+    executors.shutdown_stage_executors()
+
+
+async def heartbeat(stop: asyncio.Event, lags: list):
+    """Замеряет, насколько позже запланированного просыпается event loop"""
+    while not stop.is_set():
+        started = time.monotonic()
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        lags.append(time.monotonic() - started - HEARTBEAT_INTERVAL)
+
+
+def render_document(duration: float) -> bytes:
+    time.sleep(duration)
+    return b"%PDF-1.4"
+
+
+def test_blocking_stages_keep_event_loop_responsive():
+    async def scenario():
+        stop = asyncio.Event()
+        lags = []
+        beat = asyncio.create_task(heartbeat(stop, lags))
+
+        # В каждом этапе задач втрое больше, чем потоков
+        jobs = [run_in_stage(STAGE_DOCUMENT, render_document, 0.2) for _ in range(6)]
+        jobs += [run_in_stage(STAGE_EMAIL, time.sleep, 0.2) for _ in range(6)]
+        results = await asyncio.gather(*jobs)
+
+        stop.set()
+        await beat
+        return results, lags
+
+    results, lags = asyncio.run(scenario())
+    assert results[:6] == [b"%PDF-1.4"] * 6
+    assert len(lags) > 20
+    assert max(lags) < MAX_LOOP_LAG
+
+
+def test_saturated_document_stage_does_not_delay_email():
+    release = threading.Event()
+
+    async def scenario():
+        blocked = [run_in_stage(STAGE_DOCUMENT, release.wait, 5) for _ in range(4)]
+        blocked = [asyncio.ensure_future(job) for job in blocked]
+        await asyncio.sleep(0.05)
+
+        started = time.monotonic()
+        await run_in_stage(STAGE_EMAIL, time.sleep, 0.01)
+        elapsed = time.monotonic() - started
+
+        release.set()
+        await asyncio.gather(*blocked)
+        return elapsed
+
+    assert asyncio.run(scenario()) < MAX_LOOP_LAG
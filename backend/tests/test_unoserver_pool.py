@@ -0,0 +1,108 @@
+import socket
+import sys
+import time
+
+import pytest
+
+from backend.services.pdf_converter import PdfConversionError, UnoserverPool
+
+# Заглушка unoserver: слушает --port, а на порту из --fail-port завершается с ошибкой
+FAKE_UNOSERVER = """
+import argparse, socket, sys, time
+parser = argparse.ArgumentParser()
+parser.add_argument("--port", type=int)
+parser.add_argument("--fail-port", type=int)
+args, _ = parser.parse_known_args()
+if args.port == args.fail_port:
+    sys.exit(3)
+server = socket.socket()
+server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+server.bind(("127.0.0.1", args.port))
+server.listen()
+while True:
+    time.sleep(1)
+"""
+
+
+def free_base_port() -> int:
+    """Порт, у которого свободны и следующие три (два экземпляра по два порта)"""
+    for _ in range(50):
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            base = probe.getsockname()[1]
+        try:
+            for port in range(base, base + 4):
+                with socket.socket() as check:
+                    check.bind(("127.0.0.1", port))
+            return base
+        except OSError:
+            continue
+    pytest.skip("no free port range")
+
+
+@pytest.fixture
+def fake_unoserver(tmp_path):
+    script = tmp_path / "fake_unoserver.py"
+    script.write_text(FAKE_UNOSERVER)
+    return script
+
+
+def make_pool(script, base_port: int, fail_port: int, retry_after: float = 300.0) -> UnoserverPool:
+    return UnoserverPool(
+        size=2,
+        base_port=base_port,
+        command=f"{sys.executable} {script} --fail-port {fail_port}",
+        timeout=5,
+        start_timeout=5,
+        retry_after=retry_after
+    )
+
+
+def test_partial_start_failure_stops_started_instances(fake_unoserver):
+    base = free_base_port()
+    pool = make_pool(fake_unoserver, base, fail_port=base + 2)
+    try:
+        with pytest.raises(PdfConversionError):
+            pool.start()
+
+        assert all(instance.process is None for instance in pool.instances)
+        assert pool._idle.empty()
+        # Первый экземпляр остановлен: порт снова свободен
+        with socket.socket() as check:
+            check.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            check.bind(("127.0.0.1", base))
+    finally:
+        pool.close()
+
+
+def test_failed_start_is_not_retried_during_cooldown(fake_unoserver):
+    base = free_base_port()
+    pool = make_pool(fake_unoserver, base, fail_port=base + 2)
+    try:
+        with pytest.raises(PdfConversionError):
+            pool.start()
+
+        started = time.monotonic()
+        with pytest.raises(PdfConversionError, match="unavailable"):
+            pool.convert(b"docx")
+        assert time.monotonic() - started < 0.5
+        assert all(instance.process is None for instance in pool.instances)
+    finally:
+        pool.close()
+
+
+def test_start_is_retried_after_cooldown(fake_unoserver):
+    base = free_base_port()
+    pool = make_pool(fake_unoserver, base, fail_port=base + 2, retry_after=0.1)
+    try:
+        with pytest.raises(PdfConversionError):
+            pool.start()
+        time.sleep(0.2)
+
+        # Исправленная команда: второй экземпляр теперь запускается
+        for instance in pool.instances:
+            instance.command = [sys.executable, str(fake_unoserver), "--fail-port", "0"]
+        pool.start()
+        assert pool._idle.qsize() == 2
+    finally:
+        pool.close()
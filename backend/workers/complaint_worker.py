@@ -0,0 +1,203 @@
+"""
+Complaint Worker - отдельный процесс, разбирающий очередь complaint_jobs.
+
+Задания забираются через SELECT ... FOR UPDATE SKIP LOCKED, поэтому воркеров
+можно запускать сколько угодно и независимо от API. При ошибке задание
+возвращается в очередь с экспоненциальной задержкой, после исчерпания попыток
+заявка помечается как failed. Пока задание выполняется, воркер продлевает его
+блокировку (locked_at), поэтому долгая обработка не считается зависшей.
+
+Запуск:
+    python -m backend.workers.complaint_worker --concurrency 2
+"""
+
+import asyncio
+import os
+import random
+import signal
+import socket
+import uuid
+
+from loguru import logger
+
+from backend.core.config import configs
+from backend.core.database import async_session_maker
+from backend.core.executors import shutdown_stage_executors
+from backend.models.complaint_job_model import ComplaintJob
+from backend.repositories.ReportRepository import ReportRepository
+from backend.repositories.complaint_job_repository import ComplaintJobRepository
+from backend.services.ai_agent_service import get_agent_service
+from backend.services.document_service import DocumentService
+from backend.services.pdf_converter import UnoserverPool
+from backend.services.external_services.gigachat_service import GigaChatService
+from backend.services.report_service import ReportService
+
+
+class ComplaintWorker:
+    """Разбор очереди заявлений в concurrency параллельных слотах."""
+
+    def __init__(self, concurrency: int = None):
+        self.concurrency = concurrency or configs.COMPLAINT_WORKER_CONCURRENCY
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = configs.COMPLAINT_JOB_POLL_SECONDS
+        self.lock_timeout = configs.COMPLAINT_JOB_LOCK_TIMEOUT_SECONDS
+        self.heartbeat_interval = configs.COMPLAINT_JOB_HEARTBEAT_SECONDS
+        self._stopping = asyncio.Event()
+
+    def _backoff(self, attempts: int) -> float:
+        """Экспоненциальная задержка с джиттером"""
+        delay = configs.COMPLAINT_JOB_BACKOFF_BASE_SECONDS * (2 ** (attempts - 1))
+        delay = min(delay, configs.COMPLAINT_JOB_BACKOFF_MAX_SECONDS)
+        return delay * random.uniform(0.8, 1.2)
+
+    async def _claim(self, slot: int):
+        async with async_session_maker() as session:
+            return await ComplaintJobRepository(session).claim(f"{self.worker_id}/{slot}")
+
+    async def _set_report_status(self, report_uuid: uuid.UUID, status: str, comment: str = None):
+        async with async_session_maker() as session:
+            repository = ReportRepository(session)
+            report = await repository.get_by_uuid(report_uuid)
+            if report is None:
+                return
+            report.ai_agent_status = status
+            if comment is not None:
+                report.comment = comment
+            await repository.update(report)
+
+    async def _keep_lock(self, job: ComplaintJob, owner: asyncio.Task, lock_lost: asyncio.Event):
+        """Продлевает блокировку задания; при потере блокировки прерывает обработку"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                async with async_session_maker() as session:
+                    alive = await ComplaintJobRepository(session).heartbeat(job.uuid, job.locked_by)
+            except Exception as e:
+                logger.error(f"[Task {job.uuid}] Failed to refresh job lock: {e}")
+                continue
+            if not alive:
+                lock_lost.set()
+                owner.cancel()
+                return
+
+    async def _run_job(self, job: ComplaintJob):
+        task_id = str(job.uuid)
+        lock_lost = asyncio.Event()
+        heartbeat = asyncio.create_task(self._keep_lock(job, asyncio.current_task(), lock_lost))
+        try:
+            try:
+                await self._set_report_status(job.report_uuid, "processing")
+                async with async_session_maker() as session:
+                    await ReportService(session).process_complaint(session, job.report_uuid, task_id)
+            finally:
+                heartbeat.cancel()
+        except asyncio.CancelledError:
+            if lock_lost.is_set():
+                # Задание уже вернули в очередь, им может заниматься другой воркер
+                logger.warning(f"[Task {task_id}] Job lock lost, processing stopped")
+                return
+            # Остановка воркера: задание сразу возвращается в очередь
+            async with async_session_maker() as session:
+                await ComplaintJobRepository(session).reschedule(job.uuid, 0)
+            await self._set_report_status(job.report_uuid, "queued")
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            async with async_session_maker() as session:
+                jobs = ComplaintJobRepository(session)
+                if job.attempts >= job.max_attempts:
+                    logger.error(f"[Task {task_id}] Failed after {job.attempts} attempts: {error}")
+                    await jobs.mark_failed(job.uuid, error)
+                    await self._set_report_status(job.report_uuid, "failed", f"Ошибка: {e}")
+                else:
+                    delay = self._backoff(job.attempts)
+                    logger.warning(
+                        f"[Task {task_id}] Attempt {job.attempts}/{job.max_attempts} failed: {error}, "
+                        f"retry in {delay:.0f}s"
+                    )
+                    await jobs.reschedule(job.uuid, delay, error)
+                    await self._set_report_status(job.report_uuid, "retrying")
+            return
+
+        async with async_session_maker() as session:
+            await ComplaintJobRepository(session).mark_done(job.uuid)
+        logger.info(f"[Task {task_id}] Job done")
+
+    async def _slot(self, slot: int):
+        while not self._stopping.is_set():
+            try:
+                job = await self._claim(slot)
+            except Exception as e:
+                logger.error(f"Failed to claim complaint job: {e}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._run_job(job)
+            except Exception:
+                # Задание останется RUNNING и вернётся в очередь через release_stale
+                logger.exception(f"[Task {job.uuid}] Failed to record job result")
+
+    async def _release_stale_periodically(self):
+        while not self._stopping.is_set():
+            try:
+                async with async_session_maker() as session:
+                    released = await ComplaintJobRepository(session).release_stale(self.lock_timeout)
+                if released:
+                    logger.warning(f"Released {released} stale complaint jobs")
+            except Exception as e:
+                logger.error(f"Failed to release stale complaint jobs: {e}")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.lock_timeout / 2)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self):
+        self._stopping.set()
+
+    async def run(self):
+        logger.info(f"Complaint worker {self.worker_id} started, concurrency={self.concurrency}")
+        # Шаблон заявления разбирается один раз при старте, а не при первом задании
+        DocumentService()
+        tasks = [asyncio.create_task(self._slot(slot)) for slot in range(self.concurrency)]
+        tasks.append(asyncio.create_task(self._release_stale_periodically()))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await asyncio.get_running_loop().run_in_executor(None, get_agent_service().browser_pool.close)
+            shutdown_stage_executors()
+            await GigaChatService.close_client()
+            DocumentService.shutdown_render_pool()
+            UnoserverPool.get_shared().close()
+            logger.info(f"Complaint worker {self.worker_id} stopped")
+
+
+async def main(concurrency: int = None):
+    worker = ComplaintWorker(concurrency)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except NotImplementedError:
+            # Windows: остановка по KeyboardInterrupt
+            pass
+    await worker.run()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Воркер очереди обработки заявлений")
+    parser.add_argument("--concurrency", type=int, default=None, help="Число параллельно обрабатываемых заданий")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.concurrency))
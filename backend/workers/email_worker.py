@@ -0,0 +1,261 @@
+"""
+Email Worker - отдельный процесс, доставляющий письма из исходящей очереди.
+
+Письма забираются пачками через SELECT ... FOR UPDATE SKIP LOCKED и
+отправляются по одному авторизованному SMTP-соединению на пачку. Частота
+отправки ограничивается по домену получателя: письмо, упёршееся в лимит,
+откладывается без траты попытки. Состояние доставки пишется в заявку.
+
+Запуск:
+    python -m backend.workers.email_worker --concurrency 2
+"""
+
+import asyncio
+import os
+import random
+import signal
+import socket
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+from loguru import logger
+
+from backend.core.config import configs
+from backend.core.database import async_session_maker
+from backend.core.executors import shutdown_stage_executors
+from backend.models.outbound_email_model import OutboundEmail
+from backend.models.report_model import ReportStatus
+from backend.repositories.ReportRepository import ReportRepository
+from backend.repositories.outbound_email_repository import OutboundEmailRepository
+from backend.services.external_services.email_service import (
+    EmailSendResult,
+    EmailService,
+    REASON_CONNECTION,
+    REASON_TIMEOUT,
+    classify_smtp_error,
+)
+
+
+class DomainRateLimiter:
+    """
+    Token bucket на домен получателя: burst писем сразу, дальше rate_per_minute.
+    Лимит действует в пределах процесса воркера.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def reserve(self, domain: str) -> float:
+        """Забирает токен домена; если его нет, возвращает секунды до появления"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(domain, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            self._buckets[domain] = (tokens - 1, now)
+            return 0.0
+        self._buckets[domain] = (tokens, now)
+        return (1 - tokens) / self.rate
+
+
+class EmailWorker:
+    """Доставка исходящей почты в concurrency параллельных слотах."""
+
+    def __init__(self, concurrency: int = None):
+        self.concurrency = concurrency or configs.EMAIL_SMTP_POOL_SIZE
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.batch_size = configs.EMAIL_BATCH_SIZE
+        self.poll_interval = configs.EMAIL_POLL_SECONDS
+        self.lock_timeout = configs.EMAIL_LOCK_TIMEOUT_SECONDS
+        self.email_service = EmailService()
+        self.limiter = DomainRateLimiter(configs.EMAIL_DOMAIN_RATE_PER_MINUTE, configs.EMAIL_DOMAIN_BURST)
+        self._stopping = asyncio.Event()
+
+    def _backoff(self, attempts: int) -> float:
+        """Экспоненциальная задержка с джиттером"""
+        delay = configs.EMAIL_RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+        delay = min(delay, configs.EMAIL_RETRY_MAX_SECONDS)
+        return delay * random.uniform(0.8, 1.2)
+
+    async def _claim(self, slot: int) -> List[OutboundEmail]:
+        async with async_session_maker() as session:
+            return await OutboundEmailRepository(session).claim_batch(f"{self.worker_id}/{slot}", self.batch_size)
+
+    async def _defer(self, email: OutboundEmail, delay: float):
+        """Вернуть письмо в очередь, не считая попытку"""
+        async with async_session_maker() as session:
+            await OutboundEmailRepository(session).reschedule(email.uuid, delay, count_attempt=False)
+
+    async def _release_batch(self, slot: int, delay: float = 0.0, count_attempt: bool = False):
+        """Вернуть в очередь письма пачки, ещё не получившие результат"""
+        async with async_session_maker() as session:
+            return await OutboundEmailRepository(session).release_locked(
+                f"{self.worker_id}/{slot}", delay, count_attempt
+            )
+
+    async def _update_report(self, email: OutboundEmail, **values):
+        if email.report_uuid is None:
+            return
+        async with async_session_maker() as session:
+            await ReportRepository(session).update_fields(email.report_uuid, **values)
+
+    async def _record(self, email: OutboundEmail, result: EmailSendResult):
+        """Фиксирует результат попытки в очереди и в заявке"""
+        async with async_session_maker() as session:
+            emails = OutboundEmailRepository(session)
+            if result.success:
+                await emails.mark_sent(email.uuid)
+            elif result.retryable and email.attempts < email.max_attempts:
+                delay = self._backoff(email.attempts)
+                await emails.reschedule(email.uuid, delay, result.message)
+            else:
+                await emails.mark_failed(email.uuid, result.message)
+
+        if result.success:
+            self.email_service.get_spool().remove(email.spool_key)
+            logger.info(f"[Email {email.uuid}] Sent to {email.to_email}")
+            await self._update_report(
+                email,
+                email_status="sent",
+                email_sent_at=datetime.now(timezone.utc),
+                email_error=None,
+                status=ReportStatus.IN_REVIEW,
+                comment=f"Заявление отправлено на {email.to_email}"
+            )
+        elif result.retryable and email.attempts < email.max_attempts:
+            logger.warning(
+                f"[Email {email.uuid}] Attempt {email.attempts}/{email.max_attempts} to {email.to_email} "
+                f"failed: {result.reason} {result.message}"
+            )
+            await self._update_report(email, email_status="retrying", email_error=result.as_dict())
+        else:
+            logger.error(f"[Email {email.uuid}] Delivery to {email.to_email} failed: {result.reason} {result.message}")
+            await self._update_report(
+                email,
+                email_status="failed",
+                email_error=result.as_dict(),
+                comment=f"Не удалось отправить заявление: {result.message}"
+            )
+
+    async def _deliver_batch(self, batch: List[OutboundEmail]):
+        ready = []
+        for email in batch:
+            wait = self.limiter.reserve(email.recipient_domain)
+            if wait > 0:
+                await self._defer(email, wait)
+            else:
+                ready.append(email)
+        if not ready:
+            return
+
+        delivered = 0
+        try:
+            # Одна авторизация на всю пачку
+            async with self.email_service.get_pool().connection() as client:
+                for email in ready:
+                    result = await self.email_service.deliver(client, email)
+                    await self._record(email, result)
+                    delivered += 1
+                    if result.reason in (REASON_CONNECTION, REASON_TIMEOUT):
+                        # Соединение потеряно, остаток пачки возвращается в очередь
+                        client.close()
+                        break
+        except Exception as e:
+            # Не удалось подключиться или авторизоваться
+            reason, code = classify_smtp_error(e)
+            for email in ready[delivered:]:
+                await self._record(email, EmailSendResult(
+                    success=False,
+                    attempts=email.attempts,
+                    reason=reason,
+                    smtp_code=code,
+                    message=f"{type(e).__name__}: {e}"
+                ))
+            return
+
+        for email in ready[delivered:]:
+            await self._defer(email, 0)
+
+    async def _slot(self, slot: int):
+        while not self._stopping.is_set():
+            try:
+                batch = await self._claim(slot)
+            except Exception as e:
+                logger.error(f"Failed to claim outbound emails: {e}")
+                batch = []
+
+            if not batch:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._deliver_batch(batch)
+            except asyncio.CancelledError:
+                # Остановка воркера: неотправленные письма пачки сразу возвращаются в очередь
+                await self._release_batch(slot)
+                raise
+            except Exception:
+                # Сбой БД посреди пачки: остаток возвращается в очередь с задержкой и расходом попытки
+                logger.exception("Failed to deliver outbound email batch")
+                try:
+                    await self._release_batch(slot, configs.EMAIL_RETRY_BASE_SECONDS, count_attempt=True)
+                except Exception as e:
+                    logger.error(f"Failed to release outbound emails: {e}")
+
+    async def _release_stale_periodically(self):
+        while not self._stopping.is_set():
+            try:
+                async with async_session_maker() as session:
+                    released = await OutboundEmailRepository(session).release_stale(self.lock_timeout)
+                if released:
+                    logger.warning(f"Released {released} stale outbound emails")
+            except Exception as e:
+                logger.error(f"Failed to release stale outbound emails: {e}")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.lock_timeout / 2)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self):
+        self._stopping.set()
+
+    async def run(self):
+        logger.info(f"Email worker {self.worker_id} started, concurrency={self.concurrency}")
+        tasks = [asyncio.create_task(self._slot(slot)) for slot in range(self.concurrency)]
+        tasks.append(asyncio.create_task(self._release_stale_periodically()))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await EmailService.close_pool()
+            shutdown_stage_executors()
+            logger.info(f"Email worker {self.worker_id} stopped")
+
+
+async def main(concurrency: int = None):
+    worker = EmailWorker(concurrency)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except NotImplementedError:
+            # Windows: остановка по KeyboardInterrupt
+            pass
+    await worker.run()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Воркер доставки исходящей почты")
+    parser.add_argument("--concurrency", type=int, default=None, help="Число параллельно отправляемых пачек")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.concurrency))